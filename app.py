@@ -2,18 +2,58 @@
 
 from __future__ import annotations
 
+import dataclasses
 import datetime as dt
+import logging
+import time
 from collections.abc import Iterable, Sequence
+from http.server import ThreadingHTTPServer
+from typing import TYPE_CHECKING
 
 import pandas as pd
 import streamlit as st
 
-from src.analytics import add_moving_averages, compute_daily_returns, daily_change
+from src.alerts import AlertEngine, AlertRule
+from src.analytics import AnalyticsResult, extend_analytics
 from src.config import get_settings
-from src.data import DataDownloadError, fetch_prices
-from src.plotting import price_chart, returns_chart
-
-settings = get_settings()
+from src.data import (
+    DataDownloadError,
+    fetch_latest_bars,
+    fetch_prices,
+    merge_latest_bars,
+)
+from src.derived import DerivedCache
+from src.export import EXPORT_FORMATS, to_bytes
+from src.indicators import PRESETS, compute_indicators, overlay_columns
+from src.metrics import Span, serve_metrics, timed, trace, write_prometheus
+from src.plotting import (
+    correlation_heatmap,
+    indicator_chart,
+    price_chart,
+    returns_chart,
+)
+from src.pyramid import (
+    NATIVE_INTERVALS,
+    BarPyramid,
+    derives_from,
+    interval_delta,
+    resample_bars,
+)
+from src.query import IndexedPrices
+from src.sharedcache import SharedFrameCache
+from src.swr import CachedValue, StaleWhileRevalidateCache
+
+if TYPE_CHECKING:
+    from src.stream import StreamIngestor
+
+LOGGER = logging.getLogger(__name__)
+
+_LIVE_STATE_KEY = "live_frame"
+_EXPORT_STATE_KEY = "export_request"
+_PRICE_PANEL = "Price action"
+
+# Fragments graduated from ``experimental_fragment`` in newer Streamlit releases.
+_fragment = getattr(st, "fragment", None) or st.experimental_fragment
 
 
 def _load_price_data_uncached(
@@ -22,12 +62,101 @@ def _load_price_data_uncached(
     end: dt.datetime,
     interval: str,
 ) -> pd.DataFrame:
-    """Standalone loader to simplify unit testing and caching composition."""
+    """Standalone loader to simplify unit testing and caching composition.
+
+    With a shared cache configured, the frame comes from (or is published to) the
+    host-wide Arrow store instead of being downloaded by every process.
+    """
+
+    def fetch() -> pd.DataFrame:
+        return fetch_prices(tickers, start=start, end=end, interval=interval)
+
+    shared = _shared_cache()
+    if shared is None:
+        return fetch()
+    return shared.get((tuple(tickers), start, end, interval), fetch)
+
+
+@st.cache_resource(show_spinner=False)
+def _price_cache() -> StaleWhileRevalidateCache[pd.DataFrame]:
+    """Process-wide price cache shared by every session."""
+
+    settings = get_settings()
+    return StaleWhileRevalidateCache(
+        ttl=settings.cache_ttl_seconds, max_stale=settings.swr_max_stale_seconds
+    )
+
+
+@st.cache_resource(show_spinner=False)
+def _shared_cache() -> SharedFrameCache | None:
+    """Host-wide Arrow IPC price store, when ``shared_cache_dir`` is set."""
+
+    settings = get_settings()
+    if settings.shared_cache_dir is None:
+        return None
+    return SharedFrameCache(
+        settings.shared_cache_dir,
+        ttl=settings.cache_ttl_seconds,
+        max_age=settings.cache_ttl_seconds + settings.swr_max_stale_seconds,
+    )
+
 
-    return fetch_prices(tickers, start=start, end=end, interval=interval)
+@st.cache_resource(show_spinner=False)
+def _bar_pyramid() -> BarPyramid:
+    """Process-wide record of fetched resolutions and locally derived bars."""
+
+    return BarPyramid()
+
+
+@st.cache_resource(show_spinner=False)
+def _derived_cache() -> DerivedCache:
+    """Process-wide memo of analytics and figures keyed on the price fingerprint."""
+
+    settings = get_settings()
+    return DerivedCache(max_bytes=settings.derived_cache_mb * 1024 * 1024)
+
+
+@st.cache_resource(show_spinner=False)
+def _stream_ingestor() -> StreamIngestor | None:
+    """Start the process-wide stream consumer when a stream source is configured."""
+
+    settings = get_settings()
+    if settings.stream_replay_path is None:
+        return None
+    from src.stream import ReplaySource, StreamIngestor
+
+    ingestor = StreamIngestor(
+        ReplaySource(settings.stream_replay_path),
+        capacity=settings.stream_buffer_bars,
+    )
+    ingestor.start()
+    return ingestor
+
+
+def load_price_data_cached(
+    tickers: Sequence[str],
+    start: dt.datetime,
+    end: dt.datetime,
+    interval: str,
+) -> CachedValue[pd.DataFrame]:
+    """Serve the last good frame at once and revalidate expired ones in background.
+
+    Sessions asking for the same selection share a single upstream call, and an
+    outage during revalidation keeps serving the previous frame (flagged stale).
+    Intervals that can be built from a resolution already fetched for the window
+    (or that Yahoo does not serve, like ``4h``) are resampled locally.
+    """
+
+    pyramid = _bar_pyramid()
+    source = pyramid.source_for(tickers, start, end, interval)
+    key = (tuple(tickers), start, end, source)
+    cached = _price_cache().get(
+        key, lambda: _load_price_data_uncached(tickers, start, end, source)
+    )
+    prices = pyramid.resolve(tickers, start, end, interval, cached.value, source)
+    return dataclasses.replace(cached, value=prices)
 
 
-@st.cache_data(ttl=settings.cache_ttl_seconds, show_spinner=False)
 def load_price_data(
     tickers: Sequence[str],
     start: dt.datetime,
@@ -36,7 +165,56 @@ def load_price_data(
 ) -> pd.DataFrame:
     """Shared cache so streamlit does not hammer Yahoo Finance on every rerun."""
 
-    return _load_price_data_uncached(tickers, start, end, interval)
+    return load_price_data_cached(tickers, start, end, interval).value
+
+
+def _format_age(seconds: float) -> str:
+    minutes = int(seconds // 60)
+    if minutes < 1:
+        return f"{int(seconds)}s"
+    if minutes < 120:
+        return f"{minutes} min"
+    return f"{minutes // 60} h"
+
+
+def _load_live_frame(
+    tickers: tuple[str, ...],
+    start: dt.datetime,
+    end: dt.datetime,
+    interval: str,
+    ma_windows: tuple[int, ...],
+) -> tuple[pd.DataFrame, AnalyticsResult]:
+    """Serve the session's last frame, appending only new bars once the TTL lapses.
+
+    The first load for a given selection goes through :func:`load_price_data`.
+    Afterwards each expiry asks the data layer for bars since the last timestamp per
+    ticker and folds them into the previous analytics, so a refresh costs O(new
+    bars) instead of re-downloading and recomputing the whole window.
+    """
+
+    settings = get_settings()
+    key = (tickers, start, end, interval, ma_windows)
+    state = st.session_state.get(_LIVE_STATE_KEY)
+    now = time.monotonic()
+    if state is None or state["key"] != key:
+        prices = load_price_data(tickers, start, end, interval)
+        analytics = _derived_cache().analytics(prices, ma_windows)
+    elif now - state["refreshed_at"] < settings.cache_ttl_seconds:
+        return state["prices"], state["analytics"]
+    else:
+        update = fetch_latest_bars(state["prices"], interval=interval)
+        if update.prices.empty and update.failures:
+            st.toast("Live refresh failed; showing the last loaded bars.", icon="⚠️")
+        prices = merge_latest_bars(state["prices"], update.prices)
+        analytics = extend_analytics(state["analytics"], update.prices, ma_windows)
+
+    st.session_state[_LIVE_STATE_KEY] = {
+        "key": key,
+        "prices": prices,
+        "analytics": analytics,
+        "refreshed_at": now,
+    }
+    return prices, analytics
 
 
 def _infer_date_range(default_days: int) -> tuple[dt.date, dt.date]:
@@ -61,7 +239,6 @@ def _render_kpis(
     """Display per-ticker KPIs in responsive columns."""
 
     columns = st.columns(len(latest_rows))
-    alerting = []
     for column, (ticker, row) in zip(columns, latest_rows.iterrows(), strict=False):
         change_pct = changes.get(ticker, 0.0) * 100
         with column:
@@ -74,8 +251,16 @@ def _render_kpis(
                 "Volume: {}".format(f"{int(row.volume):,}" if row.volume else "n/a"),
                 help="Helps gauge how active today's session is versus history.",
             )
-        if abs(change_pct) >= threshold:
-            alerting.append((ticker, change_pct))
+
+    # The session's slider is just one more rule set for the headless engine.
+    rules = [
+        AlertRule(f"session-{ticker}", "session", ticker, threshold / 100)
+        for ticker in latest_rows.index
+    ]
+    alerting = [
+        (alert.ticker, alert.change * 100)
+        for alert in AlertEngine(rules).evaluate(changes)
+    ]
 
     if alerting:
         formatted = ", ".join(
@@ -92,15 +277,10 @@ def _render_kpis(
         )
 
 
-def _render_tables(price_frame: pd.DataFrame, returns_frame: pd.DataFrame) -> None:
+def _render_tables(prices: IndexedPrices, returns: IndexedPrices) -> None:
     """Render recent datapoints to give traders quick tabular context."""
 
-    recent_prices = (
-        price_frame.sort_values("datetime", ascending=False)
-        .groupby("ticker", group_keys=False)
-        .head(5)
-        .sort_values(["ticker", "datetime"], ascending=[True, False])
-    )
+    recent_prices = prices.latest(5, newest_first=True)
     st.subheader("Recent prints")
     st.caption("Latest ticks help traders double-check the chart narrative.")
     st.dataframe(
@@ -109,12 +289,7 @@ def _render_tables(price_frame: pd.DataFrame, returns_frame: pd.DataFrame) -> No
         use_container_width=True,
     )
 
-    recent_returns = (
-        returns_frame.sort_values("datetime", ascending=False)
-        .groupby("ticker", group_keys=False)
-        .head(10)
-        .sort_values(["ticker", "datetime"], ascending=[True, False])
-    )
+    recent_returns = returns.latest(10, newest_first=True)
     st.subheader("Return tape")
     st.caption("Quickly compare momentum across commodities.")
     st.dataframe(
@@ -124,9 +299,262 @@ def _render_tables(price_frame: pd.DataFrame, returns_frame: pd.DataFrame) -> No
     )
 
 
+def _render_scenarios(returns_frame: pd.DataFrame) -> None:
+    """Monte Carlo VaR/ES for the loaded basket, run on demand."""
+
+    settings = get_settings()
+    st.caption("Simulated losses for the loaded basket; runs only when submitted.")
+    with st.form("scenario_form"):
+        paths = st.select_slider(
+            "Simulated paths", options=[10_000, 100_000, 1_000_000], value=100_000
+        )
+        horizon = st.number_input(
+            "Horizon (bars)", min_value=1, max_value=2_000, value=250
+        )
+        method = st.radio(
+            "Model",
+            options=("gbm", "bootstrap"),
+            horizontal=True,
+            help="GBM uses estimated drift/covariance; bootstrap replays history.",
+        )
+        submitted = st.form_submit_button("Run simulation")
+    if not submitted:
+        return
+    # Deferred: most reruns never open this panel.
+    from src.montecarlo import estimate_model, scenario_risk
+
+    try:
+        model = estimate_model(returns_frame)
+    except ValueError as error:
+        st.info(f"Not enough overlapping history to simulate: {error}")
+        return
+    with st.spinner("Simulating scenarios..."):
+        report = scenario_risk(
+            model,
+            n_paths=int(paths),
+            steps=int(horizon),
+            method=method,
+            workers=settings.monte_carlo_workers or None,
+        )
+    st.caption(
+        f"Loss over {report.steps} bars as a fraction of value "
+        f"({report.n_paths:,} paths, equal-weight portfolio)."
+    )
+    left, right = st.columns(2)
+    left.markdown("**Value at Risk**")
+    left.dataframe(report.var.style.format("{:.2%}"), use_container_width=True)
+    right.markdown("**Expected Shortfall**")
+    right.dataframe(report.es.style.format("{:.2%}"), use_container_width=True)
+
+
+def _render_price_panel(
+    prices: IndexedPrices,
+    ma_windows: tuple[int, ...],
+    indicators: tuple[str, ...],
+    fingerprint: str,
+) -> None:
+    settings = get_settings()
+    st.caption("Visualise how each contract trades versus its moving averages.")
+    price_fig = _derived_cache().get(
+        ("price_chart", fingerprint, ma_windows, indicators),
+        lambda: price_chart(
+            prices,
+            ma_windows,
+            max_points=settings.chart_max_points,
+            downsample=settings.chart_downsample,
+            use_webgl=settings.chart_webgl,
+            overlays=overlay_columns(indicators),
+        ),
+    )
+    with timed("app.plotly_chart", chart="price"):
+        st.plotly_chart(price_fig, use_container_width=True)
+
+
+def _render_momentum_panel(
+    prices: IndexedPrices,
+    returns: IndexedPrices,
+    indicators: tuple[str, ...],
+    fingerprint: str,
+) -> None:
+    settings = get_settings()
+    st.caption("Bar chart emphasises cross-commodity swings for the selected window.")
+    returns_fig = _derived_cache().get(
+        ("returns_chart", fingerprint), lambda: returns_chart(returns)
+    )
+    with timed("app.plotly_chart", chart="returns"):
+        st.plotly_chart(returns_fig, use_container_width=True)
+
+    overlays = set(overlay_columns(indicators))
+    columns = [
+        column
+        for column in prices.frame.columns
+        if column.startswith("ind_") and column not in overlays
+    ]
+    if not columns:
+        return
+    oscillator_fig = _derived_cache().get(
+        ("indicator_chart", fingerprint, indicators),
+        lambda: indicator_chart(
+            prices,
+            columns,
+            max_points=settings.chart_max_points,
+            downsample=settings.chart_downsample,
+        ),
+    )
+    with timed("app.plotly_chart", chart="indicators"):
+        st.plotly_chart(oscillator_fig, use_container_width=True)
+
+
+def _render_correlation_panel(enriched: pd.DataFrame, fingerprint: str) -> None:
+    from src.crosssection import build_panel, latest_correlation
+
+    settings = get_settings()
+    st.caption(f"Return correlation over the last {settings.correlation_window} bars.")
+    heatmap = _derived_cache().get(
+        ("correlation_heatmap", fingerprint, settings.correlation_window),
+        lambda: correlation_heatmap(
+            latest_correlation(build_panel(enriched), settings.correlation_window)
+        ),
+    )
+    with timed("app.plotly_chart", chart="correlation"):
+        st.plotly_chart(heatmap, use_container_width=True)
+
+
+def _render_export(enriched: pd.DataFrame, fingerprint: str) -> None:
+    """Encode the dataset only once the user asks for it."""
+
+    st.caption("Exports the loaded prices with moving averages.")
+    fmt = st.radio(
+        "Format",
+        options=tuple(EXPORT_FORMATS),
+        format_func=str.upper,
+        horizontal=True,
+        help="Parquet keeps dtypes and is much smaller for intraday data.",
+    )
+    key = ("export", fingerprint, tuple(enriched.columns), fmt)
+    if st.button(f"Prepare {fmt.upper()} export"):
+        st.session_state[_EXPORT_STATE_KEY] = key
+    if st.session_state.get(_EXPORT_STATE_KEY) != key:
+        return
+    with st.spinner("Preparing export..."), timed("app.export", format=fmt):
+        payload = _derived_cache().get(key, lambda: to_bytes(enriched, fmt))
+    spec = EXPORT_FORMATS[fmt]
+    size_mb = len(payload) / 1024**2
+    st.download_button(
+        label=f"Download latest dataset ({fmt.upper()}, {size_mb:,.1f} MB)",
+        data=payload,
+        file_name=f"cci_commodities.{spec.extension}",
+        mime=spec.mime,
+    )
+
+
+@_fragment
+def _render_panels(
+    prices: IndexedPrices,
+    returns: IndexedPrices,
+    ma_windows: tuple[int, ...],
+    indicators: tuple[str, ...],
+    fingerprint: str,
+) -> None:
+    """Build and render only the panel in view.
+
+    Runs as a fragment, so switching panels or preparing an export reruns this
+    function alone rather than the whole page.
+    """
+
+    enriched = prices.frame
+    panels = [_PRICE_PANEL, "Momentum", "Tables", "Scenarios", "Export"]
+    if len(prices.tickers) >= 2:
+        panels.insert(2, "Correlation")
+    panel = st.radio(
+        "Panel", options=panels, horizontal=True, label_visibility="collapsed"
+    )
+    st.subheader(panel)
+    if panel == _PRICE_PANEL:
+        _render_price_panel(prices, ma_windows, indicators, fingerprint)
+    elif panel == "Momentum":
+        _render_momentum_panel(prices, returns, indicators, fingerprint)
+    elif panel == "Correlation":
+        _render_correlation_panel(enriched, fingerprint)
+    elif panel == "Tables":
+        with timed("app.render_tables"):
+            _render_tables(prices, returns)
+    elif panel == "Scenarios":
+        _render_scenarios(returns.frame)
+    else:
+        _render_export(enriched, fingerprint)
+
+
+@st.cache_resource(show_spinner=False)
+def _metrics_server() -> ThreadingHTTPServer | None:
+    """Expose ``/metrics`` once per process when a metrics port is configured.
+
+    Only one process can bind a shared ``metrics_port``; the others log a warning
+    and return ``None``, which is cached so they do not retry on every rerun.
+    """
+
+    settings = get_settings()
+    if settings.metrics_port is None:
+        return None
+    try:
+        return serve_metrics(settings.metrics_port)
+    except OSError as exc:
+        LOGGER.warning(
+            "Not serving /metrics on port %s: %s", settings.metrics_port, exc
+        )
+        return None
+
+
+def _render_timing_panel(spans: list[Span]) -> None:
+    """Optional sidebar breakdown of where this rerun spent its time."""
+
+    settings = get_settings()
+    if not st.sidebar.toggle(
+        "Show timing panel",
+        value=settings.debug_timings,
+        help="Per-stage wall time, rows and bytes for this page render.",
+    ):
+        return
+    table = pd.DataFrame(
+        {
+            "stage": [" ".join([span.stage, *span.labels.values()]) for span in spans],
+            "ms": [round(span.seconds * 1000, 1) for span in spans],
+            "rows": [span.rows for span in spans],
+            "bytes": [span.bytes for span in spans],
+        }
+    )
+    with st.sidebar.expander("Timing breakdown", expanded=True):
+        st.dataframe(table, hide_index=True, use_container_width=True)
+        render = next((span for span in spans if span.stage == "app.render"), None)
+        if render is not None:
+            st.caption(f"Whole render: {render.seconds * 1000:,.1f} ms")
+        stats = _derived_cache().stats()
+        st.caption(
+            f"Derived cache: {stats.entries} entries, "
+            f"{stats.bytes / 1024**2:,.1f} of {stats.max_bytes / 1024**2:,.0f} MB, "
+            f"{stats.hit_rate:.0%} hit rate, {stats.evictions} evictions"
+        )
+
+
 def main() -> None:
+    """Render the dashboard while recording per-stage timings for this rerun."""
+
+    settings = get_settings()
+    _metrics_server()
+    with trace() as spans:
+        try:
+            with timed("app.render"):
+                _render_dashboard()
+        finally:
+            if settings.metrics_file is not None:
+                write_prometheus(settings.metrics_file)
+    _render_timing_panel(spans)
+
+
+def _render_dashboard() -> None:
     """Create the Streamlit layout and orchestrate data, analytics, and visuals."""
 
+    settings = get_settings()
     st.set_page_config(
         page_title="CCI Real-Time Commodity Dashboard",
         layout="wide",
@@ -167,11 +595,18 @@ def main() -> None:
     start_dt = dt.datetime.combine(start_date, dt.time.min)
     end_dt = dt.datetime.combine(end_date, dt.time.max)
 
+    intervals = ["5m", "15m", "1h", "4h", "1d", "1w"]
+    if settings.default_interval not in intervals:
+        intervals.append(settings.default_interval)
+        intervals.sort(key=interval_delta)
     interval = st.sidebar.selectbox(
         "Interval",
-        options=("5m", "1h", "1d"),
-        index=(0 if settings.default_interval == "5m" else 2),
-        help="Intraday intervals surface live context; daily favours broader trends.",
+        options=intervals,
+        index=intervals.index(settings.default_interval),
+        help=(
+            "Intraday intervals surface live context; daily favours broader trends. "
+            "Coarser intervals are built locally from bars already loaded."
+        ),
     )
 
     ma_choice = st.sidebar.multiselect(
@@ -182,6 +617,18 @@ def main() -> None:
     )
     ma_windows = _parse_moving_average_input(ma_choice)
 
+    indicators = tuple(
+        st.sidebar.multiselect(
+            "Indicators",
+            options=list(dict.fromkeys([*PRESETS, *settings.default_indicators])),
+            default=list(settings.default_indicators),
+            help=(
+                "EMA, Bollinger and VWAP overlay the price chart; RSI, MACD and ATR "
+                "appear under Momentum."
+            ),
+        )
+    )
+
     threshold = st.sidebar.slider(
         "Alert threshold (%)",
         min_value=0.5,
@@ -191,9 +638,51 @@ def main() -> None:
         help="Highlight contracts whose day move beats this threshold.",
     )
 
-    with st.spinner("Fetching market data..."):
+    # Tail refresh asks Yahoo for new bars directly, so only for native intervals.
+    live_refresh = interval in NATIVE_INTERVALS and interval != "1d"
+    live_refresh = live_refresh and st.sidebar.toggle(
+        "Live tail refresh",
+        value=True,
+        help="Keep the loaded bars and fetch only new ones when the cache expires.",
+    )
+
+    analytics: AnalyticsResult | None = None
+    ingestor = _stream_ingestor()
+    with st.spinner("Fetching market data..."), timed("app.load_prices"):
         try:
-            prices = load_price_data(tuple(tickers), start_dt, end_dt, interval)
+            if ingestor is not None:
+                # Streamed bars are already in memory; no network call on render.
+                source = max(
+                    (
+                        item
+                        for item in ingestor.intervals
+                        if derives_from(item, interval)
+                    ),
+                    key=interval_delta,
+                )
+                prices = ingestor.frame(tickers, source, start_dt, end_dt)
+                if source != interval:
+                    prices = resample_bars(prices, interval)
+                st.caption("📡 Prices aggregated from the live stream.")
+            elif live_refresh:
+                prices, analytics = _load_live_frame(
+                    tuple(tickers), start_dt, end_dt, interval, ma_windows
+                )
+            else:
+                cached = load_price_data_cached(
+                    tuple(tickers), start_dt, end_dt, interval
+                )
+                prices = cached.value
+                if cached.stale:
+                    st.caption(
+                        f"⏳ Showing data from {_format_age(cached.age)} ago while "
+                        "a refresh runs in the background."
+                    )
+                if cached.refresh_error is not None:
+                    st.warning(
+                        "The latest refresh failed, so these prices may be out of "
+                        f"date: {cached.refresh_error}",
+                    )
         except DataDownloadError as error:
             st.error(
                 "Unable to download data from Yahoo Finance. "
@@ -206,36 +695,38 @@ def main() -> None:
         st.info("No data returned for the given filters. Adjust the range or interval.")
         st.stop()
 
-    enriched = add_moving_averages(prices, ma_windows)
-    returns = compute_daily_returns(prices)
-    changes = daily_change(prices)
+    missing = [ticker for ticker in tickers if ticker not in set(prices["ticker"])]
+    if missing:
+        st.warning(
+            f"No data for {', '.join(missing)}; showing the remaining commodities.",
+        )
 
-    latest_rows = (
-        enriched.sort_values("datetime")
-        .groupby("ticker", group_keys=False)
-        .tail(1)
-        .set_index("ticker")
+    # Reruns that only touch e.g. the alert threshold reuse every derived value.
+    derived = _derived_cache()
+    fingerprint = derived.fingerprint(prices)
+    if analytics is None:
+        analytics = derived.analytics(prices, ma_windows)
+    enriched, returns, changes = (
+        analytics.enriched,
+        analytics.returns,
+        analytics.changes,
     )
+    if indicators:
+        enriched = derived.get(
+            ("indicators", fingerprint, ma_windows, indicators),
+            lambda: compute_indicators(analytics.enriched, indicators),
+        )
 
-    _render_kpis(latest_rows, changes, threshold)
-
-    st.subheader("Price action")
-    st.caption("Visualise how each contract trades versus its moving averages.")
-    price_fig = price_chart(enriched, ma_windows)
-    st.plotly_chart(price_fig, use_container_width=True)
-
-    st.subheader("Momentum snapshot")
-    st.caption("Bar chart emphasises cross-commodity swings for the selected window.")
-    returns_fig = returns_chart(returns)
-    st.plotly_chart(returns_fig, use_container_width=True)
+    indexed = derived.get(
+        ("indexed", fingerprint, ma_windows, indicators),
+        lambda: IndexedPrices(enriched),
+    )
+    latest_rows = indexed.latest(1).set_index("ticker")
 
-    _render_tables(enriched, returns)
+    _render_kpis(latest_rows, changes, threshold)
 
-    st.download_button(
-        label="Download latest dataset (CSV)",
-        data=enriched.to_csv(index=False).encode("utf-8"),
-        file_name="cci_commodities.csv",
-        mime="text/csv",
+    _render_panels(
+        indexed, indexed.aligned(returns), ma_windows, indicators, fingerprint
     )
 
     with st.expander("Need a refresher?", expanded=False):
@@ -0,0 +1,70 @@
+"""Previous reshaping implementations, kept verbatim as a benchmark baseline.
+
+These are the ``_prepare_index``/``_normalise_columns`` bodies from before the
+block-array rewrite in :mod:`src.data`. They are only used to time the rewrite
+against and to check that both produce the same tidy frame.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+
+import pandas as pd
+
+_REQUIRED_COLUMNS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+_TIDY_COLUMNS = (
+    "ticker",
+    "datetime",
+    "open",
+    "high",
+    "low",
+    "close",
+    "adj_close",
+    "volume",
+)
+
+
+def prepare_index(data: pd.DataFrame, tickers: Sequence[str]) -> pd.DataFrame:
+    if isinstance(data.columns, pd.MultiIndex):
+        tidy = (
+            data.stack(level=1, future_stack=True)
+            .rename_axis(index=["datetime", "ticker"])
+            .reset_index()
+        )
+    else:
+        tidy = (
+            data.reset_index()
+            .assign(ticker=tickers[0])
+            .rename(columns={data.index.name or "Date": "datetime"})
+        )
+    return tidy
+
+
+def normalise_columns(tidy: pd.DataFrame) -> pd.DataFrame:
+    column_map = {
+        "Open": "open",
+        "High": "high",
+        "Low": "low",
+        "Close": "close",
+        "Adj Close": "adj_close",
+        "Volume": "volume",
+    }
+    missing = [col for col in _REQUIRED_COLUMNS if col not in tidy.columns]
+    if missing:
+        raise ValueError(f"Missing columns in price data: {missing}")
+
+    renamed = tidy.rename(columns=column_map)
+    renamed["datetime"] = pd.to_datetime(renamed["datetime"], utc=True)
+
+    float_cols = ["open", "high", "low", "close", "adj_close"]
+    for column in float_cols:
+        renamed[column] = pd.to_numeric(renamed[column], errors="coerce").astype(float)
+    renamed["volume"] = (
+        pd.to_numeric(renamed["volume"], errors="coerce").fillna(0).astype(int)
+    )
+
+    renamed = renamed.sort_values(["ticker", "datetime"]).reset_index(drop=True)
+    return renamed[list(_TIDY_COLUMNS)]
+
+
+__all__ = ["normalise_columns", "prepare_index"]
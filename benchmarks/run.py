@@ -0,0 +1,248 @@
+"""Run the pipeline benchmarks and emit JSON results.
+
+Usage::
+
+    python -m benchmarks.run --tickers 10 --interval 5m --days 60 --output out.json
+
+Each case is timed ``--repeat`` times on identical synthetic input; the JSON keeps
+the parameters, library versions and per-case statistics so results from
+different releases can be diffed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+from collections.abc import Callable
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+import plotly
+
+from src import analytics, data, export, indicators, montecarlo, plotting
+from src.frames import compact_prices, memory_report
+
+from . import legacy
+from .synthetic import synthetic_download
+
+
+@dataclass(frozen=True)
+class BenchmarkResult:
+    """Timing statistics for one benchmark case, in seconds."""
+
+    name: str
+    rows: int
+    repeat: int
+    min: float
+    median: float
+    mean: float
+    max: float
+
+
+def _time(
+    name: str, func: Callable[[], Any], rows: int, repeat: int
+) -> BenchmarkResult:
+    func()  # Warm-up: first calls pay import/allocation costs we do not track.
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - started)
+    return BenchmarkResult(
+        name=name,
+        rows=rows,
+        repeat=repeat,
+        min=min(samples),
+        median=statistics.median(samples),
+        mean=statistics.fmean(samples),
+        max=max(samples),
+    )
+
+
+def build_cases(
+    tickers: int, interval: str, days: int, windows: tuple[int, ...], seed: int
+) -> list[tuple[str, Callable[[], Any], int]]:
+    """Prepare inputs once and return ``(name, callable, rows)`` benchmark cases."""
+
+    raw = synthetic_download(tickers, interval=interval, days=days, seed=seed)
+    symbols = list(raw.columns.get_level_values(1).unique())
+    tidy = data._prepare_index(raw, symbols)
+    prices = data._normalise_columns(tidy)
+    result = analytics.compute_analytics(prices, windows)
+    rows = len(prices)
+    model = montecarlo.estimate_model(result.returns)
+    paths = 100_000
+
+    return [
+        ("data._prepare_index", lambda: data._prepare_index(raw, symbols), rows),
+        ("data._normalise_columns", lambda: data._normalise_columns(tidy), rows),
+        (
+            "data.reshape_pipeline",
+            lambda: analytics.compute_analytics(
+                data._normalise_columns(data._prepare_index(raw, symbols)), windows
+            ),
+            rows,
+        ),
+        (
+            "legacy.reshape_pipeline",
+            lambda: analytics.compute_analytics(
+                legacy.normalise_columns(legacy.prepare_index(raw, symbols)), windows
+            ),
+            rows,
+        ),
+        (
+            "analytics.compute_analytics",
+            lambda: analytics.compute_analytics(prices, windows),
+            rows,
+        ),
+        (
+            "analytics.add_moving_averages",
+            lambda: analytics.add_moving_averages(prices, windows),
+            rows,
+        ),
+        (
+            "analytics.compute_daily_returns",
+            lambda: analytics.compute_daily_returns(prices),
+            rows,
+        ),
+        ("analytics.daily_change", lambda: analytics.daily_change(prices), rows),
+        (
+            "indicators.compute_presets",
+            lambda: indicators.compute_indicators(prices, indicators.PRESETS),
+            rows,
+        ),
+        (
+            "plotting.price_chart",
+            lambda: plotting.price_chart(result.enriched, windows),
+            rows,
+        ),
+        (
+            "plotting.price_chart_downsampled",
+            lambda: plotting.price_chart(result.enriched, windows, max_points=2000),
+            rows,
+        ),
+        (
+            "plotting.returns_chart",
+            lambda: plotting.returns_chart(result.returns),
+            rows,
+        ),
+        ("app.csv_export", lambda: export.to_bytes(result.enriched, "csv"), rows),
+        (
+            "app.parquet_export",
+            lambda: export.to_bytes(result.enriched, "parquet"),
+            rows,
+        ),
+        (
+            "montecarlo.scenario_risk_gbm",
+            lambda: montecarlo.scenario_risk(model, paths, 250, "gbm", seed=seed),
+            paths,
+        ),
+        (
+            "montecarlo.scenario_risk_bootstrap",
+            lambda: montecarlo.scenario_risk(model, paths, 250, "bootstrap", seed=seed),
+            paths,
+        ),
+    ]
+
+
+def session_memory(
+    tickers: int, interval: str, days: int, windows: tuple[int, ...], seed: int
+) -> dict[str, dict[str, int]]:
+    """Per-session footprint of the app's frames with the default and compact schema."""
+
+    raw = synthetic_download(tickers, interval=interval, days=days, seed=seed)
+    symbols = list(raw.columns.get_level_values(1).unique())
+    prices = data._normalise_columns(data._prepare_index(raw, symbols))
+    footprint = {}
+    for schema, frame in (("default", prices), ("compact", compact_prices(prices))):
+        result = analytics.compute_analytics(frame, windows)
+        report = memory_report(
+            {
+                "prices": frame,
+                "enriched": result.enriched,
+                "returns": result.returns,
+            }
+        )
+        footprint[schema] = {
+            "total_bytes": report.total_bytes,
+            "unique_bytes": report.unique_bytes,
+        }
+    return footprint
+
+
+def run(
+    tickers: int = 10,
+    interval: str = "1d",
+    days: int = 250,
+    windows: tuple[int, ...] = (20, 50),
+    repeat: int = 5,
+    seed: int = 7,
+    only: str | None = None,
+) -> dict[str, Any]:
+    """Run every case (optionally filtered by substring) and return a report."""
+
+    cases = build_cases(tickers, interval, days, windows, seed)
+    results = [
+        _time(name, func, rows, repeat)
+        for name, func, rows in cases
+        if only is None or only in name
+    ]
+    return {
+        "params": {
+            "tickers": tickers,
+            "interval": interval,
+            "days": days,
+            "windows": list(windows),
+            "repeat": repeat,
+            "seed": seed,
+        },
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "numpy": np.__version__,
+            "pandas": pd.__version__,
+            "plotly": plotly.__version__,
+        },
+        "results": [asdict(result) for result in results],
+        "memory": session_memory(tickers, interval, days, windows, seed),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--tickers", type=int, default=10)
+    parser.add_argument("--interval", default="1d", choices=("5m", "15m", "1h", "1d"))
+    parser.add_argument("--days", type=int, default=250)
+    parser.add_argument("--windows", type=int, nargs="+", default=[20, 50])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--only", help="Run cases whose name contains this text.")
+    parser.add_argument("--output", type=Path, help="Write JSON here (default stdout).")
+    args = parser.parse_args(argv)
+
+    report = run(
+        tickers=args.tickers,
+        interval=args.interval,
+        days=args.days,
+        windows=tuple(args.windows),
+        repeat=args.repeat,
+        seed=args.seed,
+        only=args.only,
+    )
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(payload + "\n", encoding="utf-8")
+    else:
+        sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,149 @@
+"""Measure cold import time of the app and headless entry points.
+
+Usage::
+
+    python -m benchmarks.startup --repeat 5 --output startup.json
+
+Each module is imported in a fresh interpreter under ``python -X importtime``; the
+report keeps the cumulative import time of the target, the wall time of the
+whole process and the heaviest modules it pulled in, taking the fastest of
+``--repeat`` runs so results are comparable across releases.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import re
+import subprocess
+import sys
+import time
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any
+
+DEFAULT_MODULES = ("app", "src.cli", "src.data", "src.analytics")
+_ROOT = Path(__file__).resolve().parent.parent
+_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+@dataclass(frozen=True)
+class ImportRecord:
+    """One ``-X importtime`` line, in microseconds."""
+
+    name: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+@dataclass(frozen=True)
+class StartupResult:
+    """Import profile of one module."""
+
+    module: str
+    cumulative_ms: float
+    wall_ms: float
+    modules_loaded: int
+    heaviest: list[dict[str, float]]
+
+
+def parse_importtime(stderr: str) -> list[ImportRecord]:
+    """Records from ``-X importtime`` output; other lines are ignored."""
+
+    records = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match is None:
+            continue
+        self_us, cumulative_us, indent, name = match.groups()
+        records.append(
+            ImportRecord(
+                name=name,
+                self_us=int(self_us),
+                cumulative_us=int(cumulative_us),
+                depth=(len(indent) - 1) // 2,
+            )
+        )
+    return records
+
+
+def profile_import(module: str) -> tuple[list[ImportRecord], float]:
+    """Import ``module`` in a fresh interpreter; return its records and wall ms."""
+
+    started = time.perf_counter()
+    result = subprocess.run(  # noqa: S603 - fixed interpreter and arguments.
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=_ROOT,
+    )
+    return parse_importtime(result.stderr), (time.perf_counter() - started) * 1000
+
+
+def measure(module: str, repeat: int = 3, top: int = 10) -> StartupResult:
+    """Fastest of ``repeat`` cold imports of ``module``."""
+
+    runs = []
+    for _ in range(max(1, repeat)):
+        records, wall_ms = profile_import(module)
+        total = next(
+            (record.cumulative_us for record in records if record.name == module), 0
+        )
+        runs.append((total, wall_ms, records))
+    best_total, wall_ms, records = min(runs, key=lambda run: run[0])
+    # Top-level packages only: their cumulative time includes submodules.
+    roots = [record for record in records if "." not in record.name]
+    heaviest = sorted(roots, key=lambda record: record.cumulative_us, reverse=True)
+    return StartupResult(
+        module=module,
+        cumulative_ms=round(best_total / 1000, 1),
+        wall_ms=round(wall_ms, 1),
+        modules_loaded=len(records),
+        heaviest=[
+            {
+                "name": record.name,
+                "cumulative_ms": round(record.cumulative_us / 1000, 1),
+            }
+            for record in heaviest[:top]
+            if record.name != module
+        ],
+    )
+
+
+def run(
+    modules: tuple[str, ...] = DEFAULT_MODULES, repeat: int = 3, top: int = 10
+) -> dict[str, Any]:
+    """Profile every module and return a JSON-serialisable report."""
+
+    return {
+        "parameters": {"repeat": repeat, "top": top},
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+        },
+        "results": [asdict(measure(module, repeat, top)) for module in modules],
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--top", type=int, default=10)
+    parser.add_argument("--output", type=Path, help="Write JSON here (default stdout).")
+    args = parser.parse_args(argv)
+
+    report = run(tuple(args.modules), repeat=args.repeat, top=args.top)
+    payload = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(payload + "\n", encoding="utf-8")
+    else:
+        sys.stdout.write(payload + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,75 @@
+"""Deterministic synthetic market data shaped like ``yfinance.download`` output."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+_FIELDS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+_BARS_PER_DAY = {"5m": 78, "15m": 26, "1h": 7, "1d": 1}
+_FREQ = {"5m": "5min", "15m": "15min", "1h": "1h", "1d": "1D"}
+
+
+def synthetic_tickers(count: int) -> list[str]:
+    """Return ``count`` stable placeholder symbols (``SYN000=F``, ...)."""
+
+    return [f"SYN{index:03d}=F" for index in range(count)]
+
+
+def _session_index(interval: str, days: int, start: str) -> pd.DatetimeIndex:
+    """Business-day sessions starting 14:30 UTC with ``interval`` bars each."""
+
+    if interval not in _BARS_PER_DAY:
+        raise ValueError(f"Unsupported synthetic interval: {interval}")
+    sessions = pd.bdate_range(start, periods=days)
+    if interval == "1d":
+        return sessions.tz_localize("UTC")
+    offsets = pd.timedelta_range(
+        "14h30min", periods=_BARS_PER_DAY[interval], freq=_FREQ[interval]
+    )
+    stamps = sessions.to_numpy()[:, None] + offsets.to_numpy()[None, :]
+    return pd.DatetimeIndex(stamps.ravel(), tz="UTC")
+
+
+def synthetic_download(
+    tickers: int | list[str] = 5,
+    interval: str = "1d",
+    days: int = 250,
+    seed: int = 7,
+    start: str = "2024-01-01",
+) -> pd.DataFrame:
+    """Generate a ``(field, ticker)`` MultiIndex frame like ``yf.download``.
+
+    Prices follow a seeded geometric random walk per ticker so repeated runs (and
+    different machines) benchmark identical inputs.
+    """
+
+    symbols = synthetic_tickers(tickers) if isinstance(tickers, int) else tickers
+    index = _session_index(interval, days, start)
+    rng = np.random.default_rng(seed)
+    rows, width = len(index), len(symbols)
+
+    log_steps = rng.normal(0.0, 0.002, size=(rows, width))
+    close = 50.0 * (1 + np.arange(width)) * np.exp(np.cumsum(log_steps, axis=0))
+    open_ = np.vstack([close[:1], close[:-1]])
+    spread = np.abs(rng.normal(0.0, 0.001, size=(rows, width))) * close
+    high = np.maximum(open_, close) + spread
+    low = np.minimum(open_, close) - spread
+    volume = rng.integers(100, 10_000, size=(rows, width))
+
+    blocks = {
+        "Open": open_,
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Adj Close": close,
+        "Volume": volume,
+    }
+    columns = pd.MultiIndex.from_product([_FIELDS, symbols])
+    values = np.hstack([blocks[field].astype(float) for field in _FIELDS])
+    frame = pd.DataFrame(values, index=index, columns=columns)
+    frame.index.name = "Date" if interval == "1d" else "Datetime"
+    return frame
+
+
+__all__ = ["synthetic_download", "synthetic_tickers"]
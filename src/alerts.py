@@ -0,0 +1,298 @@
+"""Headless threshold alerts evaluated independently of the Streamlit page.
+
+An :class:`AlertEngine` compiles many per-trader :class:`AlertRule` objects into
+flat NumPy arrays once, then checks every rule against the latest per-ticker move
+(:func:`src.analytics.daily_change`) in one vectorised pass per new bar. Each rule
+has hysteresis: after firing it stays quiet until the move falls back below its
+re-arm level, and an optional cooldown limits how often it can fire at all.
+Triggered alerts go to pluggable :class:`AlertSink` objects; the file and memory
+sinks stand in for the roadmap's email/SMS service.
+
+Run ``python -m src.alerts --rules rules.json --output alerts.jsonl`` for a polling
+loop that reuses the data layer.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import threading
+import time
+from collections.abc import Sequence
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+import pandas as pd
+
+from .analytics import daily_change
+from .config import get_settings
+from .data import DataDownloadError, fetch_prices_report
+from .providers import concat_prices
+
+LOGGER = logging.getLogger(__name__)
+
+_DIRECTIONS = {"up": 0, "down": 1, "both": 2}
+
+
+@dataclass(frozen=True)
+class AlertRule:
+    """Fire when ``ticker`` moves at least ``threshold`` (a fraction, 0.03 = 3%).
+
+    ``direction`` is ``"up"``, ``"down"`` or ``"both"``. ``rearm`` is the move the
+    ticker must fall back below before the rule can fire again; it defaults to the
+    engine's ``rearm_ratio`` times ``threshold``.
+    """
+
+    rule_id: str
+    owner: str
+    ticker: str
+    threshold: float
+    direction: str = "both"
+    rearm: float | None = None
+
+
+@dataclass(frozen=True)
+class Alert:
+    """One rule firing."""
+
+    rule_id: str
+    owner: str
+    ticker: str
+    change: float
+    threshold: float
+    triggered_at: pd.Timestamp
+
+    def to_record(self) -> dict[str, object]:
+        record = asdict(self)
+        record["triggered_at"] = self.triggered_at.isoformat()
+        return record
+
+
+class AlertSink(Protocol):
+    """Destination for triggered alerts."""
+
+    def send(self, alerts: Sequence[Alert]) -> None:
+        """Deliver one evaluation cycle's alerts."""
+
+
+class MemorySink:
+    """Collect alerts in memory (tests, in-process consumers)."""
+
+    def __init__(self) -> None:
+        self.alerts: list[Alert] = []
+
+    def send(self, alerts: Sequence[Alert]) -> None:
+        self.alerts.extend(alerts)
+
+
+class JsonLinesSink:
+    """Append alerts to a JSON-lines file, one object per alert."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    def send(self, alerts: Sequence[Alert]) -> None:
+        if not alerts:
+            return
+        lines = "".join(json.dumps(alert.to_record()) + "\n" for alert in alerts)
+        with self._lock, self.path.open("a", encoding="utf-8") as handle:
+            handle.write(lines)
+
+
+class AlertEngine:
+    """Evaluate thousands of threshold rules per cycle with shared hysteresis state."""
+
+    def __init__(
+        self,
+        rules: Sequence[AlertRule],
+        sinks: Sequence[AlertSink] = (),
+        rearm_ratio: float = 0.8,
+        cooldown: pd.Timedelta | None = None,
+    ) -> None:
+        if not 0.0 <= rearm_ratio <= 1.0:
+            raise ValueError("rearm_ratio must be between 0 and 1.")
+        unknown = {rule.direction for rule in rules}.difference(_DIRECTIONS)
+        if unknown:
+            raise ValueError(f"Unknown alert directions: {sorted(unknown)}")
+        self.rules = list(rules)
+        self.sinks = list(sinks)
+        self.cooldown = cooldown
+
+        tickers, self._codes = np.unique(
+            np.array([rule.ticker for rule in self.rules], dtype=object),
+            return_inverse=True,
+        )
+        self._tickers = pd.Index(tickers)
+        self._threshold = np.array([rule.threshold for rule in self.rules], dtype=float)
+        self._rearm = np.array(
+            [
+                rule.threshold * rearm_ratio if rule.rearm is None else rule.rearm
+                for rule in self.rules
+            ],
+            dtype=float,
+        )
+        self._direction = np.array(
+            [_DIRECTIONS[rule.direction] for rule in self.rules], dtype=np.int8
+        )
+        self._armed = np.ones(len(self.rules), dtype=bool)
+        # Epoch nanoseconds as float: -inf means "never fired" without overflow.
+        self._last_fired = np.full(len(self.rules), -np.inf)
+
+    def reset(self) -> None:
+        """Re-arm every rule and forget cooldowns."""
+
+        self._armed[:] = True
+        self._last_fired[:] = -np.inf
+
+    def _moves(self, changes: pd.Series) -> tuple[np.ndarray, np.ndarray]:
+        """Per-rule move and the signed measure each rule compares to its threshold.
+
+        Both are NaN where the rule's ticker has no data.
+        """
+
+        per_ticker = changes.reindex(self._tickers).to_numpy(dtype=float)
+        move = per_ticker[self._codes]
+        measure = np.select(
+            [self._direction == 0, self._direction == 1], [move, -move], np.abs(move)
+        )
+        return move, measure
+
+    def evaluate(
+        self, changes: pd.Series, at: pd.Timestamp | None = None
+    ) -> list[Alert]:
+        """Check every rule against ``changes`` (ticker -> fractional move).
+
+        Returns (and sends to every sink) the alerts that fired this cycle. Rules
+        whose ticker is missing from ``changes`` keep their state untouched.
+        """
+
+        at = pd.Timestamp.now(tz="UTC") if at is None else pd.Timestamp(at)
+        move, measure = self._moves(changes)
+        known = ~np.isnan(measure)
+        breach = known & (measure >= self._threshold)
+        fire = breach & self._armed
+        if self.cooldown is not None:
+            fire &= at.value - self._last_fired >= self.cooldown.value
+
+        self._armed &= ~fire
+        self._armed |= known & (measure < self._rearm)
+        self._last_fired[fire] = at.value
+
+        fired = np.flatnonzero(fire)
+        alerts = [
+            Alert(
+                rule_id=self.rules[index].rule_id,
+                owner=self.rules[index].owner,
+                ticker=self.rules[index].ticker,
+                change=float(move[index]),
+                threshold=float(self._threshold[index]),
+                triggered_at=at,
+            )
+            for index in fired
+        ]
+        if alerts:
+            for sink in self.sinks:
+                sink.send(alerts)
+        return alerts
+
+    def evaluate_prices(
+        self, price_frame: pd.DataFrame, at: pd.Timestamp | None = None
+    ) -> list[Alert]:
+        """Evaluate against the latest bar-over-bar move in a tidy price frame."""
+
+        if at is None and not price_frame.empty:
+            at = pd.Timestamp(price_frame["datetime"].max())
+        return self.evaluate(daily_change(price_frame), at)
+
+
+def load_rules(path: str | Path) -> list[AlertRule]:
+    """Read rules from a JSON list of :class:`AlertRule` field mappings."""
+
+    with Path(path).open(encoding="utf-8") as handle:
+        return [AlertRule(**record) for record in json.load(handle)]
+
+
+def fetch_rule_prices(
+    tickers: Sequence[str],
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    interval: str,
+) -> pd.DataFrame:
+    """Download ``tickers`` in chunks of at most ``max_tickers``, like the CLI.
+
+    Tickers that fail are logged and left out; rules on them keep their state.
+    Raises :class:`~src.data.DataDownloadError` if no ticker returned prices.
+    """
+
+    limit = get_settings().max_tickers
+    frames = []
+    for offset in range(0, len(tickers), limit):
+        result = fetch_prices_report(
+            tickers[offset : offset + limit], start=start, end=end, interval=interval
+        )
+        for failure in result.failures.values():
+            LOGGER.warning("No prices for %s: %s", failure.ticker, failure.reason)
+        frames.append(result.prices)
+    prices = concat_prices(frames)
+    if prices.empty:
+        raise DataDownloadError("No prices returned for any rule ticker.")
+    return prices
+
+
+def main(argv: list[str] | None = None) -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rules", required=True, help="JSON file of alert rules.")
+    parser.add_argument("--output", required=True, help="JSON-lines alert log.")
+    parser.add_argument("--interval", default=settings.default_interval)
+    parser.add_argument("--lookback-days", type=int, default=5)
+    parser.add_argument(
+        "--period",
+        type=float,
+        default=float(settings.cache_ttl_seconds),
+        help="Seconds between evaluation cycles.",
+    )
+    parser.add_argument("--once", action="store_true", help="Evaluate a single cycle.")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s"
+    )
+    rules = load_rules(args.rules)
+    engine = AlertEngine(rules, sinks=[JsonLinesSink(args.output)])
+    tickers = sorted({rule.ticker for rule in rules})
+    while True:
+        end = pd.Timestamp.now(tz="UTC")
+        start = (end - pd.Timedelta(days=args.lookback_days)).normalize()
+        try:
+            prices = fetch_rule_prices(tickers, start, end, args.interval)
+            fired = engine.evaluate_prices(prices)
+        except Exception:  # noqa: BLE001 - one failed poll must not stop the monitor.
+            LOGGER.exception("Alert cycle failed; retrying in %.0fs", args.period)
+            if args.once:
+                return 1
+        else:
+            LOGGER.info("Evaluated %s rules, %s alerts", len(rules), len(fired))
+            if args.once:
+                return 0
+        time.sleep(args.period)
+
+
+__all__ = [
+    "Alert",
+    "AlertEngine",
+    "AlertRule",
+    "AlertSink",
+    "JsonLinesSink",
+    "MemorySink",
+    "fetch_rule_prices",
+    "load_rules",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,31 +3,252 @@
 from __future__ import annotations
 
 from collections.abc import Iterable, Sequence
+from dataclasses import dataclass
 
 import numpy as np
 import pandas as pd
 
+from .frames import (
+    is_marked_sorted,
+    is_sorted,
+    mark_sorted,
+    per_row,
+    splice_tail,
+    ticker_codes,
+)
+from .metrics import instrument
+
 _REQUIRED_COLUMNS = {"ticker", "datetime", "adj_close", "close"}
 
 
-def _validate_frame(
+def _sorted_with_codes(
     price_frame: pd.DataFrame, required: Sequence[str] | None = None
-) -> pd.DataFrame:
-    """Ensure the dataframe contains the columns we rely on and is sorted.
-
-    Returning a sorted copy keeps downstream analytics deterministic while leaving
-    the caller's dataframe untouched (important for Streamlit state caching).
-    """
+) -> tuple[pd.DataFrame, np.ndarray]:
+    """Validate and sort ``price_frame`` once, returning it with ticker codes."""
 
     required = set(required or _REQUIRED_COLUMNS)
     missing = required.difference(price_frame.columns)
     if missing:
         raise ValueError(f"Dataframe is missing required columns: {sorted(missing)}")
 
+    if is_marked_sorted(price_frame):
+        # Trust the data layer's marker and skip the ordering check entirely.
+        codes, _ = pd.factorize(price_frame["ticker"], sort=False)
+        return mark_sorted(price_frame.copy(deep=False)), codes
+
+    codes, ordered = ticker_codes(price_frame["ticker"])
+    if is_sorted(price_frame, codes, ordered):
+        sorted_frame = price_frame.copy(deep=False)
+        if not isinstance(sorted_frame.index, pd.RangeIndex):
+            sorted_frame = sorted_frame.reset_index(drop=True)
+        return mark_sorted(sorted_frame), codes
+
     sorted_frame = price_frame.sort_values(["ticker", "datetime"]).reset_index(
         drop=True
     )
-    return sorted_frame
+    codes, _ = ticker_codes(sorted_frame["ticker"])
+    return mark_sorted(sorted_frame), codes
+
+
+def _validate_frame(
+    price_frame: pd.DataFrame, required: Sequence[str] | None = None
+) -> pd.DataFrame:
+    """Ensure the dataframe contains the columns we rely on and is sorted.
+
+    Returning a sorted copy keeps downstream analytics deterministic while leaving
+    the caller's dataframe untouched (important for Streamlit state caching). Frames
+    that are already ordered (the normal case for :func:`src.data.fetch_prices`
+    output) get a shallow copy instead of a full sort.
+    """
+
+    return _sorted_with_codes(price_frame, required)[0]
+
+
+def _segment_starts(codes: np.ndarray) -> np.ndarray:
+    """Return the row offset at which each ticker's contiguous block begins."""
+
+    if len(codes) == 0:
+        return np.empty(0, dtype=np.int64)
+    return np.flatnonzero(np.r_[True, codes[1:] != codes[:-1]])
+
+
+def _rolling_means(
+    values: np.ndarray, row_starts: np.ndarray, windows: Sequence[int]
+) -> dict[int, np.ndarray]:
+    """NaN-aware trailing means (``min_periods=1``) via cumulative-sum windows."""
+
+    valid = ~np.isnan(values)
+    dense = bool(valid.all())
+    sums = np.empty(len(values) + 1)
+    sums[0] = 0.0
+    np.cumsum(values if dense else np.where(valid, values, 0.0), out=sums[1:])
+    counts = None if dense else np.concatenate(([0], np.cumsum(valid)))
+    stop = np.arange(1, len(values) + 1)
+
+    means: dict[int, np.ndarray] = {}
+    for window in windows:
+        lo = np.maximum(stop - window, row_starts)
+        total = sums[stop] - sums[lo]
+        if counts is None:
+            # No gaps: the window length is simply the distance to its start.
+            means[window] = total / (stop - lo)
+            continue
+        count = counts[stop] - counts[lo]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means[window] = np.where(count > 0, total / np.maximum(count, 1), np.nan)
+    return means
+
+
+def _returns(values: np.ndarray, row_starts: np.ndarray) -> np.ndarray:
+    """Percentage change of forward-filled values, restarting at each ticker."""
+
+    positions = np.arange(len(values))
+    last_valid = np.where(~np.isnan(values), positions, -1)
+    np.maximum.accumulate(last_valid, out=last_valid)
+    last_valid[last_valid < row_starts] = -1
+    filled = np.where(last_valid >= 0, values[np.maximum(last_valid, 0)], np.nan)
+
+    previous = np.empty_like(filled)
+    previous[1:] = filled[:-1]
+    previous[positions == row_starts] = np.nan
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns = filled / previous - 1.0
+    returns[~np.isfinite(returns)] = 0.0
+    return returns
+
+
+def _latest_changes(values: np.ndarray, starts: np.ndarray) -> np.ndarray:
+    """Last bar-over-bar move per ticker (0 for one-row tickers or zero bases)."""
+
+    ends = np.r_[starts[1:], len(values)]
+    changes = np.zeros(len(starts))
+    has_prev = ends - starts >= 2
+    last = values[ends[has_prev] - 1]
+    prev = values[ends[has_prev] - 2]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        moves = np.where(prev == 0, 0.0, (last - prev) / prev)
+    changes[has_prev] = moves
+    return changes
+
+
+@dataclass(frozen=True)
+class AnalyticsResult:
+    """Outputs of :func:`compute_analytics` for one sorted price frame."""
+
+    enriched: pd.DataFrame
+    returns: pd.DataFrame
+    changes: pd.Series
+
+
+@instrument("analytics.compute")
+def compute_analytics(
+    price_frame: pd.DataFrame, windows: Iterable[int] = ()
+) -> AnalyticsResult:
+    """Compute moving averages, returns and latest change in one pass.
+
+    The frame is validated and sorted once, ticker segment boundaries are derived
+    from the sorted ``ticker`` column, and every metric is evaluated on the
+    underlying NumPy arrays with those boundaries instead of per-group Python
+    callbacks.
+    """
+
+    frame, codes = _sorted_with_codes(price_frame)
+    windows = sorted({int(window) for window in windows if int(window) > 0})
+
+    values = frame["adj_close"].to_numpy(dtype=float)
+    starts = _segment_starts(codes)
+    lengths = np.diff(np.r_[starts, len(frame)])
+    row_starts = np.repeat(starts, lengths)
+
+    for window, mean in _rolling_means(values, row_starts, windows).items():
+        frame[f"ma_{window}"] = mean
+
+    # Reference the sorted key columns rather than copying them per derived frame.
+    returns = pd.DataFrame(
+        {
+            "ticker": frame["ticker"],
+            "datetime": frame["datetime"],
+            "daily_return": _returns(values, row_starts),
+        },
+        copy=False,
+    )
+
+    changes = pd.Series(
+        _latest_changes(values, starts),
+        index=pd.Index(frame["ticker"].to_numpy()[starts], name="ticker"),
+        name="daily_change",
+    )
+    return AnalyticsResult(enriched=frame, returns=returns, changes=changes)
+
+
+@instrument("analytics.extend")
+def extend_analytics(
+    previous: AnalyticsResult, tail: pd.DataFrame, windows: Iterable[int] = ()
+) -> AnalyticsResult:
+    """Fold newly arrived bars into ``previous`` without recomputing history.
+
+    For each ticker in ``tail`` only the last ``max(windows)`` held rows (plus any
+    run of missing prices before them, so forward-filled returns agree) are fed to
+    :func:`compute_analytics` together with the new bars. The recomputed rows are
+    then spliced over ``previous``, making the work proportional to the number of
+    new bars. ``previous`` must have been computed with the same ``windows``.
+    """
+
+    windows = sorted({int(window) for window in windows if int(window) > 0})
+    if tail.empty:
+        return previous
+
+    history = previous.enriched
+    new_bars = _validate_frame(tail)
+    first_new = new_bars.groupby("ticker", sort=False, observed=True)["datetime"].min()
+    lookback = max(windows, default=1)
+    keys = history["ticker"].to_numpy()
+    prices = history["adj_close"].to_numpy(dtype=float)
+    stamps = history["datetime"]
+
+    context_blocks = []
+    for ticker, since in first_new.items():
+        lo = int(np.searchsorted(keys, ticker, side="left"))
+        hi = int(np.searchsorted(keys, ticker, side="right"))
+        cut = lo + int(stamps.iloc[lo:hi].searchsorted(since, side="left"))
+        start = max(lo, cut - lookback)
+        while start > lo and np.isnan(prices[start]):
+            start -= 1
+        context_blocks.append(history.iloc[start:cut][list(tail.columns)])
+    context_blocks.append(new_bars)
+    window_frame = pd.concat(
+        [block for block in context_blocks if not block.empty], ignore_index=True
+    )
+
+    recent = compute_analytics(window_frame, windows)
+    is_new = recent.enriched["datetime"] >= per_row(recent.enriched, first_new)
+    changes = previous.changes.copy()
+    changes = pd.concat(
+        [changes.drop(recent.changes.index, errors="ignore"), recent.changes]
+    ).sort_index()
+    changes.index.name = "ticker"
+    return AnalyticsResult(
+        enriched=splice_tail(history, recent.enriched.loc[is_new]),
+        returns=splice_tail(previous.returns, recent.returns.loc[is_new]),
+        changes=changes.rename("daily_change"),
+    )
+
+
+def moving_averages(
+    price_frame: pd.DataFrame, windows: Iterable[int]
+) -> dict[int, np.ndarray]:
+    """Trailing means per window, aligned with the ``(ticker, datetime)`` order.
+
+    Use this to add windows to an :class:`AnalyticsResult` without recomputing
+    the returns and changes it already holds.
+    """
+
+    frame, codes = _sorted_with_codes(price_frame)
+    windows = sorted({int(window) for window in windows if int(window) > 0})
+    starts = _segment_starts(codes)
+    row_starts = np.repeat(starts, np.diff(np.r_[starts, len(frame)]))
+    values = frame["adj_close"].to_numpy(dtype=float)
+    return _rolling_means(values, row_starts, windows)
 
 
 def compute_daily_returns(price_frame: pd.DataFrame) -> pd.DataFrame:
@@ -38,16 +259,7 @@ def compute_daily_returns(price_frame: pd.DataFrame) -> pd.DataFrame:
     percentage change to avoid dropping sparse intraday data.
     """
 
-    frame = _validate_frame(price_frame)
-    frame["adj_close"] = frame.groupby("ticker")["adj_close"].ffill()
-    returns = frame.copy()
-    returns["daily_return"] = (
-        returns.groupby("ticker")["adj_close"]
-        .pct_change()
-        .replace([np.inf, -np.inf], np.nan)
-    )
-    returns["daily_return"] = returns["daily_return"].fillna(0.0)
-    return returns[["ticker", "datetime", "daily_return"]]
+    return compute_analytics(price_frame).returns
 
 
 def add_moving_averages(
@@ -55,45 +267,24 @@ def add_moving_averages(
 ) -> pd.DataFrame:
     """Add moving-average columns (``ma_<window>``) to the dataframe copy."""
 
-    frame = _validate_frame(price_frame)
     windows = sorted({int(window) for window in windows if int(window) > 0})
     if not windows:
         raise ValueError("At least one positive moving-average window is required.")
-
-    enriched = frame.copy()
-    for window in windows:
-        column_name = f"ma_{window}"
-        enriched[column_name] = enriched.groupby("ticker", group_keys=False)[
-            "adj_close"
-        ].transform(lambda series, w=window: series.rolling(w, min_periods=1).mean())
-    return enriched
+    return compute_analytics(price_frame, windows).enriched
 
 
 def daily_change(price_frame: pd.DataFrame) -> pd.Series:
     """Return the latest day-over-day percentage change per ticker."""
 
-    frame = _validate_frame(price_frame)
-    latest_change = (
-        frame.groupby("ticker", group_keys=True)["adj_close"]
-        .apply(_latest_pct_change)
-        .rename("daily_change")
-    )
-    return latest_change
-
-
-def _latest_pct_change(series: pd.Series) -> float:
-    """Helper that computes the last percentage move for a ticker series."""
-
-    if len(series) < 2:
-        return 0.0
-    last, prev = series.iloc[-1], series.iloc[-2]
-    if prev == 0:
-        return 0.0
-    return float((last - prev) / prev)
+    return compute_analytics(price_frame).changes
 
 
 __all__ = [
+    "AnalyticsResult",
+    "compute_analytics",
+    "extend_analytics",
     "compute_daily_returns",
     "add_moving_averages",
     "daily_change",
+    "moving_averages",
 ]
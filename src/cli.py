@@ -0,0 +1,283 @@
+"""Headless batch jobs over the data and analytics layers.
+
+``python -m src.cli export --tickers-file universe.txt --output reports/`` runs the
+end-of-day analytics for hundreds of tickers without the UI's ``max_tickers``
+cap: tickers are processed in chunks of at most ``max_tickers`` on a bounded pool
+of workers, each chunk is downloaded with :func:`src.data.fetch_prices_report`,
+enriched with :func:`src.analytics.compute_analytics` and written straight to
+``interval=<i>/ticker=<t>/`` partitions, so memory stays bounded by the chunks in
+flight. Nothing on this path imports Streamlit.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from collections.abc import Callable, Iterable, Sequence
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+import pandas as pd
+
+from .analytics import compute_analytics
+from .config import get_settings
+from .data import FetchResult, fetch_prices_report
+from .export import EXPORT_FORMATS, partition_path, to_bytes
+from .metrics import timed
+
+LOGGER = logging.getLogger(__name__)
+
+Fetcher = Callable[..., FetchResult]
+
+
+@dataclass(frozen=True)
+class ChunkReport:
+    """Outcome of one exported chunk."""
+
+    tickers: tuple[str, ...]
+    rows: int
+    files: int
+    seconds: float
+    failed: dict[str, str] = field(default_factory=dict)
+
+
+@dataclass
+class ExportReport:
+    """Totals and throughput for an export run."""
+
+    tickers: int = 0
+    rows: int = 0
+    files: int = 0
+    chunks: int = 0
+    seconds: float = 0.0
+    failed: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds else 0.0
+
+    @property
+    def tickers_per_second(self) -> float:
+        return self.tickers / self.seconds if self.seconds else 0.0
+
+    def add(self, chunk: ChunkReport) -> None:
+        self.tickers += len(chunk.tickers)
+        self.rows += chunk.rows
+        self.files += chunk.files
+        self.chunks += 1
+        self.failed.update(chunk.failed)
+
+    def to_record(self) -> dict[str, object]:
+        return {
+            **asdict(self),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "tickers_per_second": round(self.tickers_per_second, 2),
+        }
+
+
+def _write_atomic(path: Path, payload: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    temp = path.with_name(f".{path.name}.tmp")
+    temp.write_bytes(payload)
+    os.replace(temp, path)
+
+
+def export_chunk(
+    tickers: Sequence[str],
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    interval: str,
+    windows: Sequence[int],
+    output: Path,
+    fmt: str = "parquet",
+    fetch: Fetcher | None = None,
+) -> ChunkReport:
+    """Download, enrich and write one chunk; failures are reported, not raised.
+
+    ``fetch`` defaults to :func:`src.data.fetch_prices_report`.
+    """
+
+    fetch = fetch or fetch_prices_report
+    started = time.perf_counter()
+    with timed("cli.export_chunk") as span:
+        result = fetch(tickers, start=start, end=end, interval=interval)
+        failed = {ticker: failure.reason for ticker, failure in result.failures.items()}
+        files = 0
+        if not result.prices.empty:
+            analytics = compute_analytics(result.prices, windows)
+            enriched = analytics.enriched.assign(
+                daily_return=analytics.returns["daily_return"].to_numpy()
+            )
+            for ticker, block in enriched.groupby("ticker", sort=False, observed=True):
+                path = partition_path(output, interval, str(ticker), fmt)
+                _write_atomic(path, to_bytes(block.reset_index(drop=True), fmt))
+                files += 1
+        span.rows = len(result.prices)
+    return ChunkReport(
+        tickers=tuple(tickers),
+        rows=len(result.prices),
+        files=files,
+        seconds=time.perf_counter() - started,
+        failed=failed,
+    )
+
+
+def export_analytics(
+    tickers: Iterable[str],
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    interval: str,
+    windows: Sequence[int],
+    output: str | Path,
+    fmt: str = "parquet",
+    chunk_size: int | None = None,
+    workers: int = 2,
+    fetch: Fetcher | None = None,
+) -> ExportReport:
+    """Export enriched analytics for any number of tickers, chunk by chunk.
+
+    ``chunk_size`` defaults to (and is capped at) ``max_tickers``. At most
+    ``workers`` chunks are downloaded and held in memory at once; each one is
+    written out and released before the next starts on that worker.
+    """
+
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {fmt!r}.")
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        raise ValueError("At least one ticker is required to export.")
+    limit = get_settings().max_tickers
+    chunk_size = min(chunk_size or limit, limit)
+    chunks = [tickers[i : i + chunk_size] for i in range(0, len(tickers), chunk_size)]
+    output = Path(output)
+
+    report = ExportReport()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(
+        max_workers=max(1, workers), thread_name_prefix="cli-export"
+    ) as executor:
+        futures = [
+            executor.submit(
+                export_chunk, chunk, start, end, interval, windows, output, fmt, fetch
+            )
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            chunk = future.result()
+            report.add(chunk)
+            report.seconds = time.perf_counter() - started
+            LOGGER.info(
+                "Chunk %s/%s: %s tickers, %s rows in %.1fs (%s failed); "
+                "%.0f rows/s overall",
+                report.chunks,
+                len(chunks),
+                len(chunk.tickers),
+                chunk.rows,
+                chunk.seconds,
+                len(chunk.failed),
+                report.rows_per_second,
+            )
+    report.seconds = time.perf_counter() - started
+    return report
+
+
+def read_tickers(path: str | Path) -> list[str]:
+    """One ticker per line; blank lines and ``#`` comments are ignored."""
+
+    lines = Path(path).read_text(encoding="utf-8").splitlines()
+    tickers = (line.split("#", 1)[0].strip() for line in lines)
+    return [ticker for ticker in tickers if ticker]
+
+
+def _export_command(args: argparse.Namespace) -> int:
+    tickers = list(args.tickers or [])
+    if args.tickers_file:
+        tickers.extend(read_tickers(args.tickers_file))
+    if not tickers:
+        tickers = list(get_settings().default_tickers)
+    end = pd.Timestamp(args.end, tz="UTC") if args.end else pd.Timestamp.now(tz="UTC")
+    start = (
+        pd.Timestamp(args.start, tz="UTC")
+        if args.start
+        else (end - pd.Timedelta(days=args.lookback_days)).normalize()
+    )
+    report = export_analytics(
+        tickers,
+        start=start,
+        end=end,
+        interval=args.interval,
+        windows=args.windows,
+        output=args.output,
+        fmt=args.format,
+        chunk_size=args.chunk_size,
+        workers=args.workers,
+    )
+    summary = json.dumps(report.to_record(), indent=2)
+    if args.report:
+        Path(args.report).write_text(summary + "\n", encoding="utf-8")
+    print(summary)
+    return 1 if report.failed else 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    export = commands.add_parser(
+        "export", help="Write enriched analytics as partitioned Parquet/CSV."
+    )
+    export.add_argument("--tickers", nargs="+", help="Tickers to export.")
+    export.add_argument("--tickers-file", help="File with one ticker per line.")
+    export.add_argument("--output", required=True, help="Output directory.")
+    export.add_argument("--format", choices=sorted(EXPORT_FORMATS), default="parquet")
+    export.add_argument("--interval", default=settings.default_interval)
+    export.add_argument("--start", help="Window start (default: --lookback-days).")
+    export.add_argument("--end", help="Window end (default: now).")
+    export.add_argument(
+        "--lookback-days", type=int, default=settings.default_lookback_days
+    )
+    export.add_argument(
+        "--windows",
+        type=int,
+        nargs="+",
+        default=list(settings.moving_average_windows),
+        help="Moving-average windows.",
+    )
+    export.add_argument(
+        "--chunk-size",
+        type=int,
+        help=f"Tickers per download (default and maximum: {settings.max_tickers}).",
+    )
+    export.add_argument(
+        "--workers", type=int, default=2, help="Chunks processed concurrently."
+    )
+    export.add_argument("--report", help="Also write the JSON summary here.")
+    export.set_defaults(handler=_export_command)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+        stream=sys.stderr,
+    )
+    return args.handler(args)
+
+
+__all__ = [
+    "ChunkReport",
+    "ExportReport",
+    "export_analytics",
+    "export_chunk",
+    "partition_path",
+    "read_tickers",
+]
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
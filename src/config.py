@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from pathlib import Path
 
 from pydantic import BaseSettings, Field, confloat, conint, validator
 
@@ -34,17 +35,161 @@ class DashboardSettings(BaseSettings):
     cache_ttl_seconds: conint(gt=0) = Field(
         300, description="TTL for Streamlit data cache to balance staleness and speed."
     )
+    swr_max_stale_seconds: conint(ge=0) = Field(
+        3600,
+        description=(
+            "How long past the TTL an expired price frame may still be served while "
+            "it is refreshed in the background."
+        ),
+    )
     data_fetch_retries: conint(ge=1) = Field(
         3, description="Retry attempts for transient yfinance failures."
     )
     data_fetch_backoff: confloat(gt=0) = Field(
-        1.5, description="Backoff multiplier between retry attempts."
+        1.5,
+        description=(
+            "Longest delay before the first retry; it doubles per attempt and the "
+            "actual delay is drawn at random below it."
+        ),
+    )
+    price_store_dir: Path | None = Field(
+        None,
+        description=(
+            "Directory for the on-disk Parquet bar store shared across workers and "
+            "restarts. Leave unset to download every window directly."
+        ),
+    )
+    shared_cache_dir: Path | None = Field(
+        None,
+        description=(
+            "Directory (ideally on tmpfs such as /dev/shm) for Arrow IPC price "
+            "frames shared by every Streamlit process on the host; one process "
+            "downloads each window and the others map it read-only."
+        ),
+    )
+    stream_replay_path: Path | None = Field(
+        None,
+        description=(
+            "JSON-lines event capture to ingest as a price stream. When set, the app "
+            "reads bars from the in-memory stream buffers instead of yfinance."
+        ),
+    )
+    stream_buffer_bars: conint(gt=0) = Field(
+        5000, description="Bars kept per ticker and interval by the stream ingestor."
+    )
+    fetch_chunk_size: conint(gt=0) = Field(
+        1,
+        description=(
+            "Tickers per upstream request; 1 isolates failures to a single symbol."
+        ),
+    )
+    fetch_max_workers: conint(gt=0) = Field(
+        8, description="Concurrent download jobs run by the fetch engine."
+    )
+    data_provider: str = Field(
+        "yfinance",
+        description=(
+            "Price source: yfinance, local (data_provider_dir) or http "
+            "(data_provider_url)."
+        ),
+        regex=r"^(yfinance|local|http)$",
+    )
+    data_provider_dir: Path | None = Field(
+        None,
+        description=(
+            "Directory of interval=<i>/ticker=<t>/part.{parquet,csv} files read by "
+            "the local provider, e.g. the output of python -m src.cli export."
+        ),
+    )
+    data_provider_url: str | None = Field(
+        None,
+        description="Base URL of the HTTP provider; bars are read from <url>/bars.",
+    )
+    http_max_per_host: conint(gt=0) = Field(
+        4, description="Pooled HTTP connections (and in-flight requests) per host."
+    )
+    circuit_failure_threshold: conint(ge=1) = Field(
+        5,
+        description=(
+            "Consecutive upstream failures that open the circuit; while it is open "
+            "downloads fail fast and cached prices are served."
+        ),
+    )
+    circuit_reset_seconds: confloat(gt=0) = Field(
+        30.0,
+        description="How long an open circuit waits before a single probe request.",
+    )
+    upstream_rate_limit: confloat(gt=0) = Field(
+        5.0, description="Process-wide upstream requests per second."
+    )
+    upstream_burst: conint(ge=1) = Field(
+        10, description="Requests allowed back to back before the rate limit applies."
+    )
+    fetch_timeout_seconds: confloat(gt=0) = Field(
+        20.0,
+        description="Per-attempt request timeout; slower tickers are reported failed.",
+    )
+    chart_max_points: conint(ge=4) = Field(
+        2000,
+        description=(
+            "Points kept per ticker in the price chart; about twice the chart's "
+            "pixel width preserves the visible shape."
+        ),
+    )
+    chart_downsample: str = Field(
+        "minmax",
+        description="Downsampling method for dense price charts.",
+        regex=r"^(minmax|lttb)$",
+    )
+    chart_webgl: bool = Field(
+        False, description="Render price lines with WebGL (Scattergl) traces."
+    )
+    compact_frames: bool = Field(
+        False,
+        description=(
+            "Store loaded prices with categorical tickers, float32 prices and 32-bit "
+            "volume to shrink per-session memory."
+        ),
+    )
+    derived_cache_mb: conint(gt=0) = Field(
+        256,
+        description=(
+            "Memory budget for memoised analytics and figures shared by all "
+            "sessions; least recently used entries are evicted beyond it."
+        ),
+    )
+    default_indicators: tuple[str, ...] = Field(
+        (),
+        description=(
+            "Indicator specs selected on load, e.g. ('ema:20', 'rsi:14'); see "
+            "src.indicators.parse_indicator for the syntax."
+        ),
+    )
+    correlation_window: conint(ge=2) = Field(
+        60, description="Trailing returns used for the cross-commodity correlation."
+    )
+    monte_carlo_workers: conint(ge=0) = Field(
+        1,
+        description=(
+            "Processes used for scenario simulation; 0 uses every core. Shards are "
+            "seeded independently, so results do not depend on this value."
+        ),
+    )
+    metrics_port: conint(gt=0, lt=65536) | None = Field(
+        None, description="Serve Prometheus metrics on localhost at this port."
+    )
+    metrics_file: Path | None = Field(
+        None,
+        description="Write Prometheus text metrics here after every page render.",
+    )
+    debug_timings: bool = Field(
+        False, description="Show the per-stage timing panel in the sidebar by default."
     )
     max_tickers: conint(gt=0) = Field(
         10,
         description=(
-            "Hard cap to avoid overwhelming the UI and Yahoo endpoints with "
-            "excessive simultaneous downloads."
+            "Hard cap to avoid overwhelming the UI. Downloads run per ticker on a "
+            "bounded pool (see fetch_max_workers), so larger universes are safe."
         ),
     )
 
@@ -0,0 +1,247 @@
+"""Cross-commodity analytics: rolling correlations, spreads and betas."""
+
+from __future__ import annotations
+
+from collections.abc import Sequence
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+_CHUNK_BYTES = 64 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class Panel:
+    """Tidy prices pivoted once into aligned ``(time x ticker)`` matrices.
+
+    ``prices`` is forward-filled per ticker on the union of timestamps; ``returns``
+    are simple returns of those prices and stay NaN where there is no previous
+    price (the first row and before a ticker's first print). Windowed statistics
+    use only the rows where every series involved has a return.
+    """
+
+    index: pd.DatetimeIndex
+    tickers: tuple[str, ...]
+    prices: np.ndarray
+    returns: np.ndarray
+
+    def column(self, ticker: str) -> int:
+        """Position of ``ticker`` in the matrices."""
+
+        try:
+            return self.tickers.index(ticker)
+        except ValueError as exc:
+            raise KeyError(f"Ticker not in panel: {ticker}") from exc
+
+
+def build_panel(price_frame: pd.DataFrame, column: str = "adj_close") -> Panel:
+    """Pivot ``price_frame`` into a :class:`Panel` without a pandas pivot."""
+
+    missing = {"ticker", "datetime", column}.difference(price_frame.columns)
+    if missing:
+        raise ValueError(f"Dataframe is missing required columns: {sorted(missing)}")
+
+    row_codes, index = pd.factorize(price_frame["datetime"], sort=True)
+    col_codes, tickers = pd.factorize(
+        np.asarray(price_frame["ticker"], dtype=object), sort=True
+    )
+    prices = np.full((len(index), len(tickers)), np.nan)
+    prices[row_codes, col_codes] = price_frame[column].to_numpy(dtype=float)
+    prices = pd.DataFrame(prices).ffill().to_numpy()
+
+    returns = np.full_like(prices, np.nan)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        returns[1:] = prices[1:] / prices[:-1] - 1.0
+    returns[np.isinf(returns)] = np.nan
+    return Panel(
+        index=pd.DatetimeIndex(index),
+        tickers=tuple(tickers),
+        prices=prices,
+        returns=returns,
+    )
+
+
+def _window_outer(
+    left: np.ndarray, right: np.ndarray, window: int, ends: np.ndarray
+) -> np.ndarray:
+    """Windowed ``sum(left_t^T right_t)`` over the rows ending at each of ``ends``.
+
+    Running prefix sums are advanced chunk by chunk, so each row costs one outer
+    product regardless of the window length and memory stays bounded by the chunk
+    size rather than ``T x a x b``. Window totals are differences of two prefixes.
+    """
+
+    shape = (left.shape[1], right.shape[1])
+    stops = ends + 1
+    starts = np.maximum(stops - window, 0)
+    # Rows before the earliest window never matter, so prefixes start there.
+    base = int(starts.min()) if len(starts) else 0
+    stop = int(stops.max()) if len(stops) else base
+    left, right = left[base:stop], right[base:stop]
+    wanted = np.unique(np.concatenate([starts, stops])) - base
+    slot = {int(position): idx for idx, position in enumerate(wanted)}
+
+    prefix = np.zeros((len(wanted), *shape))
+    running = np.zeros(shape)
+    chunk = max(1, _CHUNK_BYTES // (8 * shape[0] * shape[1]))
+
+    # Prefix position 0 (the first window start) is the zero matrix already in place.
+    cursor = 1
+    for lo in range(0, len(left), chunk):
+        hi = min(len(left), lo + chunk)
+        cum = np.cumsum(np.einsum("ti,tj->tij", left[lo:hi], right[lo:hi]), axis=0)
+        cum += running
+        while cursor < len(wanted) and wanted[cursor] <= hi:
+            prefix[cursor] = cum[wanted[cursor] - lo - 1]
+            cursor += 1
+        running = cum[-1]
+
+    take_stop = np.array([slot[int(position)] for position in stops - base])
+    take_start = np.array([slot[int(position)] for position in starts - base])
+    return prefix[take_stop] - prefix[take_start]
+
+
+def _window_moments(
+    returns: np.ndarray, window: int, ends: np.ndarray
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Pairwise windowed ``sum(x_i)``, ``sum(x_i^2)``, ``sum(x_i x_j)`` and counts.
+
+    Entry ``[k, i, j]`` of each array covers the rows of window ``k`` where both
+    ``i`` and ``j`` have a return, so missing returns drop out of the means and
+    counts instead of entering them as zeros. Windows without gaps take a single
+    ``(n + 1)``-wide outer product per row.
+    """
+
+    width = returns.shape[1]
+    valid = ~np.isnan(returns)
+    values = np.where(valid, returns, 0.0)
+    stops = ends + 1
+    used = valid[int(np.maximum(stops - window, 0).min()) : int(stops.max())]
+    if used.all():
+        augmented = np.hstack([values, np.ones((len(values), 1))])
+        outer = _window_outer(augmented, augmented, window, ends)
+        cross = outer[:, :width, :width]
+        full = cross.shape
+        sums = np.broadcast_to(outer[:, :width, width, None], full)
+        squares = np.broadcast_to(np.einsum("kii->ki", cross)[:, :, None], full)
+        counts = np.broadcast_to(outer[:, width, width, None, None], full)
+        return sums, squares, cross, counts
+
+    mask = valid.astype(float)
+    left = np.hstack([values, values * values, mask])
+    outer = _window_outer(left, np.hstack([values, mask]), window, ends)
+    cross = outer[:, :width, :width]
+    sums = outer[:, :width, width:]
+    squares = outer[:, width : 2 * width, width:]
+    counts = outer[:, 2 * width :, width:]
+    return sums, squares, cross, counts
+
+
+@dataclass(frozen=True)
+class RollingCorrelation:
+    """Correlation matrices for the windows ending at ``index``."""
+
+    index: pd.DatetimeIndex
+    tickers: tuple[str, ...]
+    matrices: np.ndarray
+
+    def frame(self, position: int = -1) -> pd.DataFrame:
+        """One matrix as a labelled dataframe (latest by default)."""
+
+        return pd.DataFrame(
+            self.matrices[position], index=self.tickers, columns=self.tickers
+        )
+
+
+def rolling_correlation(
+    panel: Panel, window: int, at: Sequence[int] | None = None, step: int = 1
+) -> RollingCorrelation:
+    """Rolling return correlation matrices from incremental moment updates.
+
+    ``at`` selects row positions whose trailing ``window`` is evaluated; otherwise
+    every ``step``-th row from the first full window onwards is used. The cost is
+    one ``n x n`` outer product per row plus one matrix per requested window,
+    instead of re-aggregating every window from scratch.
+    """
+
+    if window < 2:
+        raise ValueError("Correlation window must be at least 2 observations.")
+    steps = len(panel.index)
+    if at is None:
+        ends = np.arange(min(window, steps) - 1, steps, step)
+    else:
+        ends = np.asarray(at, dtype=np.int64) % max(steps, 1)
+    sums, squares, cross, counts = _window_moments(panel.returns, window, ends)
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+        other = means.swapaxes(1, 2)
+        cov = cross / counts - means * other
+        var = np.clip(squares / counts - means**2, 0.0, None)
+        other_var = np.clip(squares.swapaxes(1, 2) / counts - other**2, 0.0, None)
+        corr = cov / np.sqrt(var * other_var)
+    corr = np.where(counts >= 2, np.clip(corr, -1.0, 1.0), np.nan)
+    return RollingCorrelation(panel.index[ends], panel.tickers, corr)
+
+
+def latest_correlation(panel: Panel, window: int) -> pd.DataFrame:
+    """Correlation matrix over the most recent ``window`` returns."""
+
+    return rolling_correlation(panel, window, at=[-1]).frame()
+
+
+def _rolling_sum(values: np.ndarray, window: int) -> np.ndarray:
+    prefix = np.concatenate(([0.0], np.cumsum(values)))
+    stops = np.arange(1, len(values) + 1)
+    return prefix[stops] - prefix[np.maximum(stops - window, 0)]
+
+
+def rolling_beta(panel: Panel, ticker: str, benchmark: str, window: int) -> pd.Series:
+    """Rolling OLS beta of ``ticker`` returns on ``benchmark`` returns."""
+
+    y = panel.returns[:, panel.column(ticker)]
+    x = panel.returns[:, panel.column(benchmark)]
+    # Only rows where both returns exist count, as in ``rolling_correlation``.
+    both = ~(np.isnan(x) | np.isnan(y))
+    x, y = np.where(both, x, 0.0), np.where(both, y, 0.0)
+    counts = _rolling_sum(both.astype(float), window)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_x = _rolling_sum(x, window) / counts
+        mean_y = _rolling_sum(y, window) / counts
+        cov = _rolling_sum(x * y, window) / counts - mean_x * mean_y
+        var = _rolling_sum(x * x, window) / counts - mean_x**2
+        beta = np.where((var > 1e-18) & (counts >= 2), cov / var, np.nan)
+    beta[: min(window, len(beta)) - 1] = np.nan
+    return pd.Series(beta, index=panel.index, name=f"beta_{ticker}_{benchmark}")
+
+
+def pair_spread(
+    panel: Panel, first: str, second: str, window: int | None = None
+) -> pd.DataFrame:
+    """Price spread ``first - second`` (e.g. WTI vs Brent) with optional z-score."""
+
+    spread = (
+        panel.prices[:, panel.column(first)] - panel.prices[:, panel.column(second)]
+    )
+    result = pd.DataFrame({"datetime": panel.index, "spread": spread})
+    if window:
+        valid = ~np.isnan(spread)
+        filled = np.where(valid, spread, 0.0)
+        counts = _rolling_sum(valid.astype(float), window)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mean = _rolling_sum(filled, window) / counts
+            var = _rolling_sum(filled**2, window) / counts - mean**2
+            result["zscore"] = (spread - mean) / np.sqrt(np.clip(var, 0.0, None))
+    return result
+
+
+__all__ = [
+    "Panel",
+    "RollingCorrelation",
+    "build_panel",
+    "latest_correlation",
+    "pair_spread",
+    "rolling_beta",
+    "rolling_correlation",
+]
@@ -2,18 +2,59 @@
 
 from __future__ import annotations
 
+import asyncio
+import functools
+import importlib
 import logging
-import time
+import random
 from collections.abc import Iterable, Sequence
+from dataclasses import dataclass, field
 
+import numpy as np
 import pandas as pd
-import yfinance as yf
 
 from .config import get_settings
+from .frames import (
+    compact_prices,
+    is_marked_sorted,
+    mark_sorted,
+    per_row,
+    sort_prices,
+    splice_tail,
+)
+from .metrics import instrument, record_cache, timed
+from .providers import (
+    TIDY_COLUMNS,
+    HTTPProvider,
+    LocalFileProvider,
+    PriceProvider,
+    PriceRequest,
+    concat_prices,
+    run_sync,
+)
+from .pyramid import interval_delta
+from .resilience import CircuitBreaker, CircuitOpenError, GuardedProvider, TokenBucket
+from .store import BarStore, TimeRange, get_store, to_utc
 
 LOGGER = logging.getLogger(__name__)
 
+
+def _yfinance():
+    """Import yfinance on first download; it costs ~0.2s at startup otherwise."""
+
+    return importlib.import_module("yfinance")
+
+
+def __getattr__(name: str):
+    # Keeps ``data.yf`` working (e.g. ``monkeypatch.setattr(data.yf, ...)``)
+    # without importing yfinance along with this module.
+    if name == "yf":
+        return _yfinance()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 _REQUIRED_COLUMNS = ("Open", "High", "Low", "Close", "Adj Close", "Volume")
+_TIDY_COLUMNS = TIDY_COLUMNS
 
 
 class DataDownloadError(RuntimeError):
@@ -27,6 +68,28 @@ class DataDownloadError(RuntimeError):
         return self.message
 
 
+_COLUMN_MAP = {
+    "Open": "open",
+    "High": "high",
+    "Low": "low",
+    "Close": "close",
+    "Adj Close": "adj_close",
+    "Volume": "volume",
+}
+
+
+def _field_level(columns: pd.MultiIndex) -> int:
+    """Which MultiIndex level holds the OHLCV field names (the other is tickers).
+
+    ``group_by="ticker"`` yields ``(ticker, field)`` columns while the default
+    layout is ``(field, ticker)``; both reach this module.
+    """
+
+    fields = set(_REQUIRED_COLUMNS)
+    return 0 if fields & set(columns.get_level_values(0)) else 1
+
+
+@instrument("data.prepare_index")
 def _prepare_index(data: pd.DataFrame, tickers: Sequence[str]) -> pd.DataFrame:
     """Re-shape yfinance output into a tidy dataframe.
 
@@ -36,55 +99,618 @@ def _prepare_index(data: pd.DataFrame, tickers: Sequence[str]) -> pd.DataFrame:
         DataFrame returned by ``yfinance.download``.
     tickers:
         Tickers requested, used when the result is single-column.
+
+    MultiIndex input is reshaped straight from its value block: columns are
+    reordered to ``(field, ticker)`` with tickers ascending, converted to one NumPy
+    array and transposed so rows come out ticker-major. With a time-ordered index
+    the result is already sorted by ``(ticker, datetime)``, which
+    :func:`_normalise_columns` then only verifies.
     """
 
-    if isinstance(data.columns, pd.MultiIndex):
-        tidy = (
-            data.stack(level=1, future_stack=True)
-            .rename_axis(index=["datetime", "ticker"])
-            .reset_index()
-        )
-    else:
+    if not isinstance(data.columns, pd.MultiIndex):
         # yfinance returns a flat index for single tickers; pivot to match multi format.
-        tidy = (
+        return (
             data.reset_index()
             .assign(ticker=tickers[0])
             .rename(columns={data.index.name or "Date": "datetime"})
         )
+
+    field_level = _field_level(data.columns)
+    fields = list(dict.fromkeys(data.columns.get_level_values(field_level)))
+    symbols = sorted(set(data.columns.get_level_values(1 - field_level)))
+    # Field-major column order in both layouts, so the block reshapes the same way.
+    ordered = pd.MultiIndex.from_product([fields, symbols])
+    if field_level == 1:
+        ordered = ordered.swaplevel()
+    block = data.reindex(columns=ordered)
+
+    steps, width, count = len(block), len(fields), len(symbols)
+    values = block.to_numpy().reshape(steps, width, count)
+    values = values.transpose(2, 0, 1).reshape(count * steps, width)
+
+    tidy = pd.DataFrame(values, columns=fields)
+    # ``take`` keeps the tz-aware dtype; ``to_numpy`` would box every Timestamp.
+    tidy.insert(0, "datetime", block.index.take(np.tile(np.arange(steps), count)))
+    tidy.insert(1, "ticker", np.repeat(np.array(symbols, dtype=object), steps))
+    if block.index.is_monotonic_increasing:
+        mark_sorted(tidy)
     return tidy
 
 
+@instrument("data.normalise_columns")
 def _normalise_columns(tidy: pd.DataFrame) -> pd.DataFrame:
-    """Rename yfinance columns and ensure dtypes are consistent."""
-
-    column_map = {
-        "Open": "open",
-        "High": "high",
-        "Low": "low",
-        "Close": "close",
-        "Adj Close": "adj_close",
-        "Volume": "volume",
-    }
+    """Rename yfinance columns and ensure dtypes are consistent.
+
+    The OHLCV fields are converted in one block (``to_numeric`` runs only on
+    columns that are not numeric already), the sort is skipped when rows are
+    already ordered, and the result is marked pre-sorted for the analytics layer.
+    """
+
     missing = [col for col in _REQUIRED_COLUMNS if col not in tidy.columns]
     if missing:
         raise ValueError(f"Missing columns in price data: {missing}")
 
-    renamed = tidy.rename(columns=column_map)
-    renamed["datetime"] = pd.to_datetime(renamed["datetime"], utc=True)
+    raw = tidy[list(_REQUIRED_COLUMNS)]
+    if not all(pd.api.types.is_numeric_dtype(dtype) for dtype in raw.dtypes):
+        raw = raw.apply(pd.to_numeric, errors="coerce")
+    values = raw.to_numpy(dtype=float)
+    volume = values[:, -1]
+    volume = np.where(np.isnan(volume), 0, volume).astype(int)
+
+    stamps = tidy["datetime"]
+    if isinstance(stamps.dtype, pd.DatetimeTZDtype):
+        # Already tz-aware: convert directly (``to_datetime`` would scan for a cache).
+        stamps = stamps.dt.tz_convert("UTC")
+    else:
+        stamps = pd.to_datetime(stamps, utc=True)
+    columns = {"ticker": tidy["ticker"].to_numpy(), "datetime": stamps.array}
+    for position, source in enumerate(_REQUIRED_COLUMNS[:-1]):
+        columns[_COLUMN_MAP[source]] = values[:, position]
+    columns["volume"] = volume
+    normalised = pd.DataFrame(columns)
+    if is_marked_sorted(tidy):
+        # Same rows in the same order as the reshaped input: no need to re-check.
+        return mark_sorted(normalised)
+    return sort_prices(normalised)
+
+
+class YFinanceProvider:
+    """Yahoo Finance through ``yfinance.Ticker.history``, run on a worker thread.
+
+    yfinance has no asyncio API; each request blocks one thread of the fetch
+    loop's executor and is reshaped to the tidy schema there. ``yf.download`` is
+    avoided because it collects results in module-global dicts, so concurrent
+    calls from the fetch engine corrupt or mix each other's tickers. Real errors
+    are raised rather than returned as empty frames, which the bar store would
+    otherwise record as held.
+    """
+
+    name = "yfinance"
+
+    def _history(self, ticker: str, request: PriceRequest, timeout: float | None):
+        yf = _yfinance()
+        try:
+            return yf.Ticker(ticker).history(
+                start=request.start,
+                end=request.end,
+                interval=request.interval,
+                auto_adjust=False,
+                actions=False,
+                timeout=timeout,
+                raise_errors=True,
+            )
+        except yf.exceptions.YFPricesMissingError:
+            return None  # No bars in the window, e.g. a weekend.
+
+    def _download(self, request: PriceRequest, timeout: float | None) -> pd.DataFrame:
+        frames = []
+        for ticker in request.tickers:
+            raw = self._history(ticker, request, timeout)
+            if raw is not None and not raw.empty:
+                frames.append(_normalise_columns(_prepare_index(raw, [ticker])))
+        return concat_prices(frames)
+
+    async def fetch(
+        self, request: PriceRequest, timeout: float | None = None
+    ) -> pd.DataFrame:
+        return await asyncio.wait_for(
+            asyncio.to_thread(self._download, request, timeout), timeout
+        )
+
+
+def _source(kind: str, location: str | None, max_per_host: int) -> PriceProvider:
+    if kind == "yfinance":
+        return YFinanceProvider()
+    if location is None:
+        setting = "data_provider_dir" if kind == "local" else "data_provider_url"
+        raise ValueError(f"The {kind} data provider requires {setting}.")
+    if kind == "local":
+        return LocalFileProvider(location)
+    return HTTPProvider(location, max_per_host=max_per_host)
+
+
+@functools.lru_cache(maxsize=4)
+def _provider(
+    kind: str,
+    location: str | None,
+    max_per_host: int,
+    failure_threshold: int,
+    reset_timeout: float,
+    rate: float,
+    burst: int,
+) -> GuardedProvider:
+    return GuardedProvider(
+        _source(kind, location, max_per_host),
+        CircuitBreaker(failure_threshold, reset_timeout, name=kind),
+        TokenBucket(rate, burst, name=kind),
+    )
+
+
+def get_provider() -> PriceProvider:
+    """The configured price source behind the process-wide breaker and rate limit.
+
+    It is shared by every caller in the process, so pooled connections are reused
+    and the ``circuit_*``/``upstream_*`` limits apply to the process as a whole.
+    """
+
+    settings = get_settings()
+    location = {
+        "local": settings.data_provider_dir,
+        "http": settings.data_provider_url,
+    }.get(settings.data_provider)
+    return _provider(
+        settings.data_provider,
+        None if location is None else str(location),
+        settings.http_max_per_host,
+        settings.circuit_failure_threshold,
+        settings.circuit_reset_seconds,
+        settings.upstream_rate_limit,
+        settings.upstream_burst,
+    )
+
+
+# Module-level so tests exercising retries can skip the waits.
+_sleep = asyncio.sleep
+
+
+async def _download(
+    provider: PriceProvider,
+    request: PriceRequest,
+    retries: int,
+    backoff: float,
+    allow_empty: bool = False,
+    timeout: float | None = None,
+) -> pd.DataFrame:
+    """Fetch one request from ``provider``, retrying on any failure.
+
+    ``allow_empty`` turns an empty response into an empty tidy frame instead of a
+    retryable error; gap fills use it because weekends legitimately have no bars.
+    The delay before retry ``n`` is drawn uniformly from ``[0, backoff * 2**(n-1))``
+    (exponential backoff with full jitter), so concurrent jobs retrying the same
+    outage spread out instead of hitting the source in lock-step. Retries stop as
+    soon as the provider reports an open circuit (see :mod:`src.resilience`).
+    """
+
+    attempt = 0
+    delay = 0.0
+    last_exception: Exception | None = None
+
+    with timed("data.download") as span:
+        while attempt < retries:
+            if delay:
+                await _sleep(delay)
+            try:
+                try:
+                    # Providers enforce the timeout themselves, so waits in front
+                    # of the source (the rate limiter) are not charged to it.
+                    prices = await provider.fetch(request, timeout)
+                except TimeoutError:
+                    raise TimeoutError(f"No response within {timeout}s.") from None
+                if prices.empty and not allow_empty:
+                    raise ValueError(f"Received empty dataframe from {provider.name}.")
+                span.rows = len(prices)
+                return prices
+            except CircuitOpenError as exc:
+                # Retrying cannot help until the breaker lets a probe through.
+                last_exception = exc
+                LOGGER.warning(
+                    "Price download for %s skipped: %s", ",".join(request.tickers), exc
+                )
+                break
+            except (
+                Exception
+            ) as exc:  # noqa: BLE001 - we need to retry on anything transient.
+                last_exception = exc
+                attempt += 1
+                ceiling = backoff * 2 ** (attempt - 1)
+                delay = random.uniform(0, ceiling)  # noqa: S311 - not cryptographic.
+                LOGGER.warning(
+                    "Price download for %s failed (attempt %s/%s): %s",
+                    ",".join(request.tickers),
+                    attempt,
+                    retries,
+                    exc,
+                )
+
+    if isinstance(last_exception, CircuitOpenError):
+        message = (
+            f"Price source paused after repeated failures: {last_exception} "
+            "Cached prices are served where available."
+        )
+    elif last_exception:
+        hint = (
+            "Price download failed after retries. Yahoo Finance may be unreachable "
+            "(VPN/proxy/firewall) or the selected tickers/interval have no data. "
+            "Try another network or VPN setting, widen the date range, or switch "
+            "to a daily interval."
+        )
+        message = f"{hint} Last error: {last_exception}"
+    else:
+        message = "Unknown failure while downloading prices."
+    raise DataDownloadError(message) from last_exception
+
+
+@dataclass(frozen=True)
+class TickerFailure:
+    """Why a single ticker could not be downloaded."""
+
+    ticker: str
+    error: Exception
+
+    @property
+    def reason(self) -> str:
+        """Root cause without the generic troubleshooting hint."""
+
+        return str(self.error.__cause__ or self.error)
+
+
+@dataclass(frozen=True)
+class FetchResult:
+    """Tidy prices for the tickers that succeeded plus a per-ticker error report."""
+
+    prices: pd.DataFrame
+    failures: dict[str, TickerFailure] = field(default_factory=dict)
+
+    @property
+    def succeeded(self) -> tuple[str, ...]:
+        """Tickers present in :attr:`prices`, in first-seen order."""
+
+        return tuple(dict.fromkeys(self.prices["ticker"])) if len(self.prices) else ()
+
+
+@dataclass(frozen=True)
+class _FetchJob:
+    tickers: tuple[str, ...]
+    windows: tuple[tuple[str | pd.Timestamp | None, str | pd.Timestamp | None], ...]
+
+
+def _chunked(tickers: Sequence[str], size: int) -> list[tuple[str, ...]]:
+    return [tuple(tickers[i : i + size]) for i in range(0, len(tickers), size)]
+
+
+async def _run_job(
+    provider: PriceProvider,
+    job: _FetchJob,
+    interval: str,
+    retries: int,
+    backoff: float,
+    timeout: float,
+    store: BarStore | None,
+) -> pd.DataFrame:
+    """Download every window of ``job``; with a store, persist and return nothing."""
+
+    frames = []
+    for start, end in job.windows:
+        fetched_at = _now()
+        downloaded = await _download(
+            provider,
+            PriceRequest(job.tickers, interval, start, end),
+            retries,
+            backoff,
+            allow_empty=store is not None,
+            timeout=timeout,
+        )
+        if store is None:
+            frames.append(downloaded)
+            continue
+        if downloaded.empty:
+            # Weekends/holidays legitimately return nothing; the gap is still
+            # recorded as held so it is not requested again.
+            LOGGER.info("No bars for %s in %s..%s", job.tickers, start, end)
+        await asyncio.to_thread(
+            _persist, store, job.tickers, interval, downloaded, start, end, fetched_at
+        )
+    if not frames:
+        return pd.DataFrame(columns=_TIDY_COLUMNS)
+    return pd.concat(frames, ignore_index=True)
+
+
+def _persist(
+    store: BarStore,
+    tickers: Sequence[str],
+    interval: str,
+    downloaded: pd.DataFrame,
+    start: pd.Timestamp,
+    end: pd.Timestamp,
+    fetched_at: pd.Timestamp,
+) -> None:
+    for ticker in tickers:
+        bars = downloaded[downloaded["ticker"] == ticker]
+        held = max(start, _held_until(bars, interval, end, fetched_at))
+        tail = end if end > held else None
+        store.write(ticker, interval, bars, start, held, tail_until=tail)
+
+
+def _now() -> pd.Timestamp:
+    return pd.Timestamp.now(tz="UTC")
+
+
+def _held_until(
+    bars: pd.DataFrame, interval: str, end: pd.Timestamp, fetched_at: pd.Timestamp
+) -> pd.Timestamp:
+    """Where the coverage of a window downloaded at ``fetched_at`` may end.
+
+    A bar that had not closed when it was downloaded keeps changing upstream, so
+    coverage stops at the start of the current interval (and of the newest bar,
+    whose timestamp may not be aligned to it); the next call downloads it again.
+    """
+
+    try:
+        closed = fetched_at.floor(interval_delta(interval))
+    except ValueError:  # e.g. "1wk"/"1mo": rely on the newest bar alone.
+        closed = fetched_at
+    if end <= closed:
+        return end
+    if not bars.empty:
+        closed = min(closed, bars["datetime"].max())
+    return min(closed, end)
+
+
+def _tail_max_age(interval: str) -> pd.Timedelta:
+    """How long a stored still-forming bar is served before it is downloaded again."""
+
+    ttl = pd.Timedelta(seconds=get_settings().cache_ttl_seconds)
+    try:
+        return min(interval_delta(interval), ttl)
+    except ValueError:
+        return ttl
+
+
+async def _gather_jobs(
+    provider: PriceProvider,
+    jobs: Sequence[_FetchJob],
+    interval: str,
+    retries: int,
+    backoff: float,
+    timeout: float,
+    max_workers: int,
+    store: BarStore | None,
+) -> tuple[list[pd.DataFrame], dict[str, TickerFailure]]:
+    slots = asyncio.Semaphore(max_workers)
+
+    async def run(job: _FetchJob) -> pd.DataFrame:
+        async with slots:
+            return await _run_job(
+                provider, job, interval, retries, backoff, timeout, store
+            )
+
+    tasks = {asyncio.create_task(run(job)): job for job in jobs}
+    # Every attempt timing out plus the longest possible sleep before each retry.
+    deadline = retries * timeout + backoff * (2 ** (retries - 1) - 1)
+    done, pending = await asyncio.wait(tasks, timeout=deadline)
+    for task in pending:
+        task.cancel()
+
+    frames: list[pd.DataFrame] = []
+    failures: dict[str, TickerFailure] = {}
+    for task in done:
+        job = tasks[task]
+        try:
+            frames.append(task.result())
+        except Exception as exc:  # noqa: BLE001 - isolate each ticker's failure.
+            failures.update(
+                {ticker: TickerFailure(ticker, exc) for ticker in job.tickers}
+            )
+    for task in pending:
+        job = tasks[task]
+        error = DataDownloadError(
+            f"Timed out after {deadline:.0f}s downloading {', '.join(job.tickers)}."
+        )
+        failures.update(
+            {ticker: TickerFailure(ticker, error) for ticker in job.tickers}
+        )
+    return frames, failures
+
+
+def _run_jobs(
+    jobs: Sequence[_FetchJob],
+    interval: str,
+    retries: int,
+    backoff: float,
+    timeout: float,
+    max_workers: int,
+    store: BarStore | None,
+    provider: PriceProvider | None = None,
+) -> tuple[list[pd.DataFrame], dict[str, TickerFailure]]:
+    """Run ``jobs`` concurrently on the shared fetch loop, isolating failures per job.
+
+    At most ``max_workers`` jobs are in flight. The fan-out gets one deadline
+    sized for a job that exhausts every attempt (``retries`` timeouts plus the
+    longest exponential backoff). Jobs still running at the deadline are reported
+    as failures and cancelled rather than stalling the caller.
+    """
+
+    if not jobs:
+        return [], {}
+    return run_sync(
+        _gather_jobs(
+            provider or get_provider(),
+            jobs,
+            interval,
+            retries,
+            backoff,
+            timeout,
+            max_workers,
+            store,
+        )
+    )
+
+
+def fetch_prices_report(
+    tickers: Iterable[str],
+    start: str | pd.Timestamp | None = None,
+    end: str | pd.Timestamp | None = None,
+    interval: str | None = None,
+    retries: int | None = None,
+    backoff: float | None = None,
+    store: BarStore | None = None,
+    chunk_size: int | None = None,
+    max_workers: int | None = None,
+    timeout: float | None = None,
+    provider: PriceProvider | None = None,
+    tail_max_age: pd.Timedelta | None = None,
+) -> FetchResult:
+    """Download tickers concurrently and report per-ticker failures.
+
+    Tickers are split into chunks of ``chunk_size`` (per-ticker by default) and run
+    concurrently with at most ``max_workers`` in flight, each chunk retrying
+    independently, so one bad symbol neither stalls nor forces re-downloading the
+    healthy ones. Parameters mirror :func:`fetch_prices`; the remaining ones
+    default to the ``fetch_*`` settings.
+
+    With a store, the still-forming latest bars are served from it while their
+    last download is younger than ``tail_max_age`` (one interval, capped at the
+    cache TTL), so reads right after the warmer ran stay off the upstream. Pass
+    ``pd.Timedelta(0)`` to always download them again.
+    """
+
+    tickers = tuple(dict.fromkeys(tickers))
+    settings = get_settings()
 
-    float_cols = ["open", "high", "low", "close", "adj_close"]
-    for column in float_cols:
-        renamed[column] = pd.to_numeric(renamed[column], errors="coerce").astype(float)
-    renamed["volume"] = (
-        pd.to_numeric(renamed["volume"], errors="coerce").fillna(0).astype(int)
+    if not tickers:
+        raise ValueError("At least one ticker is required to fetch prices.")
+    if len(tickers) > settings.max_tickers:
+        raise ValueError(
+            f"Requested {len(tickers)} tickers but "
+            f"max_tickers is {settings.max_tickers}."
+        )
+
+    interval = interval or settings.default_interval
+    retries = retries or settings.data_fetch_retries
+    backoff = backoff or settings.data_fetch_backoff
+    chunk_size = chunk_size or settings.fetch_chunk_size
+    max_workers = max_workers or settings.fetch_max_workers
+    timeout = timeout or settings.fetch_timeout_seconds
+    if store is None:
+        store_dir = settings.price_store_dir
+        store = get_store(str(store_dir) if store_dir else None)
+    if start is None or end is None:
+        store = None  # Open-ended windows cannot be tracked in the coverage ledger.
+
+    if store is None:
+        jobs = [
+            _FetchJob(chunk, ((start, end),)) for chunk in _chunked(tickers, chunk_size)
+        ]
+    else:
+        start, end = to_utc(start), to_utc(end)
+        # Coverage never extends past "now" or into a bar that is still forming
+        # (see ``_held_until``), so the next call picks up revised and new bars.
+        horizon = min(end, _now())
+        if tail_max_age is None:
+            tail_max_age = _tail_max_age(interval)
+        gaps_by_window: dict[tuple[TimeRange, ...], list[str]] = {}
+        for ticker in tickers:
+            gaps = tuple(
+                store.missing(ticker, interval, start, horizon, max_age=tail_max_age)
+            )
+            record_cache("bar_store", "miss" if gaps else "hit")
+            if gaps:
+                gaps_by_window.setdefault(gaps, []).append(ticker)
+        jobs = [
+            _FetchJob(chunk, gaps)
+            for gaps, batch in gaps_by_window.items()
+            for chunk in _chunked(batch, chunk_size)
+        ]
+
+    frames, failures = _run_jobs(
+        jobs, interval, retries, backoff, timeout, max_workers, store, provider
     )
+    if store is not None:
+        # Serve whatever is held, including stale bars for tickers whose gap failed.
+        frames = [store.read(ticker, interval, start, end) for ticker in tickers]
+
+    prices = _combine(frames)
+    for ticker in tickers:
+        if ticker not in failures and not (prices["ticker"] == ticker).any():
+            failures[ticker] = TickerFailure(
+                ticker, DataDownloadError(f"No price data returned for {ticker}.")
+            )
+    return FetchResult(prices=prices, failures=failures)
+
+
+def _combine(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=_TIDY_COLUMNS)
+    # Per-job frames are sorted internally; ordering them by first ticker usually
+    # makes the concatenation sorted too, so ``sort_prices`` only verifies it.
+    frames.sort(key=lambda frame: str(frame["ticker"].iloc[0]))
+    return sort_prices(pd.concat(frames, ignore_index=True))
+
+
+@instrument("data.fetch_latest_bars")
+def fetch_latest_bars(
+    prices: pd.DataFrame,
+    interval: str | None = None,
+    retries: int | None = None,
+    backoff: float | None = None,
+    provider: PriceProvider | None = None,
+) -> FetchResult:
+    """Download only bars at or after each ticker's last ``datetime`` in ``prices``.
+
+    The last held bar is requested again because an intraday bar keeps changing
+    until its interval closes; :func:`merge_latest_bars` replaces it in place.
+    """
+
+    settings = get_settings()
+    interval = interval or settings.default_interval
+    retries = retries or settings.data_fetch_retries
+    backoff = backoff or settings.data_fetch_backoff
 
-    renamed = renamed.sort_values(["ticker", "datetime"]).reset_index(drop=True)
-    return renamed[
-        ["ticker", "datetime", "open", "high", "low", "close", "adj_close", "volume"]
+    last_seen = prices.groupby("ticker", sort=False, observed=True)["datetime"].max()
+    jobs = [
+        _FetchJob((ticker,), ((since, None),)) for ticker, since in last_seen.items()
     ]
+    frames, failures = _run_jobs(
+        jobs,
+        interval,
+        retries,
+        backoff,
+        settings.fetch_timeout_seconds,
+        settings.fetch_max_workers,
+        store=None,
+        provider=provider,
+    )
+    tail = _combine(frames)
+    if not tail.empty:
+        floor = per_row(tail, last_seen)
+        tail = tail.loc[tail["datetime"] >= floor].reset_index(drop=True)
+    if settings.compact_frames:
+        tail = compact_prices(tail)
+    return FetchResult(prices=tail, failures=failures)
+
+
+def merge_latest_bars(prices: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+    """Append ``tail`` to sorted ``prices``, replacing bars it re-delivers.
+
+    Each ticker keeps its rows strictly before the first tail bar, so the merge is
+    a block-wise concatenation without re-sorting the full history.
+    """
 
+    return splice_tail(prices, tail)
 
+
+@instrument("data.fetch_prices")
 def fetch_prices(
     tickers: Iterable[str],
     start: str | pd.Timestamp | None = None,
@@ -92,6 +718,8 @@ def fetch_prices(
     interval: str | None = None,
     retries: int | None = None,
     backoff: float | None = None,
+    store: BarStore | None = None,
+    provider: PriceProvider | None = None,
 ) -> pd.DataFrame:
     """Download price data for the supplied tickers.
 
@@ -109,70 +737,50 @@ def fetch_prices(
         Override retry attempts for unit tests or specialised flows.
     backoff:
         Override exponential backoff multiplier.
+    store:
+        On-disk bar store used to serve previously downloaded ranges. Defaults to
+        the store configured via ``price_store_dir``; bounded windows only.
+    provider:
+        Price source; defaults to the ``data_provider`` setting (yfinance). See
+        :mod:`src.providers`.
+
+    With ``compact_frames`` enabled the result uses the compact schema from
+    :func:`src.frames.compact_prices`. Tickers that fail are logged and dropped;
+    :class:`DataDownloadError` is raised only when no ticker returned data. Use
+    :func:`fetch_prices_report` to inspect partial failures.
     """
 
-    tickers = tuple(
-        dict.fromkeys(tickers)
-    )  # Removes duplicates while preserving order.
-    settings = get_settings()
-
-    if not tickers:
-        raise ValueError("At least one ticker is required to fetch prices.")
-    if len(tickers) > settings.max_tickers:
-        raise ValueError(
-            f"Requested {len(tickers)} tickers but "
-            f"max_tickers is {settings.max_tickers}."
-        )
-
-    interval = interval or settings.default_interval
-    retries = retries or settings.data_fetch_retries
-    backoff = backoff or settings.data_fetch_backoff
-
-    attempt = 0
-    delay = 0.0
-    last_exception: Exception | None = None
-
-    while attempt < retries:
-        if delay:
-            time.sleep(delay)
-        try:
-            raw = yf.download(
-                tickers=" ".join(tickers),
-                start=start,
-                end=end,
-                interval=interval,
-                auto_adjust=False,
-                progress=False,
-                threads=True,
-                group_by="ticker",
-            )
-            if raw is None or raw.empty:
-                raise ValueError("Received empty dataframe from yfinance.")
-
-            tidy = _prepare_index(raw, tickers)
-            normalised = _normalise_columns(tidy)
-            return normalised
-        except (
-            Exception
-        ) as exc:  # noqa: BLE001 - we need to retry on anything transient.
-            last_exception = exc
-            attempt += 1
-            delay = backoff * attempt
-            LOGGER.warning(
-                "Price download failed (attempt %s/%s): %s", attempt, retries, exc
-            )
-
-    if last_exception:
-        hint = (
-            "Price download failed after retries. Yahoo Finance may be unreachable "
-            "(VPN/proxy/firewall) or the selected tickers/interval have no data. "
-            "Try another network or VPN setting, widen the date range, or switch "
-            "to a daily interval."
-        )
-        message = f"{hint} Last error: {last_exception}"
-    else:
-        message = "Unknown failure while downloading prices."
-    raise DataDownloadError(message) from last_exception
-
-
-__all__ = ["fetch_prices", "DataDownloadError"]
+    result = fetch_prices_report(
+        tickers,
+        start=start,
+        end=end,
+        interval=interval,
+        retries=retries,
+        backoff=backoff,
+        store=store,
+        provider=provider,
+    )
+    if result.prices.empty:
+        failure = next(iter(result.failures.values()), None)
+        if failure is not None and isinstance(failure.error, DataDownloadError):
+            raise failure.error
+        message = "No price data available for the selected tickers/interval."
+        raise DataDownloadError(message) from (failure.error if failure else None)
+    for failure in result.failures.values():
+        LOGGER.warning("Dropping %s: %s", failure.ticker, failure.reason)
+    if get_settings().compact_frames:
+        return compact_prices(result.prices)
+    return result.prices
+
+
+__all__ = [
+    "fetch_prices",
+    "fetch_latest_bars",
+    "merge_latest_bars",
+    "fetch_prices_report",
+    "FetchResult",
+    "TickerFailure",
+    "DataDownloadError",
+    "YFinanceProvider",
+    "get_provider",
+]
@@ -0,0 +1,275 @@
+"""Memoised derived results (analytics, figures) keyed on a price-frame fingerprint.
+
+Only the price download is cached upstream, so without this every Streamlit rerun
+(even one that only moves the alert slider) recomputes moving averages, returns
+and both figures. :class:`DerivedCache` keys each derived value on a cheap
+:func:`frame_fingerprint` of the prices plus the parameters that shaped it, and
+evicts least-recently-used entries once their estimated size exceeds a byte
+budget. Moving averages are cached per window, so adding one window computes
+only that window.
+"""
+
+from __future__ import annotations
+
+import dataclasses
+import hashlib
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from collections.abc import Callable, Hashable, Iterable
+from dataclasses import dataclass
+from typing import Any, TypeVar
+
+import numpy as np
+import pandas as pd
+
+from .analytics import AnalyticsResult, compute_analytics, moving_averages
+from .metrics import REGISTRY, record_cache
+
+V = TypeVar("V")
+
+
+def _weighted_sum(words: np.ndarray) -> int:
+    """Order-sensitive checksum of 64-bit words (wrapping multiply-accumulate)."""
+
+    weights = np.arange(1, 2 * len(words), 2, dtype=np.uint64)
+    return int(np.dot(words, weights))
+
+
+def frame_fingerprint(frame: pd.DataFrame) -> str:
+    """Cheap content key for a price frame.
+
+    Fixed-width columns contribute an order-sensitive checksum of their raw
+    words. Label columns such as ``ticker`` are run-length encoded first, so a
+    sorted frame only hashes one label (and one row offset) per ticker, which
+    also pins every ticker's row count and, with ``datetime``, its last bar. A
+    million-row frame takes a few tens of milliseconds, against hundreds for a
+    cryptographic hash of every byte.
+    """
+
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(repr((len(frame), tuple(frame.columns))).encode())
+    for column in frame.columns:
+        values = frame[column].values
+        if isinstance(values, np.ndarray) and values.dtype != object:
+            values = np.ascontiguousarray(values)
+            if values.dtype.itemsize % 8 == 0:
+                words = values.view(np.uint64)
+            else:
+                # Widen the raw bits; a value cast would truncate float32 prices.
+                words = values.view(f"u{values.dtype.itemsize}").astype(np.uint64)
+            digest.update(repr((str(values.dtype), _weighted_sum(words))).encode())
+            continue
+        labels = np.asarray(values, dtype=object)
+        if labels.size == 0:
+            continue
+        starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+        digest.update(
+            repr((_weighted_sum(starts.astype(np.uint64)), *labels[starts])).encode()
+        )
+    return digest.hexdigest()
+
+
+def estimate_bytes(value: object) -> int:
+    """Approximate memory held by a cached value.
+
+    pandas objects use their shallow ``memory_usage``, arrays their ``nbytes``,
+    dataclasses and containers the sum of their members, and Plotly figures the
+    size of their trace coordinates.
+    """
+
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series | pd.Index):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return sum(
+            estimate_bytes(getattr(value, item.name))
+            for item in dataclasses.fields(value)
+        )
+    if isinstance(value, tuple | list):
+        return sum(estimate_bytes(item) for item in value)
+    if isinstance(value, dict):
+        return sum(estimate_bytes(item) for item in value.values())
+    traces = getattr(value, "data", None)
+    if isinstance(traces, tuple):
+        return sum(
+            int(np.asarray(coords).nbytes)
+            for trace in traces
+            for coords in (getattr(trace, "x", None), getattr(trace, "y", None))
+            if coords is not None
+        )
+    return sys.getsizeof(value)
+
+
+@dataclass(frozen=True)
+class CacheStats:
+    """Counters for monitoring a :class:`DerivedCache`."""
+
+    hits: int
+    misses: int
+    evictions: int
+    entries: int
+    bytes: int
+    max_bytes: int
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class DerivedCache:
+    """Byte-bounded LRU cache for values derived from price frames.
+
+    Values are computed outside the lock, so two sessions missing the same key at
+    once may both compute it; the second result simply replaces the first. Cached
+    values are shared and must be treated as read-only.
+    """
+
+    def __init__(
+        self,
+        max_bytes: int,
+        sizeof: Callable[[object], int] = estimate_bytes,
+        name: str = "derived",
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.name = name
+        self._sizeof = sizeof
+        self._entries: OrderedDict[Hashable, tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._hits = self._misses = self._evictions = 0
+        self._lock = threading.Lock()
+        # id(frame) -> (weak reference, fingerprint); avoids re-hashing the same
+        # frame object (e.g. the price cache's value) on every rerun.
+        self._fingerprints: dict[int, tuple[weakref.ref, str]] = {}
+
+    def fingerprint(self, frame: pd.DataFrame) -> str:
+        """:func:`frame_fingerprint`, memoised per frame object."""
+
+        key = id(frame)
+        with self._lock:
+            known = self._fingerprints.get(key)
+        if known is not None and known[0]() is frame:
+            return known[1]
+        fingerprint = frame_fingerprint(frame)
+
+        def forget(_: weakref.ref, key: int = key) -> None:
+            with self._lock:
+                self._fingerprints.pop(key, None)
+
+        with self._lock:
+            self._fingerprints[key] = (weakref.ref(frame, forget), fingerprint)
+        return fingerprint
+
+    def _lookup(self, key: Hashable) -> tuple[bool, Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._hits += 1
+            else:
+                self._misses += 1
+        record_cache(self.name, "miss" if entry is None else "hit")
+        return (False, None) if entry is None else (True, entry[0])
+
+    def _store(self, key: Hashable, value: Any) -> None:
+        size = self._sizeof(value)
+        evicted = 0
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[1]
+            if size <= self.max_bytes:
+                self._entries[key] = (value, size)
+                self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                _, (_, dropped) = self._entries.popitem(last=False)
+                self._bytes -= dropped
+                evicted += 1
+            self._evictions += evicted
+            held = self._bytes
+        if evicted:
+            REGISTRY.increment(
+                "cci_cache_evictions_total",
+                evicted,
+                "Entries evicted to stay within a cache's byte budget.",
+                cache=self.name,
+            )
+        REGISTRY.set_gauge(
+            "cci_cache_bytes", held, "Estimated bytes held by a cache.", cache=self.name
+        )
+
+    def get(self, key: Hashable, builder: Callable[[], V]) -> V:
+        """Return the cached value for ``key`` or build and cache it."""
+
+        found, value = self._lookup(key)
+        if found:
+            return value
+        value = builder()
+        self._store(key, value)
+        return value
+
+    def analytics(
+        self, price_frame: pd.DataFrame, windows: Iterable[int] = ()
+    ) -> AnalyticsResult:
+        """:func:`src.analytics.compute_analytics`, memoised per frame and window.
+
+        Returns, changes and the sorted base frame are cached once per price frame;
+        each moving-average window is cached on its own and only missing windows
+        are computed.
+        """
+
+        fingerprint = self.fingerprint(price_frame)
+        windows = sorted({int(window) for window in windows if int(window) > 0})
+        base = self.get(
+            ("analytics", fingerprint), lambda: compute_analytics(price_frame)
+        )
+
+        means: dict[int, np.ndarray] = {}
+        missing = []
+        for window in windows:
+            found, value = self._lookup(("moving_average", fingerprint, window))
+            if found:
+                means[window] = value
+            else:
+                missing.append(window)
+        if missing:
+            for window, mean in moving_averages(base.enriched, missing).items():
+                self._store(("moving_average", fingerprint, window), mean)
+                means[window] = mean
+
+        enriched = base.enriched.copy(deep=False)
+        for window in windows:
+            enriched[f"ma_{window}"] = means[window]
+        return AnalyticsResult(
+            enriched=enriched, returns=base.returns, changes=base.changes
+        )
+
+    def stats(self) -> CacheStats:
+        with self._lock:
+            return CacheStats(
+                hits=self._hits,
+                misses=self._misses,
+                evictions=self._evictions,
+                entries=len(self._entries),
+                bytes=self._bytes,
+                max_bytes=self.max_bytes,
+            )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._fingerprints.clear()
+            self._bytes = 0
+
+
+__all__ = [
+    "CacheStats",
+    "DerivedCache",
+    "estimate_bytes",
+    "frame_fingerprint",
+]
@@ -0,0 +1,90 @@
+"""Point-reduction algorithms used before building chart traces."""
+
+from __future__ import annotations
+
+import warnings
+
+import numpy as np
+
+
+def minmax_indices(y: np.ndarray, max_points: int) -> np.ndarray:
+    """Keep the minimum and maximum of ``max_points // 2`` equal-width buckets.
+
+    Extremes survive, so spikes stay visible, and the work is a handful of
+    vectorised reductions. The first and last points are always kept.
+    """
+
+    size = len(y)
+    if size <= max_points or max_points < 4:
+        return np.arange(size)
+
+    n_buckets = max_points // 2 - 1
+    edges = np.linspace(1, size - 1, n_buckets + 1).astype(np.int64)
+    edges = np.unique(edges)
+    starts = edges[:-1]
+    counts = np.diff(edges)
+    bucket_of = np.repeat(np.arange(len(starts)), counts)
+    body = y[1 : size - 1]
+
+    picks = [np.array([0, size - 1])]
+    for reducer in (np.fmin, np.fmax):
+        extreme = reducer.reduceat(body, starts - 1)
+        hits = np.flatnonzero(body == extreme[bucket_of])
+        _, first = np.unique(bucket_of[hits], return_index=True)
+        picks.append(hits[first] + 1)
+    return np.unique(np.concatenate(picks))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, max_points: int) -> np.ndarray:
+    """Largest-Triangle-Three-Buckets selection of at most ``max_points`` indices.
+
+    LTTB keeps the visual shape of a line better than min/max at the same budget
+    but needs one step per bucket, so it is best for moderate budgets.
+    """
+
+    size = len(y)
+    if size <= max_points or max_points < 3:
+        return np.arange(size)
+
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    edges = np.linspace(1, size - 1, max_points - 1).astype(np.int64)
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+
+    previous = 0
+    with warnings.catch_warnings():
+        # All-NaN buckets are tolerated; they just fall back to their first point.
+        warnings.simplefilter("ignore", RuntimeWarning)
+        for bucket in range(max_points - 2):
+            previous = _lttb_step(x, y, edges, bucket, previous, size)
+            selected[bucket + 1] = previous
+    return np.unique(selected)
+
+
+def _lttb_step(
+    x: np.ndarray,
+    y: np.ndarray,
+    edges: np.ndarray,
+    bucket: int,
+    previous: int,
+    size: int,
+) -> int:
+    """Pick the point of ``bucket`` forming the largest triangle with its neighbours."""
+
+    lo, hi = edges[bucket], max(edges[bucket + 1], edges[bucket] + 1)
+    next_lo = hi
+    next_hi = edges[bucket + 2] if bucket + 2 < len(edges) else size
+    next_hi = max(next_hi, next_lo + 1)
+    avg_x = np.nanmean(x[next_lo:next_hi])
+    avg_y = np.nanmean(y[next_lo:next_hi])
+
+    area = np.abs(
+        (x[previous] - avg_x) * (y[lo:hi] - y[previous])
+        - (x[previous] - x[lo:hi]) * (avg_y - y[previous])
+    )
+    offset = int(np.nanargmax(area)) if np.isfinite(area).any() else 0
+    return lo + offset
+
+
+__all__ = ["lttb_indices", "minmax_indices"]
@@ -0,0 +1,56 @@
+"""Serialise tidy frames for download (CSV or Parquet)."""
+
+from __future__ import annotations
+
+import io
+from dataclasses import dataclass
+from pathlib import Path
+from urllib.parse import quote
+
+import pandas as pd
+
+from .metrics import instrument
+
+
+@dataclass(frozen=True)
+class ExportFormat:
+    """File extension and MIME type for one export format."""
+
+    extension: str
+    mime: str
+
+
+EXPORT_FORMATS = {
+    "csv": ExportFormat("csv", "text/csv"),
+    "parquet": ExportFormat("parquet", "application/vnd.apache.parquet"),
+}
+
+
+def partition_path(root: Path, interval: str, ticker: str, fmt: str) -> Path:
+    """File for one ticker, laid out like the bar store's partitions."""
+
+    safe_ticker = quote(ticker, safe="=^.-_")
+    extension = EXPORT_FORMATS[fmt].extension
+    return root / f"interval={interval}" / f"ticker={safe_ticker}" / f"part.{extension}"
+
+
+@instrument("export.to_bytes")
+def to_bytes(frame: pd.DataFrame, fmt: str = "csv") -> bytes:
+    """Encode ``frame`` without its index.
+
+    Parquet keeps dtypes (tz-aware timestamps, categoricals) and is typically a
+    fraction of the CSV size and encoding time for large intraday frames.
+    """
+
+    if fmt not in EXPORT_FORMATS:
+        raise ValueError(
+            f"Unknown export format {fmt!r}; choose from {sorted(EXPORT_FORMATS)}."
+        )
+    if fmt == "csv":
+        return frame.to_csv(index=False).encode("utf-8")
+    buffer = io.BytesIO()
+    frame.to_parquet(buffer, index=False)
+    return buffer.getvalue()
+
+
+__all__ = ["EXPORT_FORMATS", "ExportFormat", "partition_path", "to_bytes"]
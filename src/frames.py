@@ -0,0 +1,239 @@
+"""Small helpers shared by layers that manipulate tidy ``(ticker, datetime)`` frames."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+import pandas as pd
+
+_PRICE_COLUMNS = ("open", "high", "low", "close", "adj_close")
+_FLOAT32_RTOL = 1e-6
+_SORTED_ATTR = "sorted_by_ticker_datetime"
+
+
+def ticker_codes(tickers: pd.Series) -> tuple[np.ndarray, bool]:
+    """Factorise tickers and report whether they already form sorted blocks.
+
+    Codes are assigned in order of first appearance, so they are non-decreasing
+    exactly when each ticker's rows are contiguous; the blocks are in ticker order
+    when the uniques themselves are ascending.
+    """
+
+    codes, uniques = pd.factorize(tickers, sort=False)
+    contiguous = len(codes) < 2 or bool(np.all(codes[1:] >= codes[:-1]))
+    ordered = contiguous and pd.Index(uniques).is_monotonic_increasing
+    return codes, ordered
+
+
+def is_sorted(frame: pd.DataFrame, codes: np.ndarray, ordered: bool) -> bool:
+    """Return ``True`` when rows are already ordered by ``(ticker, datetime)``."""
+
+    if not ordered:
+        return False
+    if not pd.api.types.is_datetime64_any_dtype(frame["datetime"]):
+        return False
+    stamps = frame["datetime"].to_numpy(dtype="datetime64[ns]").view("i8")
+    if len(stamps) < 2:
+        return True
+    same_ticker = codes[1:] == codes[:-1]
+    return bool(np.all(np.diff(stamps)[same_ticker] >= 0))
+
+
+def _sort_fingerprint(frame: pd.DataFrame) -> tuple[object, ...]:
+    """Row count plus first/last ``(ticker, datetime)`` keys: O(1) to recompute.
+
+    Plain ints and strings keep the marker JSON-safe (Parquet stores ``attrs``).
+    """
+
+    if frame.empty:
+        return (0,)
+    tickers, stamps = frame["ticker"], frame["datetime"]
+    return (
+        len(frame),
+        str(tickers.iloc[0]),
+        pd.Timestamp(stamps.iloc[0]).value,
+        str(tickers.iloc[-1]),
+        pd.Timestamp(stamps.iloc[-1]).value,
+    )
+
+
+def mark_sorted(frame: pd.DataFrame) -> pd.DataFrame:
+    """Flag ``frame`` (sorted, with a fresh ``RangeIndex``) as pre-sorted in place."""
+
+    frame.attrs[_SORTED_ATTR] = _sort_fingerprint(frame)
+    return frame
+
+
+def is_marked_sorted(frame: pd.DataFrame) -> bool:
+    """Whether ``frame`` still matches the pre-sorted marker set by the data layer.
+
+    ``attrs`` survive most pandas operations, including concatenation and
+    reordering, so the marker also records the row count and the first/last keys
+    and is only trusted while the index is still ``0..n-1``. Anything that
+    reorders rows while keeping those invariants (e.g. ``sort_values`` on another
+    column with ``ignore_index=True``) must not be fed back as pre-sorted.
+    """
+
+    marker = frame.attrs.get(_SORTED_ATTR)
+    if marker is None:
+        return False
+    index = frame.index
+    if not (
+        isinstance(index, pd.RangeIndex)
+        and index.start == 0
+        and index.step == 1
+        and len(index) == len(frame)
+    ):
+        return False
+    return marker == _sort_fingerprint(frame)
+
+
+def sort_prices(frame: pd.DataFrame) -> pd.DataFrame:
+    """Return ``frame`` ordered by ``(ticker, datetime)`` and marked pre-sorted.
+
+    Already ordered input is returned as-is (only re-indexed if needed), so this is
+    an O(n) check rather than a sort in the common case.
+    """
+
+    if is_marked_sorted(frame):
+        return frame
+    codes, ordered = ticker_codes(frame["ticker"])
+    if not is_sorted(frame, codes, ordered):
+        frame = frame.sort_values(["ticker", "datetime"], kind="stable")
+    if not isinstance(frame.index, pd.RangeIndex) or frame.index.start != 0:
+        frame = frame.reset_index(drop=True)
+    return mark_sorted(frame)
+
+
+def per_row(frame: pd.DataFrame, by_ticker: pd.Series) -> pd.Series:
+    """Broadcast a ticker-indexed series onto ``frame``'s rows.
+
+    Unlike ``frame["ticker"].map`` this also works for categorical tickers, where
+    ``map`` would return a categorical of the mapped values.
+    """
+
+    tickers = np.asarray(frame["ticker"], dtype=object)
+    return pd.Series(by_ticker.reindex(tickers).array, index=frame.index)
+
+
+def splice_tail(frame: pd.DataFrame, tail: pd.DataFrame) -> pd.DataFrame:
+    """Replace each ticker's rows from its first ``tail`` timestamp onwards.
+
+    Both frames must be sorted by ``(ticker, datetime)``. Ticker blocks are located
+    with binary search and concatenated in order, so the cost is a single copy of
+    ``frame`` rather than a full re-sort. Columns follow ``frame``.
+    """
+
+    if tail.empty:
+        return frame
+    first_new = tail.groupby("ticker", sort=False, observed=True)["datetime"].min()
+    cutoff = per_row(frame, first_new)
+    kept = frame.loc[cutoff.isna() | (frame["datetime"] < cutoff)]
+
+    keys = kept["ticker"].to_numpy()
+    tail_keys = tail["ticker"].to_numpy()
+    blocks = []
+    for ticker in sorted(set(first_new.index).union(pd.unique(keys))):
+        lo = np.searchsorted(keys, ticker, side="left")
+        hi = np.searchsorted(keys, ticker, side="right")
+        blocks.append(kept.iloc[lo:hi])
+        lo = np.searchsorted(tail_keys, ticker, side="left")
+        hi = np.searchsorted(tail_keys, ticker, side="right")
+        blocks.append(tail.iloc[lo:hi])
+    merged = pd.concat([block for block in blocks if not block.empty])
+    merged = merged.reset_index(drop=True)[list(frame.columns)]
+    for column, dtype in frame.dtypes.items():
+        # Concatenating categoricals with differing categories falls back to object.
+        if isinstance(dtype, pd.CategoricalDtype) and merged[column].dtype != dtype:
+            merged[column] = merged[column].astype("category")
+    return mark_sorted(merged)
+
+
+def compact_prices(price_frame: pd.DataFrame) -> pd.DataFrame:
+    """Return ``price_frame`` with a compact, analysis-safe schema.
+
+    Tickers become categoricals, prices drop to ``float32`` when every value round
+    trips within ``1e-6`` relative error, and volume uses the narrowest of
+    ``uint32``/``int32`` that holds it. Columns that do not qualify keep their
+    original dtype, so the result is always lossless at display precision.
+    """
+
+    compact = price_frame.copy(deep=False)
+    if "ticker" in compact:
+        compact["ticker"] = compact["ticker"].astype("category")
+    for column in _PRICE_COLUMNS:
+        if column not in compact:
+            continue
+        values = compact[column].to_numpy(dtype=float)
+        narrowed = values.astype(np.float32)
+        if np.allclose(narrowed, values, rtol=_FLOAT32_RTOL, atol=0, equal_nan=True):
+            compact[column] = narrowed
+    if "volume" in compact and len(compact):
+        volume = compact["volume"].to_numpy()
+        for dtype in (np.uint32, np.int32):
+            info = np.iinfo(dtype)
+            if volume.min() >= info.min and volume.max() <= info.max:
+                compact["volume"] = volume.astype(dtype)
+                break
+    return compact
+
+
+def _buffer_key(series: pd.Series) -> tuple[int, int]:
+    """Identify the memory block backing ``series`` as ``(address, nbytes)``."""
+
+    values = series.values
+    if isinstance(values, pd.Categorical):
+        values = values.codes
+    root = np.asarray(values)
+    while isinstance(root.base, np.ndarray):
+        root = root.base
+    return root.__array_interface__["data"][0], root.nbytes
+
+
+@dataclass(frozen=True)
+class MemoryReport:
+    """Per-frame memory usage plus the footprint once shared columns are deduped."""
+
+    frames: pd.DataFrame
+    total_bytes: int
+    unique_bytes: int
+
+
+def memory_report(frames: dict[str, pd.DataFrame]) -> MemoryReport:
+    """Measure ``frames`` (e.g. one session's prices and derived views).
+
+    ``total_bytes`` adds up each frame's deep usage as pandas reports it, while
+    ``unique_bytes`` counts every underlying buffer once, so frames that reference
+    another frame's columns instead of copying them only add what is new.
+    """
+
+    rows = []
+    seen: dict[tuple[int, int], int] = {}
+    for name, frame in frames.items():
+        usage = frame.memory_usage(deep=True, index=True)
+        for column in frame.columns:
+            seen.setdefault(_buffer_key(frame[column]), int(usage[column]))
+        rows.append(
+            {
+                "frame": name,
+                "rows": len(frame),
+                "columns": frame.shape[1],
+                "bytes": int(usage.sum()),
+            }
+        )
+    table = pd.DataFrame(rows, columns=["frame", "rows", "columns", "bytes"])
+    return MemoryReport(
+        frames=table.set_index("frame"),
+        total_bytes=int(table["bytes"].sum()),
+        unique_bytes=int(sum(seen.values())),
+    )
+
+
+__all__ = [
+    "MemoryReport",
+    "compact_prices",
+    "memory_report",
+    "per_row",
+    "splice_tail",
+]
@@ -0,0 +1,566 @@
+"""Technical indicators as per-ticker state objects.
+
+Every indicator can be primed from a ticker's history in one vectorised pass
+(:meth:`Indicator.prime`) and then advanced one bar at a time in constant time
+(:meth:`Indicator.update`), so a live feed never recomputes history. The two
+paths agree to floating-point rounding. :class:`IndicatorBook` keeps one set of
+states per ticker, and :func:`compute_indicators` adds the ``ind_*`` columns to
+a tidy price frame.
+
+Bars without a close (download gaps) leave the state untouched and repeat the
+previous outputs. Missing highs and lows fall back to the close.
+"""
+
+from __future__ import annotations
+
+import math
+from collections import deque
+from collections.abc import Iterable, Sequence
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from .analytics import _segment_starts, _sorted_with_codes
+from .metrics import instrument
+
+_NS_PER_DAY = 86_400 * 10**9
+_NAN = float("nan")
+
+# Offered in the sidebar; any ``name[:params]`` spec accepted by
+# :func:`parse_indicator` also works.
+PRESETS = ("ema:20", "ema:50", "bb:20", "vwap", "rsi:14", "macd:12,26,9", "atr:14")
+
+
+class Bar(NamedTuple):
+    """One bar as seen by :meth:`Indicator.update` (``stamp`` in UTC ns)."""
+
+    stamp: int
+    high: float
+    low: float
+    close: float
+    volume: float
+
+
+class BarArrays(NamedTuple):
+    """Column arrays of one ticker's bars, oldest first."""
+
+    stamp: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+
+    @classmethod
+    def from_frame(cls, frame: pd.DataFrame) -> BarArrays:
+        close = frame["close"].to_numpy(dtype=float)
+        return cls(
+            stamp=frame["datetime"].array.asi8,
+            high=frame["high"].to_numpy(dtype=float),
+            low=frame["low"].to_numpy(dtype=float),
+            close=close,
+            volume=frame["volume"].to_numpy(dtype=float),
+        )
+
+    def take(self, rows: np.ndarray) -> BarArrays:
+        return BarArrays(*(values[rows] for values in self))
+
+
+def _ewm(values: np.ndarray, alpha: float) -> np.ndarray:
+    """``y[0] = x[0]``, ``y[i] = y[i-1] + alpha * (x[i] - y[i-1])``."""
+
+    if len(values) == 0:
+        return np.empty(0)
+    return pd.Series(values).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+
+
+def _wilder(values: np.ndarray, period: int) -> np.ndarray:
+    """Wilder smoothing: NaN for the first ``period - 1`` values, then their
+    mean, then ``avg += (x - avg) / period``."""
+
+    out = np.full(len(values), np.nan)
+    if len(values) >= period:
+        seeded = np.r_[values[:period].mean(), values[period:]]
+        out[period - 1 :] = _ewm(seeded, 1.0 / period)
+    return out
+
+
+class Indicator:
+    """Base class: subclasses implement ``_prime`` (arrays) and ``_update`` (bar).
+
+    ``overlay`` indicators share the price axis and are drawn on the price chart;
+    the others (oscillators, ranges) get their own chart.
+    """
+
+    overlay = False
+    columns: tuple[str, ...] = ()
+
+    def __init__(self) -> None:
+        self.last: tuple[float, ...] = (_NAN,) * len(self.columns)
+
+    def prime(self, bars: BarArrays) -> np.ndarray:
+        """Outputs for every bar in ``bars`` (shape ``(n, len(columns))``),
+        leaving the state as if each bar had gone through :meth:`update`.
+
+        Any previous state is discarded.
+        """
+
+        rows = len(bars.close)
+        out = np.full((rows, len(self.columns)), np.nan)
+        valid = ~np.isnan(bars.close)
+        present = np.flatnonzero(valid)
+        self._reset()
+        if len(present):
+            out[present] = self._prime(_fill_range(bars.take(present)))
+        if not valid.all():
+            # Gap rows repeat the last output, as ``update`` does.
+            last = np.where(valid, np.arange(rows), -1)
+            np.maximum.accumulate(last, out=last)
+            gaps = ~valid & (last >= 0)
+            out[gaps] = out[last[gaps]]
+        self.last = tuple(out[-1]) if rows else (_NAN,) * len(self.columns)
+        return out
+
+    def update(self, bar: Bar) -> tuple[float, ...]:
+        """Fold one new bar into the state and return the outputs, in O(1)."""
+
+        if math.isnan(bar.close):
+            return self.last
+        if math.isnan(bar.high) or math.isnan(bar.low):
+            bar = bar._replace(
+                high=bar.close if math.isnan(bar.high) else bar.high,
+                low=bar.close if math.isnan(bar.low) else bar.low,
+            )
+        self.last = self._update(bar)
+        return self.last
+
+    def _reset(self) -> None:
+        raise NotImplementedError
+
+    def _prime(self, bars: BarArrays) -> np.ndarray:
+        raise NotImplementedError
+
+    def _update(self, bar: Bar) -> tuple[float, ...]:
+        raise NotImplementedError
+
+
+def _fill_range(bars: BarArrays) -> BarArrays:
+    return bars._replace(
+        high=np.where(np.isnan(bars.high), bars.close, bars.high),
+        low=np.where(np.isnan(bars.low), bars.close, bars.low),
+        volume=np.nan_to_num(bars.volume),
+    )
+
+
+class _EMAState:
+    """Exponential average of a scalar stream, seeded with its first value."""
+
+    def __init__(self, alpha: float) -> None:
+        self.alpha = alpha
+        self.value = _NAN
+
+    def prime(self, values: np.ndarray) -> np.ndarray:
+        out = _ewm(values, self.alpha)
+        self.value = float(out[-1]) if len(out) else _NAN
+        return out
+
+    def step(self, value: float) -> float:
+        if math.isnan(self.value):
+            self.value = value
+        else:
+            self.value += self.alpha * (value - self.value)
+        return self.value
+
+
+class EMA(Indicator):
+    """Exponential moving average of the close, ``alpha = 2 / (span + 1)``."""
+
+    overlay = True
+
+    def __init__(self, span: int = 20) -> None:
+        if span < 1:
+            raise ValueError("EMA span must be positive.")
+        self.span = span
+        self.columns = (f"ind_ema_{span}",)
+        super().__init__()
+
+    def _reset(self) -> None:
+        self._ema = _EMAState(2.0 / (self.span + 1))
+
+    def _prime(self, bars: BarArrays) -> np.ndarray:
+        return self._ema.prime(bars.close)[:, None]
+
+    def _update(self, bar: Bar) -> tuple[float, ...]:
+        return (self._ema.step(bar.close),)
+
+
+class Bollinger(Indicator):
+    """Mean of the last ``window`` closes plus/minus ``width`` population
+    standard deviations; NaN until ``window`` closes have been seen."""
+
+    overlay = True
+
+    def __init__(self, window: int = 20, width: float = 2.0) -> None:
+        if window < 2:
+            raise ValueError("Bollinger window must be at least 2.")
+        self.window = window
+        self.width = width
+        self.columns = (
+            f"ind_bb_mid_{window}",
+            f"ind_bb_upper_{window}",
+            f"ind_bb_lower_{window}",
+        )
+        super().__init__()
+
+    def _reset(self) -> None:
+        self._values: deque[float] = deque(maxlen=self.window)
+        self._shift = _NAN
+        self._sum = self._sum_sq = 0.0
+        self._since_resum = 0
+
+    def _bands(self, mean: np.ndarray, var: np.ndarray) -> np.ndarray:
+        std = np.sqrt(np.maximum(var, 0.0))
+        return np.column_stack((mean, mean + self.width * std, mean - self.width * std))
+
+    def _prime(self, bars: BarArrays) -> np.ndarray:
+        close, window = bars.close, self.window
+        # Sums of offsets from the first close keep the variance well conditioned.
+        self._shift = float(close[0])
+        offsets = close - self._shift
+        sums = np.r_[0.0, np.cumsum(offsets)]
+        sums_sq = np.r_[0.0, np.cumsum(offsets * offsets)]
+        out = np.full((len(close), 3), np.nan)
+        if len(close) >= window:
+            total = sums[window:] - sums[:-window]
+            total_sq = sums_sq[window:] - sums_sq[:-window]
+            mean = total / window
+            out[window - 1 :] = self._bands(
+                mean + self._shift, total_sq / window - mean * mean
+            )
+        self._values.extend(close[-window:].tolist())
+        self._resum()
+        return out
+
+    def _resum(self) -> None:
+        offsets = np.fromiter(self._values, float) - self._shift
+        self._sum = float(offsets.sum())
+        self._sum_sq = float((offsets * offsets).sum())
+        self._since_resum = 0
+
+    def _update(self, bar: Bar) -> tuple[float, ...]:
+        if math.isnan(self._shift):
+            self._shift = bar.close
+        if len(self._values) == self.window:
+            dropped = self._values[0] - self._shift
+            self._sum -= dropped
+            self._sum_sq -= dropped * dropped
+        self._values.append(bar.close)
+        offset = bar.close - self._shift
+        self._sum += offset
+        self._sum_sq += offset * offset
+        self._since_resum += 1
+        if self._since_resum >= self.window:
+            # Re-add the window now and then so rounding cannot accumulate.
+            self._resum()
+        if len(self._values) < self.window:
+            return (_NAN,) * 3
+        mean = self._sum / self.window
+        var = self._sum_sq / self.window - mean * mean
+        std = math.sqrt(max(var, 0.0))
+        mean += self._shift
+        return mean, mean + self.width * std, mean - self.width * std
+
+
+def _rsi(avg_gain: np.ndarray, avg_loss: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        rsi = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+    rsi = np.where(avg_loss == 0, np.where(avg_gain == 0, 50.0, 100.0), rsi)
+    return np.where(np.isnan(avg_gain), np.nan, rsi)
+
+
+class RSI(Indicator):
+    """Wilder's relative strength index over ``period`` close-to-close moves."""
+
+    def __init__(self, period: int = 14) -> None:
+        if period < 1:
+            raise ValueError("RSI period must be positive.")
+        self.period = period
+        self.columns = (f"ind_rsi_{period}",)
+        super().__init__()
+
+    def _reset(self) -> None:
+        self._previous = _NAN
+        self._seen = 0
+        self._gain = self._loss = 0.0
+
+    def _prime(self, bars: BarArrays) -> np.ndarray:
+        close, period = bars.close, self.period
+        moves = np.diff(close)
+        gains, losses = np.maximum(moves, 0.0), np.maximum(-moves, 0.0)
+        out = np.full((len(close), 1), np.nan)
+        self._previous, self._seen = float(close[-1]), len(moves)
+        if len(moves) < period:
+            self._gain, self._loss = float(gains.sum()), float(losses.sum())
+            return out
+        avg_gain, avg_loss = _wilder(gains, period), _wilder(losses, period)
+        out[1:, 0] = _rsi(avg_gain, avg_loss)
+        self._gain, self._loss = float(avg_gain[-1]), float(avg_loss[-1])
+        return out
+
+    def _update(self, bar: Bar) -> tuple[float, ...]:
+        previous, self._previous = self._previous, bar.close
+        if math.isnan(previous):
+            return (_NAN,)
+        move = bar.close - previous
+        gain, loss = max(move, 0.0), max(-move, 0.0)
+        self._seen += 1
+        if self._seen < self.period:
+            self._gain += gain
+            self._loss += loss
+            return (_NAN,)
+        if self._seen == self.period:
+            self._gain = (self._gain + gain) / self.period
+            self._loss = (self._loss + loss) / self.period
+        else:
+            self._gain += (gain - self._gain) / self.period
+            self._loss += (loss - self._loss) / self.period
+        if self._loss == 0:
+            return (50.0 if self._gain == 0 else 100.0,)
+        return (100.0 - 100.0 / (1.0 + self._gain / self._loss),)
+
+
+class MACD(Indicator):
+    """Fast minus slow EMA of the close, its ``signal`` EMA and the histogram."""
+
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9) -> None:
+        if not 0 < fast < slow or signal < 1:
+            raise ValueError("MACD needs 0 < fast < slow and a positive signal span.")
+        self.fast, self.slow, self.signal = fast, slow, signal
+        suffix = f"{fast}_{slow}_{signal}"
+        self.columns = (
+            f"ind_macd_{suffix}",
+            f"ind_macd_signal_{suffix}",
+            f"ind_macd_hist_{suffix}",
+        )
+        super().__init__()
+
+    def _reset(self) -> None:
+        self._fast = _EMAState(2.0 / (self.fast + 1))
+        self._slow = _EMAState(2.0 / (self.slow + 1))
+        self._signal = _EMAState(2.0 / (self.signal + 1))
+
+    def _prime(self, bars: BarArrays) -> np.ndarray:
+        macd = self._fast.prime(bars.close) - self._slow.prime(bars.close)
+        signal = self._signal.prime(macd)
+        return np.column_stack((macd, signal, macd - signal))
+
+    def _update(self, bar: Bar) -> tuple[float, ...]:
+        macd = self._fast.step(bar.close) - self._slow.step(bar.close)
+        signal = self._signal.step(macd)
+        return macd, signal, macd - signal
+
+
+class ATR(Indicator):
+    """Wilder's average true range; the first bar's range is ``high - low``."""
+
+    def __init__(self, period: int = 14) -> None:
+        if period < 1:
+            raise ValueError("ATR period must be positive.")
+        self.period = period
+        self.columns = (f"ind_atr_{period}",)
+        super().__init__()
+
+    def _reset(self) -> None:
+        self._previous = _NAN
+        self._seen = 0
+        self._atr = 0.0
+
+    def _prime(self, bars: BarArrays) -> np.ndarray:
+        high, low, close = bars.high, bars.low, bars.close
+        previous = np.r_[np.nan, close[:-1]]
+        ranges = np.fmax(
+            high - low, np.fmax(np.abs(high - previous), np.abs(low - previous))
+        )
+        atr = _wilder(ranges, self.period)
+        self._previous, self._seen = float(close[-1]), len(close)
+        self._atr = float(ranges.sum()) if len(close) < self.period else atr[-1]
+        return atr[:, None]
+
+    def _update(self, bar: Bar) -> tuple[float, ...]:
+        true_range = bar.high - bar.low
+        if not math.isnan(self._previous):
+            true_range = max(
+                true_range,
+                abs(bar.high - self._previous),
+                abs(bar.low - self._previous),
+            )
+        self._previous = bar.close
+        self._seen += 1
+        if self._seen < self.period:
+            self._atr += true_range
+            return (_NAN,)
+        if self._seen == self.period:
+            self._atr = (self._atr + true_range) / self.period
+        else:
+            self._atr += (true_range - self._atr) / self.period
+        return (self._atr,)
+
+
+class VWAP(Indicator):
+    """Volume-weighted typical price ``(high + low + close) / 3``.
+
+    Accumulation restarts every ``session_days`` UTC days (``0`` never restarts).
+    Until a session has traded any volume the typical price is returned.
+    """
+
+    overlay = True
+
+    def __init__(self, session_days: int = 1) -> None:
+        if session_days < 0:
+            raise ValueError("VWAP session length cannot be negative.")
+        self.session_days = session_days
+        self.columns = (
+            "ind_vwap" if session_days == 1 else f"ind_vwap_{session_days}",
+        )
+        super().__init__()
+
+    def _reset(self) -> None:
+        self._session = None
+        self._value = self._volume = 0.0
+
+    def _sessions(self, stamps: np.ndarray) -> np.ndarray:
+        # Works on scalars too, which keeps ``_update`` free of array overhead.
+        if self.session_days == 0:
+            return stamps * 0
+        return stamps // (_NS_PER_DAY * self.session_days)
+
+    def _prime(self, bars: BarArrays) -> np.ndarray:
+        typical = (bars.high + bars.low + bars.close) / 3.0
+        sessions = self._sessions(bars.stamp)
+        starts = np.flatnonzero(np.r_[True, sessions[1:] != sessions[:-1]])
+        lengths = np.diff(np.r_[starts, len(sessions)])
+
+        def session_cumsum(values: np.ndarray) -> np.ndarray:
+            totals = np.cumsum(values)
+            before = np.r_[0.0, totals][starts]
+            return totals - np.repeat(before, lengths)
+
+        value = session_cumsum(typical * bars.volume)
+        volume = session_cumsum(bars.volume)
+        self._session = int(sessions[-1])
+        self._value, self._volume = float(value[-1]), float(volume[-1])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            vwap = np.where(volume > 0, value / volume, typical)
+        return vwap[:, None]
+
+    def _update(self, bar: Bar) -> tuple[float, ...]:
+        session = self._sessions(bar.stamp)
+        if session != self._session:
+            self._session, self._value, self._volume = session, 0.0, 0.0
+        typical = (bar.high + bar.low + bar.close) / 3.0
+        volume = 0.0 if math.isnan(bar.volume) else bar.volume
+        self._value += typical * volume
+        self._volume += volume
+        return (self._value / self._volume if self._volume > 0 else typical,)
+
+
+INDICATORS: dict[str, type[Indicator]] = {
+    "ema": EMA,
+    "bb": Bollinger,
+    "rsi": RSI,
+    "macd": MACD,
+    "atr": ATR,
+    "vwap": VWAP,
+}
+
+
+def parse_indicator(spec: str) -> Indicator:
+    """Build an indicator from ``"name"`` or ``"name:param,param"`` (e.g.
+    ``"ema:50"``, ``"bb:20,2.5"``, ``"macd:12,26,9"``)."""
+
+    name, _, params = spec.strip().lower().partition(":")
+    if name not in INDICATORS:
+        raise ValueError(
+            f"Unknown indicator {name!r}; choose from {sorted(INDICATORS)}."
+        )
+    args = [float(arg) if "." in arg else int(arg) for arg in params.split(",") if arg]
+    return INDICATORS[name](*args)
+
+
+class IndicatorBook:
+    """Indicator states per ticker for a fixed list of specs."""
+
+    def __init__(self, specs: Sequence[str]) -> None:
+        self.specs = tuple(specs)
+        self.columns = tuple(
+            column for spec in self.specs for column in parse_indicator(spec).columns
+        )
+        if len(set(self.columns)) != len(self.columns):
+            raise ValueError(f"Indicator specs produce duplicate columns: {specs}")
+        self._states: dict[str, list[Indicator]] = {}
+
+    def _fresh(self) -> list[Indicator]:
+        return [parse_indicator(spec) for spec in self.specs]
+
+    def prime(self, price_frame: pd.DataFrame) -> pd.DataFrame:
+        """Sorted copy of ``price_frame`` with ``ind_*`` columns, replacing the
+        state of every ticker it contains."""
+
+        frame, codes = _sorted_with_codes(
+            price_frame, ["ticker", "datetime", "high", "low", "close", "volume"]
+        )
+        outputs = np.full((len(frame), len(self.columns)), np.nan)
+        starts = _segment_starts(codes)
+        tickers = frame["ticker"].to_numpy()
+        for start, end in zip(starts, np.r_[starts[1:], len(frame)], strict=True):
+            bars = BarArrays.from_frame(frame.iloc[start:end])
+            states = self._fresh()
+            outputs[start:end] = np.column_stack(
+                [state.prime(bars) for state in states]
+            )
+            self._states[str(tickers[start])] = states
+        for index, column in enumerate(self.columns):
+            frame[column] = outputs[:, index]
+        return frame
+
+    def update(self, ticker: str, bar: Bar) -> dict[str, float]:
+        """Advance ``ticker`` by one bar (a new ticker starts from scratch)."""
+
+        states = self._states.get(ticker)
+        if states is None:
+            states = self._states[ticker] = self._fresh()
+        values = [value for state in states for value in state.update(bar)]
+        return dict(zip(self.columns, values, strict=True))
+
+
+@instrument("indicators.compute")
+def compute_indicators(price_frame: pd.DataFrame, specs: Iterable[str]) -> pd.DataFrame:
+    """Sorted copy of ``price_frame`` with one ``ind_*`` column per output."""
+
+    return IndicatorBook(list(specs)).prime(price_frame)
+
+
+def overlay_columns(specs: Iterable[str]) -> list[str]:
+    """``ind_*`` columns of ``specs`` that share the price axis."""
+
+    indicators = [parse_indicator(spec) for spec in specs]
+    return [column for ind in indicators if ind.overlay for column in ind.columns]
+
+
+__all__ = [
+    "ATR",
+    "EMA",
+    "INDICATORS",
+    "MACD",
+    "PRESETS",
+    "RSI",
+    "VWAP",
+    "Bar",
+    "BarArrays",
+    "Bollinger",
+    "Indicator",
+    "IndicatorBook",
+    "compute_indicators",
+    "overlay_columns",
+    "parse_indicator",
+]
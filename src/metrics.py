@@ -0,0 +1,294 @@
+"""Lightweight instrumentation: stage timings, counters and Prometheus export.
+
+Hot paths are wrapped with :func:`instrument` (functions) or :func:`timed`
+(blocks). Each finished stage updates the process-wide :data:`REGISTRY`, emits one
+structured (JSON) debug log line and, when a :func:`trace` is active in the
+current context, is appended to it so a page render can show its own breakdown.
+
+The registry renders Prometheus text format via :func:`render_prometheus`; use
+:func:`write_prometheus` for a node-exporter textfile or :func:`serve_metrics` for
+a local ``/metrics`` endpoint.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import functools
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, TypeVar
+
+import pandas as pd
+
+LOGGER = logging.getLogger(__name__)
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+_Labels = tuple[tuple[str, str], ...]
+
+
+@dataclass
+class Span:
+    """One measured stage; ``rows``/``bytes`` may be filled in by the caller."""
+
+    stage: str
+    seconds: float = 0.0
+    rows: int | None = None
+    bytes: int | None = None
+    error: str | None = None
+    labels: dict[str, str] = field(default_factory=dict)
+
+
+class MetricsRegistry:
+    """Thread-safe counters, gauges and stage summaries keyed by labels."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._counters: dict[tuple[str, _Labels], float] = {}
+        self._gauges: dict[tuple[str, _Labels], float] = {}
+        self._help: dict[str, tuple[str, str]] = {}
+
+    def _declare(self, name: str, kind: str, description: str) -> None:
+        self._help.setdefault(name, (kind, description))
+
+    def increment(
+        self, name: str, amount: float = 1.0, description: str = "", **labels: str
+    ) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._declare(name, "counter", description)
+            self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def set_gauge(
+        self, name: str, value: float, description: str = "", **labels: str
+    ) -> None:
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._declare(name, "gauge", description)
+            self._gauges[key] = float(value)
+
+    def observe(self, span: Span) -> None:
+        """Fold a finished stage into the per-stage counters."""
+
+        labels = {"stage": span.stage, **span.labels}
+        self.increment(
+            "cci_stage_seconds_total", span.seconds, "Wall time per stage.", **labels
+        )
+        self.increment("cci_stage_calls_total", 1, "Calls per stage.", **labels)
+        self.set_gauge(
+            "cci_stage_last_seconds", span.seconds, "Latest wall time.", **labels
+        )
+        if span.rows is not None:
+            self.increment(
+                "cci_stage_rows_total", span.rows, "Rows processed.", **labels
+            )
+        if span.bytes is not None:
+            self.increment(
+                "cci_stage_bytes_total", span.bytes, "Bytes produced.", **labels
+            )
+        if span.error is not None:
+            self.increment("cci_stage_errors_total", 1, "Stages that raised.", **labels)
+
+    def value(self, name: str, **labels: str) -> float | None:
+        """Current value of a counter or gauge (``None`` if never recorded)."""
+
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            return self._counters.get(key, self._gauges.get(key))
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+            self._help.clear()
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+
+        with self._lock:
+            samples = {**self._counters, **self._gauges}
+            help_ = dict(self._help)
+        lines = []
+        for name in sorted(help_):
+            kind, description = help_[name]
+            lines.append(f"# HELP {name} {description or name}")
+            lines.append(f"# TYPE {name} {kind}")
+            for (sample, labels), value in sorted(samples.items()):
+                if sample != name:
+                    continue
+                rendered = ",".join(
+                    f'{key}="{_escape(str(val))}"' for key, val in labels
+                )
+                suffix = f"{{{rendered}}}" if rendered else ""
+                lines.append(f"{name}{suffix} {value:.9g}")
+        return "\n".join(lines) + "\n"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REGISTRY = MetricsRegistry()
+
+_TRACE: contextvars.ContextVar[list[Span] | None] = contextvars.ContextVar(
+    "cci_trace", default=None
+)
+
+
+@contextlib.contextmanager
+def trace() -> Iterator[list[Span]]:
+    """Collect every span finished in this context (e.g. one page render)."""
+
+    spans: list[Span] = []
+    token = _TRACE.set(spans)
+    try:
+        yield spans
+    finally:
+        _TRACE.reset(token)
+
+
+def _finish(span: Span, started: float) -> None:
+    span.seconds = time.perf_counter() - started
+    REGISTRY.observe(span)
+    spans = _TRACE.get()
+    if spans is not None:
+        spans.append(span)
+    if LOGGER.isEnabledFor(logging.DEBUG):
+        LOGGER.debug(
+            json.dumps(
+                {
+                    "event": "stage",
+                    "stage": span.stage,
+                    "seconds": round(span.seconds, 6),
+                    "rows": span.rows,
+                    "bytes": span.bytes,
+                    "error": span.error,
+                    **span.labels,
+                }
+            )
+        )
+
+
+@contextlib.contextmanager
+def timed(stage: str, rows: int | None = None, **labels: str) -> Iterator[Span]:
+    """Measure a block; set ``span.rows``/``span.bytes`` inside it if known."""
+
+    span = Span(stage, rows=rows, labels=labels)
+    started = time.perf_counter()
+    try:
+        yield span
+    except BaseException as exc:
+        span.error = type(exc).__name__
+        raise
+    finally:
+        _finish(span, started)
+
+
+def _frame_size(value: object) -> tuple[int | None, int | None]:
+    if isinstance(value, pd.DataFrame):
+        # Shallow memory_usage is O(columns); deep would scan object columns.
+        return len(value), int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return len(value), int(value.memory_usage(index=True))
+    return None, None
+
+
+def instrument(stage: str) -> Callable[[F], F]:
+    """Decorator form of :func:`timed`.
+
+    Row and byte counts come from the return value when it is a pandas object,
+    otherwise the row count of the first dataframe argument is recorded.
+    """
+
+    def decorate(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            with timed(stage) as span:
+                result = func(*args, **kwargs)
+                span.rows, span.bytes = _frame_size(result)
+                if span.rows is None:
+                    frame = next(
+                        (arg for arg in args if isinstance(arg, pd.DataFrame)), None
+                    )
+                    span.rows = None if frame is None else len(frame)
+                return result
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def record_cache(cache: str, result: str) -> None:
+    """Count a cache lookup outcome (``hit``, ``stale`` or ``miss``)."""
+
+    REGISTRY.increment(
+        "cci_cache_requests_total",
+        1,
+        "Cache lookups by outcome.",
+        cache=cache,
+        result=result,
+    )
+
+
+def render_prometheus() -> str:
+    return REGISTRY.render()
+
+
+def write_prometheus(path: str | Path) -> None:
+    """Atomically write the registry for a Prometheus textfile collector."""
+
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp = tempfile.mkstemp(dir=path.parent, prefix=".metrics-", suffix=".prom")
+    with os.fdopen(fd, "w", encoding="utf-8") as handle:
+        handle.write(render_prometheus())
+    os.replace(temp, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802 - http.server naming.
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        LOGGER.debug("metrics endpoint: " + format, *args)
+
+
+def serve_metrics(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """Serve ``/metrics`` on a daemon thread; call ``shutdown()`` to stop."""
+
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(
+        target=server.serve_forever, name="metrics-http", daemon=True
+    ).start()
+    return server
+
+
+__all__ = [
+    "REGISTRY",
+    "MetricsRegistry",
+    "Span",
+    "instrument",
+    "record_cache",
+    "render_prometheus",
+    "serve_metrics",
+    "timed",
+    "trace",
+    "write_prometheus",
+]
@@ -0,0 +1,334 @@
+"""Monte Carlo scenario engine for commodity baskets.
+
+A :class:`ReturnModel` is estimated once from the returns frame produced by
+:func:`src.analytics.compute_daily_returns`. Scenarios are then drawn either from a
+correlated geometric Brownian motion or by bootstrapping whole historical return
+rows (which keeps fat tails and cross-commodity dependence).
+
+Risk figures only need each path's terminal value, so :func:`simulate_terminal`
+never builds the ``paths x steps x tickers`` cube: GBM terminal log returns are
+drawn exactly from their aggregated normal distribution, and bootstrap sums are
+formed from per-path draw counts times the history matrix. Work is split into
+fixed-size shards with independent child seeds, so results are identical whether
+shards run in-process or on a process pool writing into shared memory.
+"""
+
+from __future__ import annotations
+
+import os
+from collections.abc import Iterator, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+_METHODS = ("gbm", "bootstrap")
+_DTYPE = np.float32
+# Memory for one block of bootstrap draw counts (see ``_terminal_shard``).
+_COUNT_BYTES = 32 * 1024 * 1024
+
+
+@dataclass(frozen=True)
+class ReturnModel:
+    """Per-step log-return moments and the aligned history they came from."""
+
+    tickers: tuple[str, ...]
+    mean: np.ndarray
+    cov: np.ndarray
+    history: np.ndarray
+
+    @property
+    def volatility(self) -> np.ndarray:
+        return np.sqrt(np.diag(self.cov))
+
+
+def estimate_model(returns_frame: pd.DataFrame) -> ReturnModel:
+    """Estimate drift, volatility and covariance from a tidy returns frame.
+
+    ``returns_frame`` has the ``ticker``/``datetime``/``daily_return`` columns of
+    :func:`src.analytics.compute_daily_returns`. Only timestamps where every
+    ticker traded are used, so the covariance describes simultaneous moves.
+    """
+
+    missing = {"ticker", "datetime", "daily_return"}.difference(returns_frame.columns)
+    if missing:
+        raise ValueError(f"Dataframe is missing required columns: {sorted(missing)}")
+
+    # Each ticker's first row is a placeholder zero, not an observed move; drop it
+    # per ticker, since tickers that start later have theirs inside the overlap.
+    first = returns_frame.groupby("ticker", observed=True)["datetime"].transform("min")
+    wide = (
+        returns_frame.loc[returns_frame["datetime"] > first]
+        .pivot_table(
+            index="datetime", columns="ticker", values="daily_return", observed=True
+        )
+        .sort_index()
+        .dropna()
+    )
+    if len(wide) < 2:
+        raise ValueError("At least two overlapping returns are needed to simulate.")
+
+    history = np.log1p(wide.to_numpy(dtype=float))
+    cov = np.atleast_2d(np.cov(history, rowvar=False))
+    return ReturnModel(
+        tickers=tuple(str(ticker) for ticker in wide.columns),
+        mean=history.mean(axis=0),
+        cov=cov,
+        history=history,
+    )
+
+
+def _cholesky(cov: np.ndarray) -> np.ndarray:
+    """Cholesky factor with a tiny ridge for near-singular covariances."""
+
+    jitter = 0.0
+    scale = float(np.mean(np.diag(cov))) or 1.0
+    for _ in range(6):
+        try:
+            return np.linalg.cholesky(cov + jitter * np.eye(len(cov)))
+        except np.linalg.LinAlgError:
+            jitter = max(jitter * 10, scale * 1e-10)
+    raise ValueError("Return covariance is not positive semi-definite.")
+
+
+def _validate(method: str, n_paths: int, steps: int) -> None:
+    if method not in _METHODS:
+        raise ValueError(f"Unknown simulation method: {method}")
+    if n_paths < 1 or steps < 1:
+        raise ValueError("Paths and steps must be positive.")
+
+
+def simulate_paths(
+    model: ReturnModel,
+    n_paths: int,
+    steps: int,
+    method: str = "gbm",
+    seed: int | None = None,
+    batch_size: int = 10_000,
+) -> Iterator[np.ndarray]:
+    """Yield cumulative log-return paths in ``(batch, steps, tickers)`` blocks.
+
+    Use this when path shape matters (fan charts, drawdowns); for risk figures
+    :func:`simulate_terminal` is far cheaper.
+    """
+
+    _validate(method, n_paths, steps)
+    rng = np.random.default_rng(seed)
+    chol = _cholesky(model.cov)
+    for offset in range(0, n_paths, batch_size):
+        size = min(batch_size, n_paths - offset)
+        if method == "gbm":
+            shocks = rng.standard_normal((size, steps, len(model.tickers)))
+            increments = model.mean + shocks @ chol.T
+        else:
+            rows = rng.integers(0, len(model.history), size=(size, steps))
+            increments = model.history[rows]
+        yield np.cumsum(increments, axis=1)
+
+
+def _terminal_shard(
+    model: ReturnModel,
+    steps: int,
+    method: str,
+    size: int,
+    seed: np.random.SeedSequence,
+) -> np.ndarray:
+    """Terminal log returns for ``size`` paths, shape ``(size, tickers)``."""
+
+    rng = np.random.default_rng(seed)
+    if method == "gbm":
+        # Sums of i.i.d. correlated normals are normal: draw the terminal directly.
+        shocks = rng.standard_normal((size, len(model.tickers)))
+        terminal = steps * model.mean + np.sqrt(steps) * (
+            shocks @ _cholesky(model.cov).T
+        )
+        return terminal.astype(_DTYPE, copy=False)
+
+    n_rows = len(model.history)
+    history = model.history.astype(_DTYPE)
+    draws = rng.integers(0, n_rows, size=(size, steps), dtype=np.int64)
+    if n_rows > steps * len(model.tickers):
+        # Long histories: gather one step at a time to keep memory at size x tickers.
+        terminal = np.zeros((size, len(model.tickers)), dtype=_DTYPE)
+        for step in range(steps):
+            terminal += history[draws[:, step]]
+        return terminal
+
+    # Short histories: count how often each row is drawn per path and sum the rows
+    # with one matrix product instead of gathering ``size x steps`` rows. Paths
+    # are counted in blocks so the int64 counts and their float copy stay within
+    # ``_COUNT_BYTES`` whatever the shard size.
+    block = max(1, _COUNT_BYTES // (n_rows * (8 + np.dtype(_DTYPE).itemsize)))
+    offsets = np.arange(min(block, size), dtype=np.int64)[:, None] * n_rows
+    terminal = np.empty((size, len(model.tickers)), dtype=_DTYPE)
+    for lo in range(0, size, block):
+        hi = min(size, lo + block)
+        counts = np.bincount(
+            (draws[lo:hi] + offsets[: hi - lo]).ravel(), minlength=(hi - lo) * n_rows
+        )
+        terminal[lo:hi] = counts.reshape(hi - lo, n_rows).astype(_DTYPE) @ history
+    return terminal
+
+
+def _shard_into_shared(
+    name: str,
+    shape: tuple[int, int],
+    start: int,
+    model: ReturnModel,
+    steps: int,
+    method: str,
+    size: int,
+    seed: np.random.SeedSequence,
+) -> None:
+    """Process-pool entry point: write one shard straight into shared memory."""
+
+    block = shared_memory.SharedMemory(name=name)
+    try:
+        out = np.ndarray(shape, dtype=_DTYPE, buffer=block.buf)
+        out[start : start + size] = _terminal_shard(model, steps, method, size, seed)
+        del out
+    finally:
+        block.close()
+
+
+def simulate_terminal(
+    model: ReturnModel,
+    n_paths: int,
+    steps: int,
+    method: str = "gbm",
+    seed: int | None = None,
+    shard_size: int = 65_536,
+    workers: int | None = 1,
+) -> np.ndarray:
+    """Terminal cumulative log returns, shape ``(n_paths, tickers)`` as float32.
+
+    Paths are split into ``shard_size`` shards whose seeds are spawned from
+    ``seed``, so output depends only on ``seed`` and ``shard_size``. With
+    ``workers > 1`` (``None`` = every core) shards run on a process pool and write
+    into one shared-memory array, avoiding a pickle round-trip for the results.
+    """
+
+    _validate(method, n_paths, steps)
+    starts = list(range(0, n_paths, shard_size))
+    sizes = [min(shard_size, n_paths - start) for start in starts]
+    seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    shape = (n_paths, len(model.tickers))
+    workers = min(workers or os.cpu_count() or 1, len(starts))
+
+    if workers <= 1:
+        out = np.empty(shape, dtype=_DTYPE)
+        for start, size, child in zip(starts, sizes, seeds, strict=True):
+            out[start : start + size] = _terminal_shard(
+                model, steps, method, size, child
+            )
+        return out
+
+    nbytes = int(np.prod(shape)) * np.dtype(_DTYPE).itemsize
+    block = shared_memory.SharedMemory(create=True, size=max(nbytes, 1))
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    _shard_into_shared,
+                    block.name,
+                    shape,
+                    start,
+                    model,
+                    steps,
+                    method,
+                    size,
+                    child,
+                )
+                for start, size, child in zip(starts, sizes, seeds, strict=True)
+            ]
+            for future in futures:
+                future.result()
+        return np.ndarray(shape, dtype=_DTYPE, buffer=block.buf).copy()
+    finally:
+        block.close()
+        block.unlink()
+
+
+@dataclass(frozen=True)
+class RiskReport:
+    """Value-at-Risk and Expected Shortfall of simulated horizon returns.
+
+    Both frames are indexed by ticker plus ``"PORTFOLIO"`` with one column per
+    confidence level; losses are reported as positive fractions of value.
+    """
+
+    var: pd.DataFrame
+    es: pd.DataFrame
+    n_paths: int
+    steps: int
+    method: str
+
+
+def _tail_metrics(
+    returns: np.ndarray, levels: Sequence[float]
+) -> tuple[list[float], list[float]]:
+    var, es = [], []
+    for level in levels:
+        cutoff = np.quantile(returns, 1.0 - level)
+        var.append(float(-cutoff))
+        es.append(float(-returns[returns <= cutoff].mean()))
+    return var, es
+
+
+def scenario_risk(
+    model: ReturnModel,
+    n_paths: int = 100_000,
+    steps: int = 250,
+    method: str = "gbm",
+    weights: Sequence[float] | None = None,
+    levels: Sequence[float] = (0.95, 0.99),
+    seed: int | None = None,
+    workers: int | None = 1,
+) -> RiskReport:
+    """Simulate ``steps``-bar horizons and summarise per-ticker and basket tails.
+
+    The basket is buy-and-hold with ``weights`` (equal by default), so its horizon
+    return is the weighted sum of each ticker's simple return.
+    """
+
+    if any(not 0.0 < level < 1.0 for level in levels):
+        raise ValueError("Confidence levels must lie strictly between 0 and 1.")
+    n_tickers = len(model.tickers)
+    weights = np.full(n_tickers, 1.0 / n_tickers) if weights is None else weights
+    weights = np.asarray(weights, dtype=float)
+    if weights.shape != (n_tickers,):
+        raise ValueError(f"Expected {n_tickers} weights, got {len(weights)}.")
+
+    terminal = np.expm1(
+        simulate_terminal(model, n_paths, steps, method, seed, workers=workers)
+    )
+    labels = [*model.tickers, "PORTFOLIO"]
+    var_rows, es_rows = [], []
+    for column in range(n_tickers):
+        var, es = _tail_metrics(terminal[:, column], levels)
+        var_rows.append(var)
+        es_rows.append(es)
+    var, es = _tail_metrics(terminal @ weights.astype(_DTYPE), levels)
+    var_rows.append(var)
+    es_rows.append(es)
+
+    columns = [f"{level:.1%}" for level in levels]
+    return RiskReport(
+        var=pd.DataFrame(var_rows, index=labels, columns=columns),
+        es=pd.DataFrame(es_rows, index=labels, columns=columns),
+        n_paths=n_paths,
+        steps=steps,
+        method=method,
+    )
+
+
+__all__ = [
+    "ReturnModel",
+    "RiskReport",
+    "estimate_model",
+    "scenario_risk",
+    "simulate_paths",
+    "simulate_terminal",
+]
@@ -1,11 +1,23 @@
-"""Plotly chart builders for the commodity dashboard."""
+"""Plotly chart builders for the commodity dashboard.
+
+Plotly is imported inside each builder, so importing this module stays cheap for
+callers that never draw a chart.
+"""
 
 from __future__ import annotations
 
+import html
 from collections.abc import Iterable
+from typing import TYPE_CHECKING
 
 import pandas as pd
-import plotly.graph_objects as go
+
+from .downsample import lttb_indices, minmax_indices
+from .metrics import instrument
+from .query import IndexedPrices
+
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 _COLOR_PALETTE = [
     "#1f77b4",
@@ -16,26 +28,83 @@ _COLOR_PALETTE = [
 ]
 
 
-def price_chart(price_frame: pd.DataFrame, moving_windows: Iterable[int]) -> go.Figure:
-    """Construct an interactive price chart with optional moving averages."""
+def _hover_label(ticker: str) -> str:
+    """Escape a ticker for literal use inside a Plotly hover template.
+
+    Plotly renders hover text as HTML, so only markup is escaped; a ``%`` not
+    followed by ``{`` is shown as is.
+    """
+
+    return html.escape(str(ticker), quote=False)
+
+
+def _indexed(prices: pd.DataFrame | IndexedPrices) -> IndexedPrices:
+    return prices if isinstance(prices, IndexedPrices) else IndexedPrices(prices)
+
+
+def _indicator_label(column: str) -> str:
+    """``ind_bb_upper_20`` -> ``BB UPPER 20``."""
+
+    return column.removeprefix("ind_").replace("_", " ").upper()
+
+
+def _thin(group: pd.DataFrame, max_points: int | None, method: str) -> pd.DataFrame:
+    """Reduce ``group`` to roughly ``max_points`` rows chosen from its close line."""
+
+    if max_points is None or len(group) <= max_points:
+        return group
+    close = group["close"].to_numpy(dtype=float)
+    if method == "lttb":
+        stamps = group["datetime"].to_numpy(dtype="datetime64[ns]").view("i8")
+        indices = lttb_indices(stamps, close, max_points)
+    elif method == "minmax":
+        indices = minmax_indices(close, max_points)
+    else:
+        raise ValueError(f"Unknown downsampling method: {method!r}")
+    return group.iloc[indices]
+
+
+@instrument("plotting.price_chart")
+def price_chart(
+    price_frame: pd.DataFrame | IndexedPrices,
+    moving_windows: Iterable[int],
+    max_points: int | None = None,
+    downsample: str = "minmax",
+    use_webgl: bool = False,
+    overlays: Iterable[str] = (),
+) -> go.Figure:
+    """Construct an interactive price chart with optional moving averages.
+
+    ``max_points`` caps the points per ticker (size it to the chart's pixel width);
+    rows are picked from the close line with ``downsample`` (``"minmax"`` or
+    ``"lttb"``) and the moving averages reuse the same timestamps so unified hover
+    stays aligned. ``use_webgl`` switches to ``Scattergl`` for very dense charts.
+    ``overlays`` names price-scale indicator columns (``ind_*``) drawn dotted.
+    """
+
+    import plotly.graph_objects as go
 
     fig = go.Figure()
+    prices = _indexed(price_frame)
     windows = [int(window) for window in moving_windows]
+    overlays = [column for column in overlays if column in prices.frame]
+    trace_type = go.Scattergl if use_webgl else go.Scatter
 
-    for idx, (ticker, group) in enumerate(price_frame.groupby("ticker")):
+    for idx, (ticker, group) in enumerate(prices.blocks()):
         color = _COLOR_PALETTE[idx % len(_COLOR_PALETTE)]
+        label = _hover_label(ticker)
+        group = _thin(group, max_points, downsample)
         fig.add_trace(
-            go.Scatter(
+            trace_type(
                 x=group["datetime"],
                 y=group["close"],
                 mode="lines",
                 name=f"{ticker} close",
                 line=dict(color=color, width=2),
                 hovertemplate=(
-                    "<b>%{text}</b><br>Price: %{y:.2f}<br>"
+                    f"<b>{label}</b><br>Price: %{{y:.2f}}<br>"
                     "Time: %{x|%Y-%m-%d %H:%M}<extra></extra>"
                 ),
-                text=[ticker] * len(group),
             )
         )
         for window in windows:
@@ -43,21 +112,36 @@ def price_chart(price_frame: pd.DataFrame, moving_windows: Iterable[int]) -> go.
             if column not in group:
                 continue
             fig.add_trace(
-                go.Scatter(
+                trace_type(
                     x=group["datetime"],
                     y=group[column],
                     mode="lines",
                     name=f"{ticker} MA {window}",
                     line=dict(color=color, dash="dash"),
                     hovertemplate=(
-                        f"<b>%{{text}}</b><br>MA {window}: %{{y:.2f}}<br>"
+                        f"<b>{label}</b><br>MA {window}: %{{y:.2f}}<br>"
                         "Time: %{x|%Y-%m-%d %H:%M}<extra></extra>"
                     ),
-                    text=[ticker] * len(group),
                     legendgroup=f"{ticker}-ma",
                     showlegend=True,
                 )
             )
+        for column in overlays:
+            name = _indicator_label(column)
+            fig.add_trace(
+                trace_type(
+                    x=group["datetime"],
+                    y=group[column],
+                    mode="lines",
+                    name=f"{ticker} {name}",
+                    line=dict(color=color, dash="dot", width=1),
+                    hovertemplate=(
+                        f"<b>{label}</b><br>{name}: %{{y:.2f}}<br>"
+                        "Time: %{x|%Y-%m-%d %H:%M}<extra></extra>"
+                    ),
+                    legendgroup=f"{ticker}-ind",
+                )
+            )
 
     fig.update_layout(
         title="Price history with moving averages",
@@ -70,17 +154,17 @@ def price_chart(price_frame: pd.DataFrame, moving_windows: Iterable[int]) -> go.
     return fig
 
 
-def returns_chart(returns_frame: pd.DataFrame) -> go.Figure:
+@instrument("plotting.returns_chart")
+def returns_chart(returns_frame: pd.DataFrame | IndexedPrices) -> go.Figure:
     """Build a grouped bar chart of recent percentage returns."""
 
-    recent = (
-        returns_frame.sort_values("datetime")
-        .groupby("ticker", group_keys=False)
-        .tail(30)
-    )
+    returns = _indexed(returns_frame)
+
+    import plotly.graph_objects as go
 
     fig = go.Figure()
-    for idx, (ticker, group) in enumerate(recent.groupby("ticker")):
+    for idx, ticker in enumerate(returns.tickers):
+        group = returns.latest(30, tickers=[ticker])
         color = _COLOR_PALETTE[idx % len(_COLOR_PALETTE)]
         fig.add_trace(
             go.Bar(
@@ -89,10 +173,9 @@ def returns_chart(returns_frame: pd.DataFrame) -> go.Figure:
                 name=f"{ticker} daily return",
                 marker_color=color,
                 hovertemplate=(
-                    "<b>%{text}</b><br>Return: %{y:.2%}<br>"
+                    f"<b>{_hover_label(ticker)}</b><br>Return: %{{y:.2%}}<br>"
                     "Time: %{x|%Y-%m-%d %H:%M}<extra></extra>"
                 ),
-                text=[ticker] * len(group),
             )
         )
 
@@ -108,4 +191,80 @@ def returns_chart(returns_frame: pd.DataFrame) -> go.Figure:
     return fig
 
 
-__all__ = ["price_chart", "returns_chart"]
+@instrument("plotting.indicator_chart")
+def indicator_chart(
+    price_frame: pd.DataFrame | IndexedPrices,
+    columns: Iterable[str],
+    max_points: int | None = None,
+    downsample: str = "minmax",
+) -> go.Figure:
+    """Line chart of indicators on their own scale (RSI, MACD, ATR), one subplot
+    row per column."""
+
+    from plotly.subplots import make_subplots
+
+    prices = _indexed(price_frame)
+    columns = [column for column in columns if column in prices.frame]
+    fig = make_subplots(
+        rows=max(len(columns), 1),
+        cols=1,
+        shared_xaxes=True,
+        subplot_titles=[_indicator_label(column) for column in columns],
+    )
+    for idx, (ticker, group) in enumerate(prices.blocks()):
+        color = _COLOR_PALETTE[idx % len(_COLOR_PALETTE)]
+        label = _hover_label(ticker)
+        group = _thin(group, max_points, downsample)
+        for row, column in enumerate(columns, start=1):
+            fig.add_scatter(
+                x=group["datetime"],
+                y=group[column],
+                mode="lines",
+                name=str(ticker),
+                line=dict(color=color, width=1.5),
+                legendgroup=str(ticker),
+                showlegend=row == 1,
+                hovertemplate=(
+                    f"<b>{label}</b><br>{_indicator_label(column)}: %{{y:.2f}}<br>"
+                    "Time: %{x|%Y-%m-%d %H:%M}<extra></extra>"
+                ),
+                row=row,
+                col=1,
+            )
+
+    fig.update_layout(
+        title="Indicators",
+        height=220 * max(len(columns), 1) + 80,
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        hovermode="x unified",
+        template="plotly_white",
+    )
+    return fig
+
+
+@instrument("plotting.correlation_heatmap")
+def correlation_heatmap(
+    matrix: pd.DataFrame, title: str = "Return correlation"
+) -> go.Figure:
+    """Build a diverging heatmap for a square ticker-by-ticker correlation matrix."""
+
+    labels = [_hover_label(ticker) for ticker in matrix.columns]
+    import plotly.graph_objects as go
+
+    fig = go.Figure(
+        go.Heatmap(
+            z=matrix.to_numpy(),
+            x=labels,
+            y=labels,
+            zmin=-1.0,
+            zmax=1.0,
+            colorscale="RdBu",
+            colorbar=dict(title="Corr"),
+            hovertemplate="%{y} vs %{x}<br>Correlation: %{z:.2f}<extra></extra>",
+        )
+    )
+    fig.update_layout(title=title, template="plotly_white", yaxis_autorange="reversed")
+    return fig
+
+
+__all__ = ["correlation_heatmap", "indicator_chart", "price_chart", "returns_chart"]
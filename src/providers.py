@@ -0,0 +1,310 @@
+"""Pluggable price sources behind one asyncio interface.
+
+A provider turns a :class:`PriceRequest` (tickers, interval and an optional
+``[start, end)`` window) into tidy bars. The data layer runs every request of a
+fetch concurrently on one long-lived event loop (see :func:`run_sync`), so
+providers keep state across calls: :class:`HTTPProvider` holds keep-alive
+connections in a ``requests.Session`` pool that caps connections per host, and
+:class:`LocalFileProvider` serves files such as a ``python -m src.cli export``
+run. The yfinance provider lives in :mod:`src.data` next to the code
+that reshapes its wide frames.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import concurrent.futures
+import contextvars
+import io
+import logging
+import threading
+from collections.abc import Coroutine, Iterable
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Protocol, TypeVar
+from urllib.parse import urlencode
+
+import numpy as np
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from .export import partition_path
+from .frames import sort_prices
+from .store import to_utc
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+TIDY_COLUMNS = (
+    "ticker",
+    "datetime",
+    "open",
+    "high",
+    "low",
+    "close",
+    "adj_close",
+    "volume",
+)
+_ALIASES = {"date": "datetime", "timestamp": "datetime", "adj close": "adj_close"}
+_PRICE_FIELDS = ("open", "high", "low", "close")
+
+
+@dataclass(frozen=True)
+class PriceRequest:
+    """Bars of ``tickers`` at ``interval`` with ``start <= datetime < end``."""
+
+    tickers: tuple[str, ...]
+    interval: str
+    start: str | pd.Timestamp | None = None
+    end: str | pd.Timestamp | None = None
+
+
+class PriceProvider(Protocol):
+    """A source of tidy OHLCV bars."""
+
+    name: str
+
+    async def fetch(
+        self, request: PriceRequest, timeout: float | None = None
+    ) -> pd.DataFrame:
+        """Tidy bars for ``request``; an empty frame when the source has none.
+
+        Raises :class:`TimeoutError` if the source has not answered within
+        ``timeout`` seconds.
+        """
+
+
+def empty_prices() -> pd.DataFrame:
+    return pd.DataFrame(columns=TIDY_COLUMNS)
+
+
+def tidy_bars(
+    frame: pd.DataFrame,
+    ticker: str,
+    start: str | pd.Timestamp | None = None,
+    end: str | pd.Timestamp | None = None,
+) -> pd.DataFrame:
+    """Coerce one ticker's bars from a file or response to the tidy schema.
+
+    Column names are matched case-insensitively (``Date``/``Adj Close`` work too),
+    ``adj_close`` falls back to ``close`` and extra columns are dropped.
+    """
+
+    if frame.empty:
+        return empty_prices()
+    frame = frame.rename(
+        columns=lambda name: _ALIASES.get(str(name).strip().lower(), str(name).lower())
+    )
+    missing = [
+        name for name in ("datetime", *_PRICE_FIELDS, "volume") if name not in frame
+    ]
+    if missing:
+        raise ValueError(f"Missing columns in price data for {ticker}: {missing}")
+
+    stamps = pd.to_datetime(frame["datetime"], utc=True)
+    keep = np.ones(len(frame), dtype=bool)
+    if start is not None:
+        keep &= (stamps >= to_utc(start)).to_numpy()
+    if end is not None:
+        keep &= (stamps < to_utc(end)).to_numpy()
+    frame, stamps = frame.loc[keep], stamps.loc[keep]
+
+    columns: dict[str, Any] = {
+        "ticker": np.full(len(frame), ticker, dtype=object),
+        "datetime": stamps.array,
+    }
+    for name in (*_PRICE_FIELDS, "adj_close"):
+        source = frame[name if name in frame else "close"]
+        columns[name] = pd.to_numeric(source, errors="coerce").to_numpy(dtype=float)
+    volume = pd.to_numeric(frame["volume"], errors="coerce").to_numpy(dtype=float)
+    columns["volume"] = np.where(np.isnan(volume), 0, volume).astype(int)
+    return sort_prices(pd.DataFrame(columns))
+
+
+def concat_prices(frames: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return empty_prices()
+    return sort_prices(pd.concat(frames, ignore_index=True))
+
+
+class HTTPProvider:
+    """Bars from an HTTP service answering one CSV per ticker and window.
+
+    ``GET {base_url}/bars?ticker=CL%3DF&interval=1d&start=<iso>&end=<iso>`` must
+    return tidy CSV columns (``datetime, open, high, low, close, adj_close,
+    volume``); 404 means no bars for the window. The tickers of a request are
+    fetched concurrently on worker threads through one ``requests.Session``,
+    whose pool keeps at most ``max_per_host`` connections per host and makes
+    further requests wait for one.
+    """
+
+    name = "http"
+
+    def __init__(
+        self,
+        base_url: str,
+        max_per_host: int = 4,
+        session: requests.Session | None = None,
+    ) -> None:
+        if max_per_host < 1:
+            raise ValueError("max_per_host must be at least 1.")
+        self.base_url = base_url.rstrip("/")
+        if session is None:
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_maxsize=max_per_host, pool_block=True)
+            session.mount("http://", adapter)
+            session.mount("https://", adapter)
+        self.session = session
+
+    def url(self, ticker: str, request: PriceRequest) -> str:
+        params = {"ticker": ticker, "interval": request.interval}
+        for bound in ("start", "end"):
+            value = getattr(request, bound)
+            if value is not None:
+                params[bound] = to_utc(value).isoformat()
+        return f"{self.base_url}/bars?{urlencode(params)}"
+
+    def _get(self, url: str, timeout: float | None) -> requests.Response:
+        return self.session.get(url, timeout=timeout)
+
+    async def _fetch_one(
+        self, ticker: str, request: PriceRequest, timeout: float | None
+    ) -> pd.DataFrame:
+        url = self.url(ticker, request)
+        # ``requests`` times each socket operation; ``wait_for`` bounds the whole
+        # exchange, including the wait for a pooled connection.
+        response = await asyncio.wait_for(
+            asyncio.to_thread(self._get, url, timeout), timeout
+        )
+        if response.status_code == 404 or (
+            response.status_code == 200 and not response.content.strip()
+        ):
+            return empty_prices()
+        if response.status_code != 200:
+            raise requests.HTTPError(
+                f"HTTP {response.status_code} from {url}", response=response
+            )
+        frame = pd.read_csv(io.BytesIO(response.content))
+        return tidy_bars(frame, ticker, request.start, request.end)
+
+    async def fetch(
+        self, request: PriceRequest, timeout: float | None = None
+    ) -> pd.DataFrame:
+        frames = await asyncio.gather(
+            *(self._fetch_one(ticker, request, timeout) for ticker in request.tickers)
+        )
+        return concat_prices(frames)
+
+    def close(self) -> None:
+        """Close the session's pooled connections."""
+
+        self.session.close()
+
+
+class LocalFileProvider:
+    """Bars from ``interval=<i>/ticker=<t>/part.{parquet,csv}`` files under ``root``.
+
+    That is the layout written by ``python -m src.cli export``, so an export run
+    can feed the dashboard offline; missing files mean no bars.
+    """
+
+    name = "local"
+
+    def __init__(self, root: str | Path) -> None:
+        self.root = Path(root)
+
+    def _read(self, request: PriceRequest) -> pd.DataFrame:
+        frames = []
+        for ticker in request.tickers:
+            for fmt, reader in (("parquet", pd.read_parquet), ("csv", pd.read_csv)):
+                path = partition_path(self.root, request.interval, ticker, fmt)
+                if path.exists():
+                    frames.append(
+                        tidy_bars(reader(path), ticker, request.start, request.end)
+                    )
+                    break
+        return concat_prices(frames)
+
+    async def fetch(
+        self, request: PriceRequest, timeout: float | None = None
+    ) -> pd.DataFrame:
+        return await asyncio.to_thread(self._read, request)
+
+
+class _LoopThread:
+    """A daemon thread running the event loop shared by synchronous callers."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+
+    def _start(self) -> asyncio.AbstractEventLoop:
+        with self._lock:
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                # Blocking providers (yfinance, file reads) run on this pool.
+                loop.set_default_executor(
+                    concurrent.futures.ThreadPoolExecutor(
+                        max_workers=32, thread_name_prefix="fetch"
+                    )
+                )
+                self._thread = threading.Thread(
+                    target=loop.run_forever, name="fetch-loop", daemon=True
+                )
+                self._thread.start()
+                self._loop = loop
+            return self._loop
+
+    def run(self, coro: Coroutine[Any, Any, T]) -> T:
+        loop = self._start()
+        if threading.current_thread() is self._thread:
+            coro.close()
+            raise RuntimeError("run_sync cannot be called from the fetch loop.")
+        result: concurrent.futures.Future = concurrent.futures.Future()
+
+        def start() -> None:
+            task = loop.create_task(coro)
+            task.add_done_callback(lambda done: _settle(done, result))
+
+        # Run in the caller's context so metric spans land in its ``trace()``.
+        loop.call_soon_threadsafe(start, context=contextvars.copy_context())
+        return result.result()
+
+
+def _settle(task: asyncio.Task, result: concurrent.futures.Future) -> None:
+    if task.cancelled():
+        result.cancel()
+    elif task.exception() is not None:
+        result.set_exception(task.exception())
+    else:
+        result.set_result(task.result())
+
+
+_LOOP = _LoopThread()
+
+
+def run_sync(coro: Coroutine[Any, Any, T]) -> T:
+    """Run ``coro`` on the shared fetch loop and block until it finishes.
+
+    Using one loop for every call keeps provider state, such as the shared
+    executor, alive across fetches; it is safe to call from any thread.
+    """
+
+    return _LOOP.run(coro)
+
+
+__all__ = [
+    "HTTPProvider",
+    "LocalFileProvider",
+    "PriceProvider",
+    "PriceRequest",
+    "TIDY_COLUMNS",
+    "concat_prices",
+    "empty_prices",
+    "run_sync",
+    "tidy_bars",
+]
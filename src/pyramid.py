@@ -0,0 +1,257 @@
+"""Multi-resolution bar pyramid: derive coarser bars locally from finer ones.
+
+Switching the dashboard between ``5m``, ``1h`` and ``1d`` used to mean one
+upstream download per interval. :class:`BarPyramid` remembers which resolutions
+have been fetched for a ``(tickers, start, end)`` window and serves any coarser
+interval whose width is a multiple of one of them by resampling locally with
+:func:`resample_bars`. That also covers intervals Yahoo does not offer, such as
+``4h`` or ``1w``, which are built from ``1h``/``1d`` downloads. A finer
+resolution is only used when its download reaches back to the window start:
+Yahoo keeps intraday history for a limited time (about 60 days of ``5m`` bars).
+
+Bins are left-labelled and aligned to Monday 00:00 UTC, i.e. intraday and daily
+bins start at midnight UTC, matching the stream aggregator. Exchange daily bars
+follow the trading session instead, and futures such as CL=F or GC=F trade
+across midnight UTC, so daily and coarser bars are only built from intraday
+ones on request (``BarPyramid(derive_daily=True)``).
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict
+from collections.abc import Callable, Iterable, Sequence
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from .frames import is_marked_sorted, mark_sorted, sort_prices
+from .metrics import instrument
+from .store import to_utc
+
+_INTERVAL_PATTERN = re.compile(r"^([0-9]+)([mhdw])$")
+_UNITS = {"m": "minutes", "h": "hours", "d": "days", "w": "weeks"}
+# Intervals yfinance serves directly (``1w`` is spelt ``1wk`` there, so it is
+# always derived from daily bars).
+NATIVE_INTERVALS = ("1m", "2m", "5m", "15m", "30m", "90m", "1h", "1d")
+# Monday 1970-01-05: weekly bins start on Mondays like exchange weeks.
+_ORIGIN = pd.Timestamp("1970-01-05", tz="UTC").value
+
+_OHLCV_COLUMNS = ("open", "high", "low", "close", "adj_close", "volume")
+_DAY = pd.Timedelta(days=1)
+# Longest closure a window may start with (a long weekend) while its first bar
+# still counts as reaching the window start.
+_SESSION_GAP = pd.Timedelta(days=4)
+
+
+def interval_delta(interval: str) -> pd.Timedelta:
+    """Width of an interval string such as ``"15m"``, ``"4h"`` or ``"1w"``."""
+
+    match = _INTERVAL_PATTERN.match(interval)
+    if match is None or int(match.group(1)) == 0:
+        raise ValueError(f"Unsupported interval: {interval!r}")
+    return pd.Timedelta(**{_UNITS[match.group(2)]: int(match.group(1))})
+
+
+def derives_from(source: str, target: str) -> bool:
+    """Whether ``target`` bars can be built exactly from ``source`` bars."""
+
+    source_ns, target_ns = interval_delta(source).value, interval_delta(target).value
+    return target_ns >= source_ns and target_ns % source_ns == 0
+
+
+def fetch_interval(target: str) -> str:
+    """Coarsest native interval to download in order to serve ``target``."""
+
+    if target in NATIVE_INTERVALS:
+        return target
+    candidates = [native for native in NATIVE_INTERVALS if derives_from(native, target)]
+    if not candidates:
+        raise ValueError(f"No downloadable interval divides {target!r}.")
+    return max(candidates, key=lambda native: interval_delta(native))
+
+
+@instrument("pyramid.resample")
+def resample_bars(price_frame: pd.DataFrame, interval: str) -> pd.DataFrame:
+    """Aggregate tidy bars into ``interval`` bins per ticker.
+
+    Open is the first bar's open, high/low the extremes, close/adj_close the last
+    bar's values and volume the sum. Rows without a close (gaps in the source
+    download) are ignored; bins that receive no rows are omitted. The input may be
+    in any order; the output is sorted by ``(ticker, datetime)`` and marked so.
+    """
+
+    width = interval_delta(interval).value
+    frame = price_frame if is_marked_sorted(price_frame) else sort_prices(price_frame)
+    gaps = frame["close"].isna().to_numpy()
+    if gaps.any():
+        frame = frame.loc[~gaps]
+    if frame.empty:
+        return frame.reset_index(drop=True)[["ticker", "datetime", *_OHLCV_COLUMNS]]
+
+    tickers = frame["ticker"]
+    # Sorted input: a ticker change is a boundary, no factorising needed.
+    labels = tickers.to_numpy()
+    stamps = frame["datetime"].dt.tz_convert("UTC").array.asi8
+    bins = _ORIGIN + (stamps - _ORIGIN) // width * width
+    starts = np.flatnonzero(
+        np.r_[True, (labels[1:] != labels[:-1]) | (bins[1:] != bins[:-1])]
+    )
+    ends = np.r_[starts[1:], len(frame)] - 1
+
+    def column(name: str) -> np.ndarray:
+        return frame[name].to_numpy(dtype=float)
+
+    return mark_sorted(
+        pd.DataFrame(
+            {
+                "ticker": tickers.take(starts).reset_index(drop=True),
+                "datetime": pd.DatetimeIndex(
+                    bins[starts].view("datetime64[ns]")
+                ).tz_localize("UTC"),
+                "open": column("open")[starts],
+                "high": np.fmax.reduceat(column("high"), starts),
+                "low": np.fmin.reduceat(column("low"), starts),
+                "close": column("close")[ends],
+                "adj_close": column("adj_close")[ends],
+                # Missing volume counts as none; casting NaN to int64 is garbage.
+                "volume": np.add.reduceat(
+                    np.nan_to_num(column("volume")), starts
+                ).astype(np.int64),
+            }
+        )
+    )
+
+
+_Window = tuple[tuple[str, ...], Any, Any]
+
+
+def _first_bar(frame: pd.DataFrame) -> pd.Timestamp | None:
+    """How far back every ticker in ``frame`` reaches (the latest first bar)."""
+
+    if frame.empty:
+        return None
+    return frame.groupby("ticker", observed=True)["datetime"].min().max()
+
+
+def _reaches(first: pd.Timestamp | None, start: Any, interval: str) -> bool:
+    """Whether bars beginning at ``first`` cover a window from ``start``."""
+
+    if first is None or start is None:
+        return False
+    slack = max(interval_delta(interval), _SESSION_GAP)
+    return first - to_utc(start) < slack
+
+
+class BarPyramid:
+    """Track fetched resolutions per window and memoise derived levels.
+
+    Callers ask :meth:`source_for` which interval to load, load it (through
+    whatever cache they use), then pass the result to :meth:`resolve`. A derived
+    level is recomputed only when the loaded base frame is a different object,
+    so a refreshed download invalidates it automatically. ``derive_daily`` allows
+    building daily and coarser bars from intraday ones (UTC-midnight days).
+    """
+
+    def __init__(self, max_windows: int = 32, derive_daily: bool = False) -> None:
+        self.max_windows = max_windows
+        self.derive_daily = derive_daily
+        # Fetched resolutions per window, with the first bar every ticker has.
+        self._sources: OrderedDict[_Window, dict[str, pd.Timestamp | None]] = (
+            OrderedDict()
+        )
+        self._levels: dict[tuple[_Window, str], tuple[pd.DataFrame, pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _window(tickers: Iterable[str], start: Any, end: Any) -> _Window:
+        return tuple(tickers), start, end
+
+    def source_for(
+        self, tickers: Sequence[str], start: Any, end: Any, interval: str
+    ) -> str:
+        """Interval to load for ``interval``: the coarsest already-fetched
+        resolution it derives from, else what :func:`fetch_interval` suggests.
+
+        A fetched resolution finer than that suggestion only qualifies if its bars
+        reach back to ``start``, and an intraday one only feeds daily or coarser
+        intervals with ``derive_daily``.
+        """
+
+        native = fetch_interval(interval)
+        with self._lock:
+            held = dict(self._sources.get(self._window(tickers, start, end), {}))
+        usable = [
+            source
+            for source, first in held.items()
+            if source == native
+            or (self._derivable(source, interval) and _reaches(first, start, interval))
+        ]
+        if usable:
+            return max(usable, key=interval_delta)
+        return native
+
+    def _derivable(self, source: str, interval: str) -> bool:
+        if not derives_from(source, interval):
+            return False
+        intraday = interval_delta(source) < _DAY
+        return self.derive_daily or not intraday or interval_delta(interval) < _DAY
+
+    def resolve(
+        self,
+        tickers: Sequence[str],
+        start: Any,
+        end: Any,
+        interval: str,
+        base: pd.DataFrame,
+        source: str,
+    ) -> pd.DataFrame:
+        """Record ``base`` as fetched at ``source`` and return ``interval`` bars."""
+
+        window = self._window(tickers, start, end)
+        with self._lock:
+            known = source in self._sources.get(window, {})
+        first = None if known else _first_bar(base)
+        with self._lock:
+            self._sources.setdefault(window, {}).setdefault(source, first)
+            self._sources.move_to_end(window)
+            while len(self._sources) > self.max_windows:
+                dropped, _ = self._sources.popitem(last=False)
+                for key in [key for key in self._levels if key[0] == dropped]:
+                    del self._levels[key]
+            if source == interval:
+                return base
+            held = self._levels.get((window, interval))
+        if held is not None and held[0] is base:
+            return held[1]
+        derived = resample_bars(base, interval)
+        with self._lock:
+            if window in self._sources:
+                self._levels[(window, interval)] = (base, derived)
+        return derived
+
+    def get(
+        self,
+        tickers: Sequence[str],
+        start: Any,
+        end: Any,
+        interval: str,
+        loader: Callable[[Sequence[str], Any, Any, str], pd.DataFrame],
+    ) -> pd.DataFrame:
+        """Load through ``loader`` at the best source interval and resolve."""
+
+        source = self.source_for(tickers, start, end, interval)
+        base = loader(tickers, start, end, source)
+        return self.resolve(tickers, start, end, interval, base, source)
+
+
+__all__ = [
+    "NATIVE_INTERVALS",
+    "BarPyramid",
+    "derives_from",
+    "fetch_interval",
+    "interval_delta",
+    "resample_bars",
+]
@@ -0,0 +1,143 @@
+"""Indexed read access to a tidy price frame.
+
+The app and charts repeatedly asked for "the last bar per ticker" or "the last
+30 returns per ticker" with ``sort_values`` plus ``groupby().head/tail``, which
+sorts and regroups the whole frame each time. :class:`IndexedPrices` sorts once
+(or trusts the data layer's pre-sorted marker), records where each ticker's
+contiguous block starts and ends, and answers those queries with binary search
+inside the blocks. Single-ticker results are positional slices of the frame
+(views, not copies); multi-ticker results gather just the requested rows.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Iterable, Iterator, Sequence
+
+import numpy as np
+import pandas as pd
+
+from .frames import sort_prices
+from .store import to_utc
+
+
+class IndexedPrices:
+    """A ``(ticker, datetime)``-sorted frame with per-ticker row offsets.
+
+    Treat the wrapped frame as read-only: the offsets are computed once.
+    """
+
+    def __init__(self, frame: pd.DataFrame) -> None:
+        self.frame = sort_prices(frame)
+        tickers = self.frame["ticker"]
+        labels = (
+            tickers.cat.codes.to_numpy()
+            if isinstance(tickers.dtype, pd.CategoricalDtype)
+            else tickers.to_numpy()
+        )
+        starts = np.flatnonzero(np.r_[True, labels[1:] != labels[:-1]])
+        if len(self.frame) == 0:
+            starts = starts[:0]
+        ends = np.r_[starts[1:], len(self.frame)]
+        names = tickers.to_numpy()[starts]
+        self._bounds = {
+            str(name): (int(start), int(end))
+            for name, start, end in zip(names, starts, ends, strict=True)
+        }
+        self._stamps = self.frame["datetime"].array.asi8
+
+    def __len__(self) -> int:
+        return len(self.frame)
+
+    @property
+    def tickers(self) -> list[str]:
+        """Tickers in frame order."""
+
+        return list(self._bounds)
+
+    def aligned(self, frame: pd.DataFrame) -> IndexedPrices:
+        """Index ``frame`` with these offsets; it must share this frame's row
+        order, like the returns built alongside it by :func:`compute_analytics`."""
+
+        if len(frame) != len(self.frame):
+            raise ValueError("Aligned frames must have the same rows.")
+        sibling = object.__new__(IndexedPrices)
+        sibling.frame = frame
+        sibling._bounds = self._bounds
+        sibling._stamps = self._stamps
+        return sibling
+
+    def _span(self, ticker: str) -> tuple[int, int]:
+        try:
+            return self._bounds[str(ticker)]
+        except KeyError:
+            raise KeyError(f"Unknown ticker {ticker!r}.") from None
+
+    def _gather(
+        self, spans: Iterable[tuple[int, int]], newest_first: bool
+    ) -> pd.DataFrame:
+        rows = [
+            np.arange(hi - 1, lo - 1, -1) if newest_first else np.arange(lo, hi)
+            for lo, hi in spans
+        ]
+        if not rows:
+            return self.frame.iloc[:0]
+        return self.frame.take(np.concatenate(rows))
+
+    def blocks(
+        self, tickers: Sequence[str] | None = None
+    ) -> Iterator[tuple[str, pd.DataFrame]]:
+        """``(ticker, rows)`` per ticker, each a slice of the frame."""
+
+        for ticker in self.tickers if tickers is None else tickers:
+            lo, hi = self._span(ticker)
+            yield ticker, self.frame.iloc[lo:hi]
+
+    def latest(
+        self,
+        k: int = 1,
+        tickers: Sequence[str] | None = None,
+        newest_first: bool = False,
+    ) -> pd.DataFrame:
+        """The last ``k`` rows of each ticker, tickers in frame order."""
+
+        names = self.tickers if tickers is None else tickers
+        spans = [(max(lo, hi - k), hi) for lo, hi in map(self._span, names)]
+        if len(spans) == 1 and not newest_first:
+            return self.frame.iloc[slice(*spans[0])]
+        return self._gather(spans, newest_first)
+
+    def range(
+        self,
+        ticker: str,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+    ) -> pd.DataFrame:
+        """Rows of ``ticker`` with ``start <= datetime <= end`` (a slice)."""
+
+        lo, hi = self._span(ticker)
+        stamps = self._stamps[lo:hi]
+        first = 0 if start is None else stamps.searchsorted(to_utc(start).value)
+        last = (
+            len(stamps)
+            if end is None
+            else stamps.searchsorted(to_utc(end).value, side="right")
+        )
+        return self.frame.iloc[lo + first : lo + last]
+
+    def as_of(
+        self, timestamp: str | pd.Timestamp, tickers: Sequence[str] | None = None
+    ) -> pd.DataFrame:
+        """Each ticker's last row at or before ``timestamp``; tickers with no
+        such row are left out."""
+
+        value = to_utc(timestamp).value
+        spans = []
+        for ticker in self.tickers if tickers is None else tickers:
+            lo, hi = self._span(ticker)
+            position = lo + int(self._stamps[lo:hi].searchsorted(value, side="right"))
+            if position > lo:
+                spans.append((position - 1, position))
+        return self._gather(spans, newest_first=False)
+
+
+__all__ = ["IndexedPrices"]
@@ -0,0 +1,296 @@
+"""Circuit breaker and token-bucket rate limit around an upstream price source.
+
+Every session, the warmer and batch exports in a process share one
+:class:`GuardedProvider` (see :func:`src.data.get_provider`). While the source is
+healthy it only spaces requests to a global requests-per-second budget. After
+``failure_threshold`` consecutive failures the breaker opens and requests fail at
+once with :class:`CircuitOpenError`, so callers fall back to what they already hold
+(stale SWR entries, the bar store) instead of blocking on retries. After
+``reset_timeout`` a single half-open probe decides whether to close it again.
+State, transitions, rejections and limiter waits are published as metrics.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable, Callable
+
+import pandas as pd
+
+from .metrics import REGISTRY
+from .providers import PriceProvider, PriceRequest
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a source whose circuit is open."""
+
+    def __init__(self, source: str, retry_after: float) -> None:
+        super().__init__(
+            f"{source} is failing; requests are paused for another "
+            f"{retry_after:.0f}s."
+        )
+        self.source = source
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Closed → open after consecutive failures → half-open probe → closed.
+
+    Call :meth:`before_call` before each request and report its outcome with
+    :meth:`record_success`, :meth:`record_failure` or :meth:`release` (no
+    verdict, e.g. the request was never sent). Thread-safe.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+        name: str = "upstream",
+    ) -> None:
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1.")
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.name = name
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._publish()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._state
+
+    def _publish(self) -> None:
+        REGISTRY.set_gauge(
+            "cci_circuit_state",
+            _STATE_VALUES[self._state],
+            "Circuit state per source (0 closed, 1 half-open, 2 open).",
+            source=self.name,
+        )
+        REGISTRY.set_gauge(
+            "cci_circuit_consecutive_failures",
+            self._failures,
+            "Consecutive upstream failures counted by the circuit breaker.",
+            source=self.name,
+        )
+
+    def _move(self, state: str) -> None:
+        """Switch state and publish it; lock held."""
+
+        self._state = state
+        if state == OPEN:
+            self._opened_at = self._clock()
+        REGISTRY.increment(
+            "cci_circuit_transitions_total",
+            1,
+            "Circuit breaker state changes by target state.",
+            source=self.name,
+            state=state,
+        )
+        self._publish()
+
+    def before_call(self) -> None:
+        """Admit a request or raise :class:`CircuitOpenError`."""
+
+        with self._lock:
+            if self._state == OPEN:
+                waited = self._clock() - self._opened_at
+                if waited >= self.reset_timeout:
+                    self._move(HALF_OPEN)
+                else:
+                    self._reject(self.reset_timeout - waited)
+            if self._state == HALF_OPEN:
+                if self._probing:
+                    self._reject(0.0)
+                self._probing = True
+
+    def _reject(self, retry_after: float) -> None:
+        REGISTRY.increment(
+            "cci_circuit_rejections_total",
+            1,
+            "Requests failed fast by an open circuit.",
+            source=self.name,
+        )
+        raise CircuitOpenError(self.name, retry_after)
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._probing = False
+            if self._state != CLOSED:
+                self._move(CLOSED)
+            else:
+                self._publish()
+
+    def record_failure(self) -> bool:
+        """Count a failed request; ``True`` if this failure opened the circuit."""
+
+        with self._lock:
+            self._failures += 1
+            probe, self._probing = self._probing, False
+            if probe or (
+                self._state == CLOSED and self._failures >= self.failure_threshold
+            ):
+                self._move(OPEN)
+                return True
+            self._publish()
+            return False
+
+    def release(self) -> None:
+        """Give up an admitted request without a verdict (frees the probe slot)."""
+
+        with self._lock:
+            self._probing = False
+
+
+class TokenBucket:
+    """``rate`` requests per second on average, in bursts of up to ``burst``.
+
+    :meth:`reserve` takes a token immediately, going into debt when the bucket is
+    empty, and returns how long the caller must wait for it; callers are served
+    in the order they reserve. Thread-safe.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: int = 1,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        name: str = "upstream",
+    ) -> None:
+        if rate <= 0 or burst < 1:
+            raise ValueError("rate must be positive and burst at least 1.")
+        self.rate = rate
+        self.burst = burst
+        self.name = name
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._tokens = float(burst)
+        self._updated = clock()
+
+    def reserve(self) -> float:
+        """Take one token; seconds until it is actually available (0 if now)."""
+
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(
+                self.burst, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            wait = max(0.0, -self._tokens / self.rate)
+            REGISTRY.set_gauge(
+                "cci_rate_limit_tokens",
+                self._tokens,
+                "Tokens left in the upstream rate limiter (negative: queued).",
+                source=self.name,
+            )
+        if wait:
+            REGISTRY.increment(
+                "cci_rate_limit_delayed_total",
+                1,
+                "Requests delayed by the upstream rate limiter.",
+                source=self.name,
+            )
+            REGISTRY.increment(
+                "cci_rate_limit_wait_seconds_total",
+                wait,
+                "Time requests spent waiting for the upstream rate limiter.",
+                source=self.name,
+            )
+        return wait
+
+    async def acquire(self) -> None:
+        wait = self.reserve()
+        if wait:
+            await self._sleep(wait)
+
+
+def _is_upstream_failure(exc: Exception) -> bool:
+    """Whether ``exc`` means the source is unreachable or overloaded.
+
+    Timeouts and connection errors count, as do HTTP errors carrying a 5xx or
+    429 response; other exceptions are about the request or its data.
+    """
+
+    status = getattr(getattr(exc, "response", None), "status_code", None)
+    if status is not None:
+        return status == 429 or status >= 500
+    return isinstance(exc, TimeoutError | OSError)
+
+
+class GuardedProvider:
+    """A :class:`~src.providers.PriceProvider` behind a breaker and a rate limit.
+
+    Open circuits are checked before a token is taken, so rejected requests do
+    not use up the budget. The failure that opens the circuit is re-raised as
+    :class:`CircuitOpenError` so the caller stops retrying at once. Only
+    timeouts, connection errors and HTTP 5xx/429 answers count as failures;
+    data errors, cancellation and interrupts leave the count alone.
+    """
+
+    def __init__(
+        self,
+        provider: PriceProvider,
+        breaker: CircuitBreaker,
+        limiter: TokenBucket | None = None,
+    ) -> None:
+        self.provider = provider
+        self.breaker = breaker
+        self.limiter = limiter
+        self.name = provider.name
+
+    async def fetch(
+        self, request: PriceRequest, timeout: float | None = None
+    ) -> pd.DataFrame:
+        self.breaker.before_call()
+        try:
+            if self.limiter is not None:
+                await self.limiter.acquire()
+        except BaseException:
+            self.breaker.release()
+            raise
+        try:
+            prices = await self.provider.fetch(request, timeout)
+        except (asyncio.CancelledError, KeyboardInterrupt):
+            # Our caller gave up (e.g. the fan-out deadline); the source did not fail.
+            self.breaker.release()
+            raise
+        except Exception as exc:
+            if not _is_upstream_failure(exc):
+                # Bad data (unknown symbol, missing columns) says nothing about
+                # whether the source is up.
+                self.breaker.release()
+                raise
+            if self.breaker.record_failure():
+                raise CircuitOpenError(self.name, self.breaker.reset_timeout) from exc
+            raise
+        except BaseException:
+            self.breaker.release()
+            raise
+        self.breaker.record_success()
+        return prices
+
+
+__all__ = [
+    "CLOSED",
+    "HALF_OPEN",
+    "OPEN",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "GuardedProvider",
+    "TokenBucket",
+]
@@ -0,0 +1,198 @@
+"""Cross-process price cache backed by memory-mapped Arrow IPC files.
+
+Each Streamlit worker keeps its own in-process cache, so without coordination
+memory grows with workers and every worker downloads the same window. A
+:class:`SharedFrameCache` stores each normalised frame once as an uncompressed
+Arrow IPC file in a directory shared by the workers on one host. Readers
+memory-map the file, so numeric and timestamp columns are read-only views onto
+the page cache that every process shares rather than private copies. Fetches are
+serialised per key with an exclusive ``flock``: the first process to miss
+downloads and publishes the file, the others block on the lock and then read it.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import tempfile
+import time
+from collections.abc import Callable, Hashable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.ipc
+
+from .frames import is_marked_sorted, mark_sorted
+from .metrics import REGISTRY, record_cache
+
+try:  # POSIX only; elsewhere fetches are coordinated per process.
+    import fcntl
+except ImportError:  # pragma: no cover - exercised on Windows only.
+    fcntl = None
+
+_SUFFIX = ".arrow"
+_FETCHED_AT = b"cci.fetched_at"
+_SORTED = b"cci.sorted"
+
+
+def key_digest(key: Hashable) -> str:
+    """Stable file name for ``key``; ``repr`` of tuples of strings, timestamps
+    and numbers is identical across processes."""
+
+    return hashlib.blake2b(repr(key).encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _to_table(frame: pd.DataFrame, fetched_at: float) -> pa.Table:
+    """Arrow table for ``frame`` with NaN kept as a value, not a null.
+
+    pandas' converter turns NaN into nulls, and columns with nulls are copied
+    again on the way back; writing the float buffers as-is keeps every gappy
+    price column zero-copy for readers.
+    """
+
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    for index, field in enumerate(table.schema):
+        if pa.types.is_floating(field.type) and table.column(index).null_count:
+            values = frame[field.name].to_numpy(dtype=field.type.to_pandas_dtype())
+            table = table.set_column(
+                index, field, pa.array(values, type=field.type, from_pandas=False)
+            )
+    metadata = dict(table.schema.metadata or {})
+    metadata[_FETCHED_AT] = repr(fetched_at).encode()
+    metadata[_SORTED] = b"1" if is_marked_sorted(frame) else b"0"
+    return table.replace_schema_metadata(metadata)
+
+
+class SharedFrameCache:
+    """Arrow IPC files in ``root`` shared by every process on the host.
+
+    Entries younger than ``ttl`` seconds are served as read-only frames mapped
+    from disk; older ones are fetched again under the key's lock. Files not
+    rewritten for ``max_age`` seconds (default ``24 * ttl``, by modification
+    time) are pruned after each write; lock files are kept so a waiting process
+    never ends up locking a different file from the writer.
+    """
+
+    def __init__(
+        self,
+        root: str | os.PathLike[str],
+        ttl: float,
+        max_age: float | None = None,
+        clock: Callable[[], float] = time.time,
+        name: str = "shared",
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.ttl = ttl
+        self.max_age = max_age if max_age is not None else 24 * ttl
+        self.name = name
+        self._clock = clock
+
+    def path(self, key: Hashable) -> Path:
+        return self.root / f"{key_digest(key)}{_SUFFIX}"
+
+    @contextmanager
+    def _locked(self, key: Hashable) -> Iterator[None]:
+        lock_path = self.root / f"{key_digest(key)}.lock"
+        with lock_path.open("a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def read(self, key: Hashable) -> tuple[pd.DataFrame, float] | None:
+        """Mapped frame and its fetch time for ``key``, or ``None`` if absent."""
+
+        path = self.path(key)
+        try:
+            source = pa.memory_map(str(path))
+        except FileNotFoundError:
+            return None
+        table = pa.ipc.open_file(source).read_all()
+        metadata = table.schema.metadata or {}
+        frame = table.to_pandas(split_blocks=True)
+        if metadata.get(_SORTED) == b"1":
+            mark_sorted(frame)
+        return frame, float(metadata.get(_FETCHED_AT, b"0"))
+
+    def write(self, key: Hashable, frame: pd.DataFrame) -> None:
+        """Publish ``frame`` for ``key`` atomically; readers never see partial
+        files, and readers of the old file keep their mapping."""
+
+        table = _to_table(frame, self._clock())
+        fd, tmp_name = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        os.close(fd)
+        try:
+            with pa.OSFile(tmp_name, "wb") as sink:
+                with pa.ipc.new_file(sink, table.schema) as writer:
+                    writer.write_table(table)
+            os.replace(tmp_name, self.path(key))
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+        self.prune()
+
+    def _fresh(self, key: Hashable) -> pd.DataFrame | None:
+        held = self.read(key)
+        if held is None:
+            return None
+        frame, fetched_at = held
+        return frame if self._clock() - fetched_at < self.ttl else None
+
+    def get(self, key: Hashable, loader: Callable[[], pd.DataFrame]) -> pd.DataFrame:
+        """Return the shared frame for ``key``, fetching it in one process only.
+
+        The returned frame's columns are read-only views onto the mapped file;
+        copy before mutating in place.
+        """
+
+        frame = self._fresh(key)
+        if frame is not None:
+            record_cache(self.name, "hit")
+            return frame
+        with self._locked(key):
+            # Another process may have published the key while we waited.
+            frame = self._fresh(key)
+            if frame is not None:
+                record_cache(self.name, "hit")
+                return frame
+            record_cache(self.name, "miss")
+            loaded = loader()
+            self.write(key, loaded)
+        frame = self._fresh(key)
+        return frame if frame is not None else loaded
+
+    def prune(self) -> int:
+        """Delete entries older than ``max_age``; returns how many were removed."""
+
+        cutoff = self._clock() - self.max_age
+        removed, held = 0, 0
+        for path in self.root.glob(f"*{_SUFFIX}"):
+            try:
+                stat = path.stat()
+                if stat.st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+                else:
+                    held += stat.st_size
+            except FileNotFoundError:
+                continue
+        REGISTRY.set_gauge(
+            "cci_cache_bytes",
+            held,
+            "Estimated bytes held by a cache.",
+            cache=self.name,
+        )
+        return removed
+
+    def clear(self) -> None:
+        for path in self.root.glob(f"*{_SUFFIX}"):
+            path.unlink(missing_ok=True)
+
+
+__all__ = ["SharedFrameCache", "key_digest"]
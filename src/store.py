@@ -0,0 +1,253 @@
+"""Persistent on-disk store for normalised price bars."""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+from collections.abc import Callable, Iterator, Sequence
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import BinaryIO
+from urllib.parse import quote
+
+import pandas as pd
+
+try:  # POSIX only; elsewhere writers are not coordinated across processes.
+    import fcntl
+except ImportError:  # pragma: no cover - exercised on Windows only.
+    fcntl = None
+
+_BARS_FILE = "bars.parquet"
+_COVERAGE_FILE = "coverage.json"
+_LOCK_FILE = ".lock"
+_TAIL_FILE = "tail.json"
+
+TimeRange = tuple[pd.Timestamp, pd.Timestamp]
+
+
+def to_utc(value: str | pd.Timestamp | None) -> pd.Timestamp | None:
+    """Coerce user supplied boundaries to UTC timestamps (naive values are UTC)."""
+
+    if value is None:
+        return None
+    stamp = pd.Timestamp(value)
+    if stamp.tzinfo is None:
+        return stamp.tz_localize("UTC")
+    return stamp.tz_convert("UTC")
+
+
+def _merge_ranges(ranges: Sequence[TimeRange]) -> list[TimeRange]:
+    """Collapse overlapping or touching half-open ranges."""
+
+    merged: list[TimeRange] = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _subtract_ranges(
+    start: pd.Timestamp, end: pd.Timestamp, held: Sequence[TimeRange]
+) -> list[TimeRange]:
+    """Return the parts of ``[start, end)`` not covered by ``held``."""
+
+    gaps: list[TimeRange] = []
+    cursor = start
+    for held_start, held_end in held:
+        if held_end <= cursor:
+            continue
+        if held_start >= end:
+            break
+        if held_start > cursor:
+            gaps.append((cursor, held_start))
+        cursor = max(cursor, held_end)
+        if cursor >= end:
+            break
+    if cursor < end:
+        gaps.append((cursor, end))
+    return gaps
+
+
+class BarStore:
+    """Parquet-backed bar cache partitioned by interval and ticker.
+
+    Each ``interval=<i>/ticker=<t>`` partition holds the bars themselves plus a
+    small JSON ledger of the half-open time ranges already downloaded. Callers ask
+    for :meth:`missing` ranges, download only those, and then serve the full window
+    from disk via :meth:`read`. Files are replaced atomically so readers never
+    observe partial writes, and writers take an exclusive ``flock`` on the
+    partition, so several Streamlit workers and the warmer can share one directory.
+    """
+
+    def __init__(self, root: str | os.PathLike[str]) -> None:
+        self.root = Path(root)
+
+    def _partition(self, ticker: str, interval: str) -> Path:
+        safe_ticker = quote(ticker, safe="=^.-_")
+        return self.root / f"interval={interval}" / f"ticker={safe_ticker}"
+
+    @contextmanager
+    def _locked(self, partition: Path) -> Iterator[None]:
+        with (partition / _LOCK_FILE).open("a") as handle:
+            if fcntl is not None:
+                fcntl.flock(handle, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(handle, fcntl.LOCK_UN)
+
+    def coverage(self, ticker: str, interval: str) -> list[TimeRange]:
+        """Return the merged time ranges already held for ``ticker``/``interval``."""
+
+        path = self._partition(ticker, interval) / _COVERAGE_FILE
+        if not path.exists():
+            return []
+        with path.open(encoding="utf-8") as handle:
+            raw = json.load(handle)
+        return [(pd.Timestamp(start), pd.Timestamp(end)) for start, end in raw]
+
+    def missing(
+        self,
+        ticker: str,
+        interval: str,
+        start: str | pd.Timestamp,
+        end: str | pd.Timestamp,
+        max_age: pd.Timedelta | None = None,
+    ) -> list[TimeRange]:
+        """Return the sub-ranges of ``[start, end)`` that must still be downloaded.
+
+        With ``max_age``, a trailing gap whose bars were downloaded up to less than
+        ``max_age`` before ``end`` (see ``tail_until`` in :meth:`write`) is
+        accepted as held, so reads just after a refresh do not go upstream again.
+        """
+
+        start_ts, end_ts = to_utc(start), to_utc(end)
+        if start_ts >= end_ts:
+            return []
+        gaps = _subtract_ranges(start_ts, end_ts, self.coverage(ticker, interval))
+        if gaps and max_age is not None and gaps[-1][1] == end_ts:
+            tail = self.tail_until(ticker, interval)
+            if tail is not None and gaps[-1][0] <= tail and end_ts - tail < max_age:
+                gaps.pop()
+        return gaps
+
+    def tail_until(self, ticker: str, interval: str) -> pd.Timestamp | None:
+        """End of the last download that ran past the held coverage, if any."""
+
+        path = self._partition(ticker, interval) / _TAIL_FILE
+        if not path.exists():
+            return None
+        with path.open(encoding="utf-8") as handle:
+            return pd.Timestamp(json.load(handle)["until"])
+
+    def read(
+        self,
+        ticker: str,
+        interval: str,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+    ) -> pd.DataFrame:
+        """Load stored bars for ``ticker`` restricted to ``[start, end]``."""
+
+        path = self._partition(ticker, interval) / _BARS_FILE
+        if not path.exists():
+            return pd.DataFrame()
+        bars = pd.read_parquet(path)
+        mask = pd.Series(True, index=bars.index)
+        start_ts, end_ts = to_utc(start), to_utc(end)
+        if start_ts is not None:
+            mask &= bars["datetime"] >= start_ts
+        if end_ts is not None:
+            mask &= bars["datetime"] <= end_ts
+        return bars.loc[mask].reset_index(drop=True)
+
+    def write(
+        self,
+        ticker: str,
+        interval: str,
+        bars: pd.DataFrame,
+        start: str | pd.Timestamp,
+        end: str | pd.Timestamp,
+        tail_until: str | pd.Timestamp | None = None,
+    ) -> None:
+        """Upsert ``bars`` for ``ticker`` and record ``[start, end)`` as held.
+
+        Bars sharing a timestamp with existing rows replace them. Callers must end
+        the recorded range before any bar that may still change (the data layer
+        stops at the still-forming latest bar), otherwise it is never re-fetched.
+        ``tail_until`` records that ``bars`` also hold that still-forming tail, as
+        downloaded up to the given time; see ``max_age`` in :meth:`missing`.
+        """
+
+        partition = self._partition(ticker, interval)
+        partition.mkdir(parents=True, exist_ok=True)
+        # Read-modify-write of both files: concurrent writers would drop each
+        # other's bars while the ledger still claims them.
+        with self._locked(partition):
+            self._upsert(ticker, interval, partition, bars, start, end)
+            if tail_until is not None:
+                payload = json.dumps({"until": to_utc(tail_until).isoformat()})
+                self._atomic_write(
+                    partition / _TAIL_FILE,
+                    lambda handle: handle.write(payload.encode("utf-8")),
+                )
+
+    def _upsert(
+        self,
+        ticker: str,
+        interval: str,
+        partition: Path,
+        bars: pd.DataFrame,
+        start: str | pd.Timestamp,
+        end: str | pd.Timestamp,
+    ) -> None:
+        frames = [frame for frame in (self.read(ticker, interval), bars) if len(frame)]
+        if frames and len(bars):
+            combined = (
+                pd.concat(frames, ignore_index=True)
+                .drop_duplicates(subset="datetime", keep="last")
+                .sort_values("datetime")
+                .reset_index(drop=True)
+            )
+            self._atomic_write(
+                partition / _BARS_FILE,
+                lambda handle: combined.to_parquet(handle, index=False),
+            )
+
+        held = self.coverage(ticker, interval)
+        if to_utc(start) < to_utc(end):
+            held.append((to_utc(start), to_utc(end)))
+        ranges = _merge_ranges(held)
+        payload = [[s.isoformat(), e.isoformat()] for s, e in ranges]
+        self._atomic_write(
+            partition / _COVERAGE_FILE,
+            lambda handle: handle.write(json.dumps(payload).encode("utf-8")),
+        )
+
+    @staticmethod
+    def _atomic_write(path: Path, writer: Callable[[BinaryIO], object]) -> None:
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                writer(handle)
+            os.replace(tmp_name, path)
+        except BaseException:
+            Path(tmp_name).unlink(missing_ok=True)
+            raise
+
+
+@lru_cache(maxsize=4)
+def get_store(root: str | None) -> BarStore | None:
+    """Return a shared :class:`BarStore` for ``root`` (``None`` disables storage)."""
+
+    if not root:
+        return None
+    return BarStore(root)
+
+
+__all__ = ["BarStore", "get_store", "to_utc"]
@@ -0,0 +1,351 @@
+"""Streaming price ingestion: stream sources, bar aggregation and ring buffers.
+
+A :class:`StreamIngestor` drains price events from any :class:`StreamSource`
+(a Kafka consumer in production; :class:`QueueSource` or :class:`ReplaySource`
+locally), folds them into OHLCV bars for every supported interval and keeps the
+most recent bars per ticker in fixed-size ring buffers. The app reads those
+buffers directly, so rendering never waits on the network.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import queue
+import threading
+from collections.abc import Iterable, Mapping, Sequence
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Protocol
+
+import numpy as np
+import pandas as pd
+
+from .store import to_utc
+
+LOGGER = logging.getLogger(__name__)
+
+INTERVALS: Mapping[str, int] = {
+    "5m": pd.Timedelta(minutes=5).value,
+    "1h": pd.Timedelta(hours=1).value,
+    "1d": pd.Timedelta(days=1).value,
+}
+
+_FRAME_COLUMNS = (
+    "ticker",
+    "datetime",
+    "open",
+    "high",
+    "low",
+    "close",
+    "adj_close",
+    "volume",
+)
+
+
+@dataclass(frozen=True)
+class PriceEvent:
+    """One trade or quote update for a ticker."""
+
+    ticker: str
+    timestamp: pd.Timestamp
+    price: float
+    volume: float = 0.0
+
+    @classmethod
+    def from_record(cls, record: Mapping[str, object]) -> PriceEvent:
+        """Build an event from a decoded message (``timestamp`` may be a string)."""
+
+        return cls(
+            ticker=str(record["ticker"]),
+            timestamp=to_utc(record["timestamp"]),
+            price=float(record["price"]),
+            volume=float(record.get("volume") or 0.0),
+        )
+
+
+class StreamSource(Protocol):
+    """Minimal consumer interface (mirrors a Kafka consumer's ``poll``)."""
+
+    def poll(self, max_events: int, timeout: float) -> list[PriceEvent]:
+        """Return up to ``max_events`` events, waiting at most ``timeout`` seconds."""
+
+    def close(self) -> None:
+        """Release the underlying connection."""
+
+
+class QueueSource:
+    """In-process source fed by :meth:`publish`, for tests and local producers."""
+
+    def __init__(self) -> None:
+        self._queue: queue.Queue[PriceEvent] = queue.Queue()
+
+    def publish(self, event: PriceEvent) -> None:
+        self._queue.put(event)
+
+    def poll(self, max_events: int, timeout: float) -> list[PriceEvent]:
+        try:
+            if timeout > 0:
+                events = [self._queue.get(timeout=timeout)]
+            else:
+                events = [self._queue.get_nowait()]
+        except queue.Empty:
+            return []
+        while len(events) < max_events:
+            try:
+                events.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return events
+
+    def close(self) -> None:
+        pass
+
+
+class ReplaySource:
+    """Replay a JSON-lines capture (one event object per line) in file order.
+
+    Malformed lines are logged, counted in ``skipped`` and passed over.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self._handle = self.path.open("r", encoding="utf-8")
+        self._line = 0
+        self.exhausted = False
+        self.skipped = 0
+
+    def poll(self, max_events: int, timeout: float) -> list[PriceEvent]:
+        events = []
+        while len(events) < max_events:
+            line = self._handle.readline()
+            if not line:
+                self.exhausted = True
+                break
+            self._line += 1
+            if not line.strip():
+                continue
+            try:
+                events.append(PriceEvent.from_record(json.loads(line)))
+            except (KeyError, TypeError, ValueError) as exc:
+                self.skipped += 1
+                LOGGER.warning(
+                    "Skipping malformed event on line %s of %s: %r",
+                    self._line,
+                    self.path,
+                    exc,
+                )
+        return events
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+class BarRing:
+    """Fixed-capacity, time-ordered OHLCV bars for one ticker and interval.
+
+    The last slot is the bar still being built; an event for a later bucket opens
+    a new slot, overwriting the oldest once the ring is full. Late events update
+    their bar if it is still held and are otherwise dropped (and counted). The
+    close is the price of the newest event in the bar, whatever order the events
+    arrive in.
+    """
+
+    def __init__(self, interval: str, capacity: int) -> None:
+        if interval not in INTERVALS:
+            raise ValueError(f"Unsupported stream interval: {interval}")
+        if capacity < 1:
+            raise ValueError("Ring capacity must be positive.")
+        self.interval = interval
+        self.capacity = capacity
+        self._width = INTERVALS[interval]
+        self._stamps = np.zeros(capacity, dtype=np.int64)
+        self._ohlcv = np.zeros((capacity, 5))
+        # Timestamp of the event that set each bar's close.
+        self._closed_at = np.zeros(capacity, dtype=np.int64)
+        self._head = 0
+        self._size = 0
+        self.dropped = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _slot(self, offset: int) -> int:
+        """Physical slot of the ``offset``-th oldest bar."""
+
+        return (self._head + offset) % self.capacity
+
+    def update(self, stamp_ns: int, price: float, volume: float) -> None:
+        bucket = stamp_ns - stamp_ns % self._width
+        if self._size and bucket < self._stamps[self._slot(self._size - 1)]:
+            self._update_late(bucket, stamp_ns, price, volume)
+            return
+        if not self._size or bucket > self._stamps[self._slot(self._size - 1)]:
+            if self._size == self.capacity:
+                self._head = (self._head + 1) % self.capacity
+            else:
+                self._size += 1
+            slot = self._slot(self._size - 1)
+            self._stamps[slot] = bucket
+            self._ohlcv[slot] = (price, price, price, price, volume)
+            self._closed_at[slot] = stamp_ns
+            return
+        self._merge(self._slot(self._size - 1), stamp_ns, price, volume)
+
+    def _update_late(
+        self, bucket: int, stamp_ns: int, price: float, volume: float
+    ) -> None:
+        ordered = self._stamps[self._ordered_slots()]
+        offset = int(np.searchsorted(ordered, bucket))
+        if offset < self._size and ordered[offset] == bucket:
+            self._merge(self._slot(offset), stamp_ns, price, volume)
+        else:
+            self.dropped += 1
+
+    def _merge(self, slot: int, stamp_ns: int, price: float, volume: float) -> None:
+        bar = self._ohlcv[slot]
+        bar[1] = max(bar[1], price)
+        bar[2] = min(bar[2], price)
+        if stamp_ns >= self._closed_at[slot]:
+            bar[3] = price
+            self._closed_at[slot] = stamp_ns
+        bar[4] += volume
+
+    def _ordered_slots(self) -> np.ndarray:
+        return (self._head + np.arange(self._size)) % self.capacity
+
+    def to_frame(self, ticker: str) -> pd.DataFrame:
+        """Bars oldest-first in the tidy price schema used by the data layer."""
+
+        slots = self._ordered_slots()
+        bars = self._ohlcv[slots]
+        return pd.DataFrame(
+            {
+                "ticker": ticker,
+                "datetime": pd.to_datetime(self._stamps[slots], utc=True),
+                "open": bars[:, 0],
+                "high": bars[:, 1],
+                "low": bars[:, 2],
+                "close": bars[:, 3],
+                "adj_close": bars[:, 3],
+                "volume": bars[:, 4],
+            },
+            columns=list(_FRAME_COLUMNS),
+        )
+
+
+class StreamIngestor:
+    """Consume a :class:`StreamSource` into per-ticker, per-interval bar rings.
+
+    :meth:`pump` drains one batch synchronously; :meth:`start` runs it on a daemon
+    thread. :meth:`frame` only copies from memory, so it is safe on the render path.
+    """
+
+    def __init__(
+        self,
+        source: StreamSource,
+        intervals: Sequence[str] = tuple(INTERVALS),
+        capacity: int = 5000,
+    ) -> None:
+        unknown = set(intervals).difference(INTERVALS)
+        if unknown:
+            raise ValueError(f"Unsupported stream intervals: {sorted(unknown)}")
+        self.source = source
+        self.intervals = tuple(intervals)
+        self.capacity = capacity
+        self._rings: dict[tuple[str, str], BarRing] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def tickers(self) -> list[str]:
+        with self._lock:
+            return sorted({ticker for ticker, _ in self._rings})
+
+    def ingest(self, events: Iterable[PriceEvent]) -> int:
+        """Fold ``events`` into every interval's bars; returns the number applied."""
+
+        count = 0
+        with self._lock:
+            for event in events:
+                stamp = event.timestamp.value
+                for interval in self.intervals:
+                    ring = self._rings.get((event.ticker, interval))
+                    if ring is None:
+                        ring = BarRing(interval, self.capacity)
+                        self._rings[(event.ticker, interval)] = ring
+                    ring.update(stamp, event.price, event.volume)
+                count += 1
+        return count
+
+    def pump(self, max_events: int = 10_000, timeout: float = 0.0) -> int:
+        """Poll the source once and ingest whatever it returned."""
+
+        return self.ingest(self.source.poll(max_events, timeout))
+
+    def start(self, poll_timeout: float = 0.5) -> None:
+        """Ingest continuously on a background thread until :meth:`stop`."""
+
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._run, args=(poll_timeout,), name="stream-ingest", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float | None = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self.source.close()
+
+    def _run(self, poll_timeout: float) -> None:
+        while not self._stop.is_set():
+            try:
+                if not self.pump(timeout=poll_timeout) and getattr(
+                    self.source, "exhausted", False
+                ):
+                    self._stop.wait(poll_timeout)
+            except Exception:  # noqa: BLE001 - a bad message must not kill ingestion.
+                LOGGER.exception("Stream ingestion batch failed")
+
+    def frame(
+        self,
+        tickers: Sequence[str],
+        interval: str,
+        start: str | pd.Timestamp | None = None,
+        end: str | pd.Timestamp | None = None,
+    ) -> pd.DataFrame:
+        """Buffered bars for ``tickers`` sorted by ``(ticker, datetime)``."""
+
+        if interval not in self.intervals:
+            raise ValueError(f"Interval {interval} is not being aggregated.")
+        with self._lock:
+            frames = [
+                self._rings[(ticker, interval)].to_frame(ticker)
+                for ticker in sorted(set(tickers))
+                if (ticker, interval) in self._rings
+            ]
+        if not frames:
+            return pd.DataFrame(columns=list(_FRAME_COLUMNS))
+        combined = pd.concat(frames, ignore_index=True)
+        start, end = to_utc(start), to_utc(end)
+        mask = np.ones(len(combined), dtype=bool)
+        if start is not None:
+            mask &= (combined["datetime"] >= start).to_numpy()
+        if end is not None:
+            mask &= (combined["datetime"] <= end).to_numpy()
+        return combined.loc[mask].reset_index(drop=True)
+
+
+__all__ = [
+    "BarRing",
+    "INTERVALS",
+    "PriceEvent",
+    "QueueSource",
+    "ReplaySource",
+    "StreamIngestor",
+    "StreamSource",
+]
@@ -0,0 +1,148 @@
+"""Stale-while-revalidate cache with per-key request coalescing."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable, Hashable
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Generic, TypeVar
+
+from .metrics import record_cache
+
+LOGGER = logging.getLogger(__name__)
+
+V = TypeVar("V")
+
+
+@dataclass(frozen=True)
+class CachedValue(Generic[V]):
+    """A value served from the cache together with its freshness."""
+
+    value: V
+    age: float
+    stale: bool
+    refresh_error: Exception | None = None
+
+
+@dataclass
+class _Entry(Generic[V]):
+    value: V
+    fetched_at: float
+    refresh_error: Exception | None = None
+    failed_at: float | None = None
+
+
+class StaleWhileRevalidateCache(Generic[V]):
+    """Serve cached values instantly and refresh expired ones in the background.
+
+    * Fresh hits (younger than ``ttl``) are returned as-is.
+    * Expired entries younger than ``ttl + max_stale`` are returned immediately,
+      flagged ``stale``, while one background refresh per key runs. A failed
+      refresh keeps the old value and is reported via ``refresh_error``; the
+      next one starts no sooner than ``retry_after`` (default ``ttl``) later, so
+      an outage is not hit again on every read.
+    * Misses (or entries past ``max_stale``) load synchronously. Concurrent callers
+      asking for the same key wait on the one in-flight load instead of each
+      calling the upstream.
+    """
+
+    def __init__(
+        self,
+        ttl: float,
+        max_stale: float | None = None,
+        max_entries: int = 128,
+        clock: Callable[[], float] = time.monotonic,
+        max_workers: int = 4,
+        name: str = "swr",
+        retry_after: float | None = None,
+    ) -> None:
+        self.ttl = ttl
+        self.retry_after = ttl if retry_after is None else retry_after
+        self.name = name
+        self.max_stale = max_stale
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: OrderedDict[Hashable, _Entry[V]] = OrderedDict()
+        self._inflight: dict[Hashable, Future[_Entry[V]]] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="swr-refresh"
+        )
+
+    def get(self, key: Hashable, loader: Callable[[], V]) -> CachedValue[V]:
+        """Return the value for ``key``, calling ``loader`` only when needed."""
+
+        with self._lock:
+            now = self._clock()
+            entry = self._entries.get(key)
+            if entry is not None:
+                age = now - entry.fetched_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    record_cache(self.name, "hit")
+                    return CachedValue(entry.value, age, False, entry.refresh_error)
+                if self.max_stale is None or age < self.ttl + self.max_stale:
+                    failed_at = entry.failed_at
+                    if failed_at is None or now - failed_at >= self.retry_after:
+                        self._start(key, loader, background=True)
+                    record_cache(self.name, "stale")
+                    return CachedValue(entry.value, age, True, entry.refresh_error)
+            future, owner = self._start(key, loader, background=False)
+            record_cache(self.name, "miss")
+
+        if owner:
+            self._load(key, loader, future)
+        entry = future.result()
+        return CachedValue(entry.value, self._clock() - entry.fetched_at, False)
+
+    def clear(self) -> None:
+        """Drop every cached value (in-flight loads still complete)."""
+
+        with self._lock:
+            self._entries.clear()
+
+    def _start(
+        self, key: Hashable, loader: Callable[[], V], background: bool
+    ) -> tuple[Future[_Entry[V]], bool]:
+        """Register (or join) the single in-flight load for ``key``; lock held."""
+
+        future = self._inflight.get(key)
+        if future is not None:
+            return future, False
+        future = Future()
+        self._inflight[key] = future
+        if background:
+            self._executor.submit(self._load, key, loader, future)
+        return future, True
+
+    def _load(
+        self, key: Hashable, loader: Callable[[], V], future: Future[_Entry[V]]
+    ) -> None:
+        try:
+            value = loader()
+        except Exception as exc:  # noqa: BLE001 - surfaced to waiters or the entry.
+            with self._lock:
+                self._inflight.pop(key, None)
+                previous = self._entries.get(key)
+                if previous is not None:
+                    LOGGER.warning("Background refresh for %s failed: %s", key, exc)
+                    previous.refresh_error = exc
+                    previous.failed_at = self._clock()
+            future.set_exception(exc)
+            return
+
+        entry = _Entry(value, self._clock())
+        with self._lock:
+            self._inflight.pop(key, None)
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        future.set_result(entry)
+
+
+__all__ = ["CachedValue", "StaleWhileRevalidateCache"]
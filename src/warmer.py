@@ -0,0 +1,189 @@
+"""Background cache warmer for the default ticker universe.
+
+Run ``python -m src.warmer --store-dir /shared/prices`` next to the Streamlit
+workers (configured with the same ``CCI_PRICE_STORE_DIR``). Each ticker/interval
+pair is refreshed into the shared :class:`~src.store.BarStore` ahead of the app's
+cache expiry, with start times staggered across the period so the upstream sees a
+steady trickle instead of a burst.
+"""
+
+from __future__ import annotations
+
+import argparse
+import datetime as dt
+import logging
+import time
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+
+import pandas as pd
+
+from .config import get_settings
+from .data import FetchResult, fetch_prices_report
+from .store import BarStore
+
+LOGGER = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class WarmTarget:
+    """One ticker/interval window kept warm in the shared store."""
+
+    ticker: str
+    interval: str
+    lookback_days: int
+
+    def window(self, now: pd.Timestamp) -> tuple[pd.Timestamp, pd.Timestamp]:
+        """Mirror the app's default range: midnight ``lookback_days`` ago to now."""
+
+        start = (now - pd.Timedelta(days=self.lookback_days)).normalize()
+        return start, now
+
+
+def default_targets(
+    tickers: Sequence[str] | None = None,
+    intervals: Sequence[str] | None = None,
+    lookback_days: int | None = None,
+) -> list[WarmTarget]:
+    """Build targets from the settings' default tickers, interval and lookback."""
+
+    settings = get_settings()
+    return [
+        WarmTarget(ticker, interval, lookback_days or settings.default_lookback_days)
+        for interval in (intervals or (settings.default_interval,))
+        for ticker in (tickers or settings.default_tickers)
+    ]
+
+
+def warm_target(
+    target: WarmTarget, store: BarStore, now: pd.Timestamp | None = None
+) -> FetchResult:
+    """Top up ``store`` for ``target``; only bars missing from the store are fetched.
+
+    The still-forming latest bar is always downloaded again: app reads accept it
+    from the store for a short while after this refresh instead of going upstream.
+    """
+
+    now = now if now is not None else pd.Timestamp.now(tz="UTC")
+    start, end = target.window(now)
+    result = fetch_prices_report(
+        [target.ticker],
+        start=start,
+        end=end,
+        interval=target.interval,
+        store=store,
+        tail_max_age=pd.Timedelta(0),
+    )
+    for failure in result.failures.values():
+        LOGGER.warning(
+            "Warming %s/%s failed: %s", target.ticker, target.interval, failure.reason
+        )
+    return result
+
+
+class WarmScheduler:
+    """Run each target once per ``period`` seconds at staggered offsets.
+
+    Target ``i`` of ``n`` first fires ``i * period / n`` seconds after start, and
+    every run schedules the next one a full period later. Missed cycles (e.g. after
+    a slow upstream) are skipped rather than replayed back to back. ``clock`` and
+    ``sleep`` are injectable so tests can drive the schedule deterministically.
+    """
+
+    def __init__(
+        self,
+        targets: Sequence[WarmTarget],
+        period: float,
+        warm: Callable[[WarmTarget], object],
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        if not targets:
+            raise ValueError("At least one warm target is required.")
+        if period <= 0:
+            raise ValueError("Warm period must be positive.")
+        self.targets = list(targets)
+        self.period = period
+        self._warm = warm
+        self._clock = clock
+        self._sleep = sleep
+        started = clock()
+        step = period / len(self.targets)
+        self._due = [started + index * step for index in range(len(self.targets))]
+
+    def run_pending(self) -> list[WarmTarget]:
+        """Warm every target that is due and return the ones that ran."""
+
+        ran = []
+        for index, target in enumerate(self.targets):
+            now = self._clock()
+            if self._due[index] > now:
+                continue
+            try:
+                self._warm(target)
+            except Exception:  # noqa: BLE001 - one bad target must not stop the loop.
+                LOGGER.exception("Unexpected error warming %s", target)
+            ran.append(target)
+            missed = (now - self._due[index]) // self.period
+            self._due[index] += (missed + 1) * self.period
+        return ran
+
+    def run(self, cycles: int | None = None) -> None:
+        """Loop forever (or for ``cycles`` wake-ups), sleeping until the next run."""
+
+        wakeups = 0
+        while cycles is None or wakeups < cycles:
+            self.run_pending()
+            wakeups += 1
+            self._sleep(max(0.0, min(self._due) - self._clock()))
+
+
+def main(argv: list[str] | None = None) -> int:
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--store-dir",
+        default=str(settings.price_store_dir) if settings.price_store_dir else None,
+        help="Shared BarStore directory (defaults to CCI_PRICE_STORE_DIR).",
+    )
+    parser.add_argument("--tickers", nargs="+", help="Override the default tickers.")
+    parser.add_argument("--intervals", nargs="+", help="Intervals to keep warm.")
+    parser.add_argument("--lookback-days", type=int, help="Window length in days.")
+    parser.add_argument(
+        "--period",
+        type=float,
+        default=settings.cache_ttl_seconds * 0.8,
+        help="Seconds between refreshes of a target (default: 80%% of the cache TTL).",
+    )
+    parser.add_argument("--once", action="store_true", help="Warm every target once.")
+    args = parser.parse_args(argv)
+
+    if not args.store_dir:
+        parser.error("--store-dir or CCI_PRICE_STORE_DIR is required.")
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s"
+    )
+    store = BarStore(args.store_dir)
+    targets = default_targets(args.tickers, args.intervals, args.lookback_days)
+
+    if args.once:
+        started = time.perf_counter()
+        failed = sum(bool(warm_target(target, store).failures) for target in targets)
+        LOGGER.info(
+            "Warmed %s targets (%s failed) in %.1fs at %s",
+            len(targets),
+            failed,
+            time.perf_counter() - started,
+            dt.datetime.now(dt.UTC).isoformat(timespec="seconds"),
+        )
+        return 1 if failed else 0
+
+    scheduler = WarmScheduler(
+        targets, args.period, lambda target: warm_target(target, store)
+    )
+    scheduler.run()
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
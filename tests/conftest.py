@@ -0,0 +1,43 @@
+"""Shared fixtures for the test suite."""
+
+from __future__ import annotations
+
+from collections.abc import Callable
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from src import data
+
+Download = Callable[..., pd.DataFrame]
+
+
+@pytest.fixture()
+def yahoo(monkeypatch: pytest.MonkeyPatch) -> Callable[[Download], None]:
+    """Serve ``yf.Ticker(symbol).history`` from a ``yf.download``-style fake.
+
+    The fake is called with ``tickers=<symbol>`` plus the history keyword
+    arguments and may return a wide frame in either MultiIndex layout; the
+    symbol's own columns are handed back under a named index, as ``history``
+    would.
+    """
+
+    def install(download: Download) -> None:
+        class Ticker:
+            def __init__(self, symbol: str) -> None:
+                self.symbol = symbol
+
+            def history(self, **kwargs: Any) -> pd.DataFrame:
+                frame = download(tickers=self.symbol, **kwargs)
+                frame = frame.rename_axis(frame.index.name or "Date")
+                if not isinstance(frame.columns, pd.MultiIndex):
+                    return frame
+                for level in range(2):
+                    if self.symbol in frame.columns.get_level_values(level):
+                        return frame.xs(self.symbol, axis=1, level=level)
+                return frame.iloc[:0, :0]
+
+        monkeypatch.setattr(data.yf, "Ticker", Ticker)
+
+    return install
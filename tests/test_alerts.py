@@ -0,0 +1,213 @@
+"""Tests for the headless alert engine."""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Sequence
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import alerts
+from src.alerts import AlertEngine, AlertRule, JsonLinesSink, MemorySink, load_rules
+from src.config import get_settings
+from src.data import FetchResult
+
+T0 = pd.Timestamp("2024-03-01 15:00", tz="UTC")
+
+
+def _changes(**moves: float) -> pd.Series:
+    return pd.Series({ticker.replace("_", "="): move for ticker, move in moves.items()})
+
+
+def test_directional_thresholds_in_one_pass() -> None:
+    sink = MemorySink()
+    engine = AlertEngine(
+        [
+            AlertRule("a", "desk1", "CL=F", 0.02, "up"),
+            AlertRule("b", "desk1", "CL=F", 0.02, "down"),
+            AlertRule("c", "desk2", "NG=F", 0.05),
+            AlertRule("d", "desk2", "GC=F", 0.01),
+        ],
+        sinks=[sink],
+    )
+
+    fired = engine.evaluate(_changes(CL_F=-0.03, NG_F=-0.06), at=T0)
+
+    assert [alert.rule_id for alert in fired] == ["b", "c"]
+    assert fired[0].change == pytest.approx(-0.03)
+    assert sink.alerts == fired
+
+
+def test_hysteresis_suppresses_repeats_until_rearmed() -> None:
+    engine = AlertEngine([AlertRule("r", "desk", "CL=F", 0.03)], rearm_ratio=0.5)
+    sequence = [0.04, 0.05, 0.025, 0.035, 0.01, 0.032]
+
+    fired = [bool(engine.evaluate(_changes(CL_F=move), at=T0)) for move in sequence]
+
+    assert fired == [True, False, False, False, False, True]
+
+
+def test_missing_ticker_keeps_state() -> None:
+    engine = AlertEngine([AlertRule("r", "desk", "CL=F", 0.03)])
+
+    assert engine.evaluate(_changes(CL_F=0.04), at=T0)
+    assert not engine.evaluate(_changes(NG_F=0.0), at=T0)
+    assert not engine.evaluate(_changes(CL_F=0.04), at=T0)
+    engine.reset()
+    assert engine.evaluate(_changes(CL_F=0.04), at=T0)
+
+
+def test_cooldown_limits_refires() -> None:
+    engine = AlertEngine(
+        [AlertRule("r", "desk", "CL=F", 0.03, rearm=0.03)],
+        cooldown=pd.Timedelta(minutes=30),
+    )
+
+    assert engine.evaluate(_changes(CL_F=0.04), at=T0)
+    engine.evaluate(_changes(CL_F=0.0), at=T0 + pd.Timedelta(minutes=5))
+    assert not engine.evaluate(_changes(CL_F=0.04), at=T0 + pd.Timedelta(minutes=10))
+    engine.evaluate(_changes(CL_F=0.0), at=T0 + pd.Timedelta(minutes=20))
+    assert engine.evaluate(_changes(CL_F=0.04), at=T0 + pd.Timedelta(minutes=40))
+
+
+def test_evaluate_prices_uses_latest_bar(tmp_path: Path) -> None:
+    frame = pd.DataFrame(
+        {
+            "ticker": ["CL=F"] * 3,
+            "datetime": pd.date_range(T0, periods=3, freq="5min"),
+            "adj_close": [80.0, 80.0, 84.0],
+            "close": [80.0, 80.0, 84.0],
+        }
+    )
+    output = tmp_path / "alerts.jsonl"
+    engine = AlertEngine(
+        [AlertRule("r", "desk", "CL=F", 0.03)], sinks=[JsonLinesSink(output)]
+    )
+
+    fired = engine.evaluate_prices(frame)
+
+    record = json.loads(output.read_text().strip())
+    assert len(fired) == 1
+    assert record["rule_id"] == "r" and record["change"] == pytest.approx(0.05)
+    assert record["triggered_at"] == (T0 + pd.Timedelta(minutes=10)).isoformat()
+
+
+class _StopLoopError(Exception):
+    pass
+
+
+def test_main_keeps_polling_after_a_failed_fetch(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    rules = tmp_path / "rules.json"
+    rules.write_text(
+        json.dumps(
+            [{"rule_id": "r", "owner": "o", "ticker": "CL=F", "threshold": 0.03}]
+        )
+    )
+    output = tmp_path / "alerts.jsonl"
+    frame = pd.DataFrame(
+        {
+            "ticker": ["CL=F"] * 2,
+            "datetime": pd.date_range(T0, periods=2, freq="5min"),
+            "adj_close": [80.0, 84.0],
+            "close": [80.0, 84.0],
+        }
+    )
+    polls: list[int] = []
+
+    def fetch(tickers: Sequence[str], **kwargs: object) -> FetchResult:
+        polls.append(len(polls))
+        if len(polls) == 1:
+            raise ConnectionError("upstream down")
+        return FetchResult(frame)
+
+    def sleep(seconds: float) -> None:
+        if len(polls) == 2:
+            raise _StopLoopError
+
+    monkeypatch.setattr(alerts, "fetch_prices_report", fetch)
+    monkeypatch.setattr(alerts.time, "sleep", sleep)
+
+    with pytest.raises(_StopLoopError):
+        alerts.main(["--rules", str(rules), "--output", str(output)])
+
+    assert len(polls) == 2
+    assert json.loads(output.read_text())["rule_id"] == "r"
+
+
+def test_main_fetches_more_rule_tickers_than_max_tickers(
+    monkeypatch: pytest.MonkeyPatch, tmp_path: Path
+) -> None:
+    tickers = [f"T{i:02d}=F" for i in range(12)]
+    rules = tmp_path / "rules.json"
+    rules.write_text(
+        json.dumps(
+            [
+                {"rule_id": t, "owner": "o", "ticker": t, "threshold": 0.03}
+                for t in tickers
+            ]
+        )
+    )
+    output = tmp_path / "alerts.jsonl"
+    chunks: list[int] = []
+
+    def fetch(tickers: Sequence[str], **kwargs: object) -> FetchResult:
+        assert len(tickers) <= get_settings().max_tickers
+        chunks.append(len(tickers))
+        frame = pd.DataFrame(
+            {
+                "ticker": np.repeat(list(tickers), 2),
+                "datetime": np.tile(
+                    pd.date_range(T0, periods=2, freq="5min"), len(tickers)
+                ),
+                "adj_close": np.tile([80.0, 84.0], len(tickers)),
+                "close": np.tile([80.0, 84.0], len(tickers)),
+            }
+        )
+        return FetchResult(frame)
+
+    monkeypatch.setattr(alerts, "fetch_prices_report", fetch)
+
+    code = alerts.main(["--rules", str(rules), "--output", str(output), "--once"])
+
+    assert code == 0
+    assert chunks == [10, 2]
+    fired = [json.loads(line)["ticker"] for line in output.read_text().splitlines()]
+    assert sorted(fired) == tickers
+
+
+def test_load_rules_roundtrip(tmp_path: Path) -> None:
+    path = tmp_path / "rules.json"
+    path.write_text(
+        json.dumps(
+            [{"rule_id": "x", "owner": "o", "ticker": "GC=F", "threshold": 0.01}]
+        )
+    )
+
+    assert load_rules(path) == [AlertRule("x", "o", "GC=F", 0.01)]
+    with pytest.raises(ValueError):
+        AlertEngine([AlertRule("x", "o", "GC=F", 0.01, direction="sideways")])
+
+
+def test_thousands_of_rules_evaluate_quickly() -> None:
+    rng = np.random.default_rng(0)
+    tickers = [f"SYN{index:03d}=F" for index in range(200)]
+    rules = [
+        AlertRule(f"r{index}", f"trader{index % 50}", tickers[index % 200], threshold)
+        for index, threshold in enumerate(rng.uniform(0.005, 0.05, 10_000))
+    ]
+    engine = AlertEngine(rules)
+    changes = pd.Series(rng.normal(0, 0.02, len(tickers)), index=tickers)
+    engine.evaluate(changes, at=T0)
+
+    started = time.perf_counter()
+    for step in range(20):
+        engine.evaluate(changes * (step % 3), at=T0)
+    per_cycle = (time.perf_counter() - started) / 20
+
+    assert per_cycle < 0.05
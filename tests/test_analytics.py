@@ -51,3 +51,83 @@ def test_daily_change(sample_prices: pd.DataFrame) -> None:
 def test_windows_validation(sample_prices: pd.DataFrame) -> None:
     with pytest.raises(ValueError):
         analytics.add_moving_averages(sample_prices, windows=())
+
+
+def test_compute_analytics_matches_groupby_reference() -> None:
+    frame = pd.DataFrame(
+        {
+            "ticker": ["NG=F", "CL=F", "CL=F", "NG=F", "CL=F", "NG=F", "CL=F"],
+            "datetime": pd.to_datetime(
+                [
+                    "2024-01-02",
+                    "2024-01-03",
+                    "2024-01-01",
+                    "2024-01-01",
+                    "2024-01-02",
+                    "2024-01-03",
+                    "2024-01-04",
+                ],
+                utc=True,
+            ),
+            "adj_close": [2.5, None, 70.0, None, 71.0, 2.0, 72.0],
+            "close": [2.5, 70.5, 70.0, 2.4, 71.0, 2.0, 72.0],
+        }
+    )
+
+    result = analytics.compute_analytics(frame, windows=(2,))
+
+    reference = frame.sort_values(["ticker", "datetime"]).reset_index(drop=True)
+    expected_ma = reference.groupby("ticker")["adj_close"].transform(
+        lambda series: series.rolling(2, min_periods=1).mean()
+    )
+    pd.testing.assert_series_equal(
+        result.enriched["ma_2"], expected_ma, check_names=False
+    )
+    assert result.enriched["ticker"].tolist() == reference["ticker"].tolist()
+    # CL=F: 70 -> 71 -> (ffill 71) -> 72; NG=F starts with a gap.
+    assert result.returns["daily_return"].tolist() == pytest.approx(
+        [0.0, 71 / 70 - 1, 0.0, 72 / 71 - 1, 0.0, 0.0, 2.0 / 2.5 - 1]
+    )
+    # Like the previous per-group helper, the latest change uses raw prices.
+    assert pd.isna(result.changes.loc["CL=F"])
+    assert result.changes.loc["NG=F"] == pytest.approx(2.0 / 2.5 - 1)
+
+
+def test_extend_analytics_matches_full_recompute() -> None:
+    days = pd.date_range("2024-01-01", periods=8, freq="D", tz="UTC")
+    prices = pd.DataFrame(
+        {
+            "ticker": ["CL=F"] * 8 + ["NG=F"] * 8,
+            "datetime": list(days) * 2,
+            "adj_close": [
+                70,
+                71,
+                None,
+                72,
+                73,
+                71,
+                70,
+                74,
+                2,
+                2.1,
+                2.2,
+                2,
+                1.9,
+                2,
+                2.3,
+                2.4,
+            ],
+            "close": [70.0] * 16,
+        }
+    )
+    history = prices[prices["datetime"] < days[5]].reset_index(drop=True)
+    # The tail re-delivers the last held bar (it may have been still forming).
+    tail = prices[prices["datetime"] >= days[4]].reset_index(drop=True)
+
+    previous = analytics.compute_analytics(history, windows=(3,))
+    extended = analytics.extend_analytics(previous, tail, windows=(3,))
+    full = analytics.compute_analytics(prices, windows=(3,))
+
+    pd.testing.assert_frame_equal(extended.enriched, full.enriched)
+    pd.testing.assert_frame_equal(extended.returns, full.returns)
+    pd.testing.assert_series_equal(extended.changes, full.changes)
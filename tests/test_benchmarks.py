@@ -0,0 +1,119 @@
+"""Tests for the synthetic market generator and benchmark runner."""
+
+from __future__ import annotations
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from benchmarks import legacy, run as bench, startup
+from benchmarks.synthetic import synthetic_download
+from src import data, frames
+
+
+def test_synthetic_download_is_deterministic_and_yfinance_shaped() -> None:
+    first = synthetic_download(3, interval="5m", days=2, seed=1)
+    second = synthetic_download(3, interval="5m", days=2, seed=1)
+
+    pd.testing.assert_frame_equal(first, second)
+    assert isinstance(first.columns, pd.MultiIndex)
+    assert len(first) == 2 * 78
+    tidy = data._normalise_columns(
+        data._prepare_index(first, list(first.columns.get_level_values(1).unique()))
+    )
+    assert tidy["ticker"].nunique() == 3
+    assert (tidy["high"] >= tidy["low"]).all()
+
+
+def test_runner_emits_json_report(tmp_path) -> None:
+    output = tmp_path / "bench.json"
+
+    exit_code = bench.main(
+        ["--tickers", "2", "--days", "3", "--repeat", "1", "--output", str(output)]
+    )
+
+    report = json.loads(output.read_text())
+    assert exit_code == 0
+    assert report["params"]["tickers"] == 2
+    names = {result["name"] for result in report["results"]}
+    assert {
+        "data._prepare_index",
+        "plotting.price_chart",
+        "app.csv_export",
+        "app.parquet_export",
+    } <= names
+    memory = report["memory"]
+    assert memory["compact"]["total_bytes"] < memory["default"]["total_bytes"]
+
+
+def _legacy_and_new(raw: pd.DataFrame, tickers: list[str]):
+    expected = legacy.normalise_columns(legacy.prepare_index(raw, tickers))
+    actual = data._normalise_columns(data._prepare_index(raw, tickers))
+    return expected, actual
+
+
+def test_reshape_rewrite_matches_legacy_on_5m_data() -> None:
+    raw = synthetic_download(4, interval="5m", days=3, seed=2)
+    tickers = list(raw.columns.get_level_values(1).unique())
+    # Gaps and a ticker with no prints in a bar must survive as NaN rows.
+    raw.iloc[5, :] = np.nan
+    raw.iloc[7, 2] = np.nan
+
+    expected, actual = _legacy_and_new(raw, tickers)
+
+    pd.testing.assert_frame_equal(actual, expected)
+    assert frames.is_marked_sorted(actual)
+
+
+def test_reshape_rewrite_matches_legacy_on_unsorted_and_object_input() -> None:
+    raw = synthetic_download(3, interval="1d", days=10, seed=4)
+    tickers = list(raw.columns.get_level_values(1).unique())
+    raw = raw.iloc[::-1]
+    raw[("Volume", tickers[0])] = raw[("Volume", tickers[0])].astype(str)
+    raw[("Open", tickers[0])] = raw[("Open", tickers[0])].astype(object)
+    raw.loc[raw.index[0], ("Open", tickers[0])] = "n/a"
+
+    expected, actual = _legacy_and_new(raw.copy(), tickers)
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_reshape_accepts_ticker_grouped_columns() -> None:
+    raw = synthetic_download(2, interval="1d", days=5, seed=5)
+    tickers = list(raw.columns.get_level_values(1).unique())
+    grouped = raw.swaplevel(axis=1)
+
+    _, expected = _legacy_and_new(raw, tickers)
+    actual = data._normalise_columns(data._prepare_index(grouped, tickers))
+
+    pd.testing.assert_frame_equal(actual, expected)
+
+
+def test_parse_importtime_reads_cumulative_and_depth() -> None:
+    stderr = "\n".join(
+        [
+            "import time: self [us] | cumulative | imported package",
+            "import time:       120 |        120 |     _io",
+            "import time:      3000 |       3120 |   pandas",
+            "warning: unrelated",
+        ]
+    )
+
+    records = startup.parse_importtime(stderr)
+
+    assert [(r.name, r.cumulative_us, r.depth) for r in records] == [
+        ("_io", 120, 2),
+        ("pandas", 3120, 1),
+    ]
+
+
+def test_headless_paths_skip_ui_and_plotting_imports() -> None:
+    cli_modules = {record.name for record in startup.profile_import("src.cli")[0]}
+    plotting_modules = {
+        record.name for record in startup.profile_import("src.plotting")[0]
+    }
+
+    assert "src.cli" in cli_modules
+    assert not {"streamlit", "plotly", "yfinance"} & cli_modules
+    assert "plotly" not in plotting_modules
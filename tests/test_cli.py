@@ -0,0 +1,132 @@
+"""Tests for the headless batch export."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_download
+from src import cli, data
+from src.analytics import compute_analytics
+from src.data import DataDownloadError, FetchResult, TickerFailure
+
+START = pd.Timestamp("2024-01-01", tz="UTC")
+END = pd.Timestamp("2024-03-01", tz="UTC")
+
+
+@pytest.fixture(scope="module")
+def universe() -> pd.DataFrame:
+    raw = synthetic_download(25, interval="1d", days=40, seed=3)
+    tickers = list(raw.columns.get_level_values(1).unique())
+    return data._normalise_columns(data._prepare_index(raw, tickers))
+
+
+def _fake_fetch(universe: pd.DataFrame, calls: list[tuple[str, ...]]):
+    def fetch(tickers, start, end, interval):
+        calls.append(tuple(tickers))
+        prices = universe[universe["ticker"].isin(tickers)].reset_index(drop=True)
+        failures = {
+            ticker: TickerFailure(ticker, DataDownloadError("delisted"))
+            for ticker in tickers
+            if ticker not in set(prices["ticker"])
+        }
+        return FetchResult(prices=prices, failures=failures)
+
+    return fetch
+
+
+def test_export_writes_partitions_in_bounded_chunks(
+    universe: pd.DataFrame, tmp_path: Path
+) -> None:
+    calls: list[tuple[str, ...]] = []
+    tickers = [*universe["ticker"].unique(), "GONE=F"]
+
+    report = cli.export_analytics(
+        tickers,
+        START,
+        END,
+        "1d",
+        (5, 20),
+        tmp_path,
+        chunk_size=10,
+        workers=2,
+        fetch=_fake_fetch(universe, calls),
+    )
+
+    assert sorted(len(chunk) for chunk in calls) == [6, 10, 10]
+    assert report.tickers == 26 and report.chunks == 3 and report.files == 25
+    assert report.rows == len(universe) and report.rows_per_second > 0
+    assert report.failed == {"GONE=F": "delisted"}
+
+    ticker = tickers[3]
+    written = pd.read_parquet(cli.partition_path(tmp_path, "1d", ticker, "parquet"))
+    expected = compute_analytics(universe[universe["ticker"] == ticker], (5, 20))
+    pd.testing.assert_frame_equal(
+        written.drop(columns="daily_return"), expected.enriched
+    )
+    pd.testing.assert_series_equal(
+        written["daily_return"], expected.returns["daily_return"]
+    )
+
+
+def test_chunk_size_is_capped_at_max_tickers(
+    universe: pd.DataFrame, tmp_path: Path
+) -> None:
+    calls: list[tuple[str, ...]] = []
+
+    cli.export_analytics(
+        universe["ticker"].unique(),
+        START,
+        END,
+        "1d",
+        (5,),
+        tmp_path,
+        fmt="csv",
+        chunk_size=1_000,
+        fetch=_fake_fetch(universe, calls),
+    )
+
+    assert max(len(chunk) for chunk in calls) == 10
+    assert cli.partition_path(tmp_path, "1d", "SYN000=F", "csv").exists()
+
+
+def test_main_reads_ticker_file_and_reports(
+    universe: pd.DataFrame, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(cli, "fetch_prices_report", _fake_fetch(universe, []))
+    universe_file = tmp_path / "tickers.txt"
+    universe_file.write_text("# energy\nSYN000=F\n\nSYN001=F  # brent proxy\n")
+    report_path = tmp_path / "report.json"
+
+    code = cli.main(
+        [
+            "export",
+            "--tickers-file",
+            str(universe_file),
+            "--output",
+            str(tmp_path / "out"),
+            "--start",
+            "2024-01-01",
+            "--windows",
+            "5",
+            "--report",
+            str(report_path),
+        ]
+    )
+
+    assert code == 0
+    assert json.loads(report_path.read_text())["files"] == 2
+
+
+def test_cli_does_not_import_streamlit() -> None:
+    probe = "import sys, src.cli; print('streamlit' in sys.modules)"
+    result = subprocess.run(  # noqa: S603 - fixed interpreter and arguments.
+        [sys.executable, "-c", probe], capture_output=True, text=True, check=True
+    )
+
+    assert result.stdout.strip() == "False"
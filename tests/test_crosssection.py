@@ -0,0 +1,136 @@
+"""Tests for cross-commodity correlation, beta and spread analytics."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.crosssection import (
+    build_panel,
+    latest_correlation,
+    pair_spread,
+    rolling_beta,
+    rolling_correlation,
+)
+from src.plotting import correlation_heatmap
+
+
+@pytest.fixture()
+def price_frame() -> pd.DataFrame:
+    rng = np.random.default_rng(7)
+    index = pd.date_range("2024-01-01", periods=300, freq="h", tz="UTC")
+    common = rng.normal(0, 0.01, len(index))
+    frames = []
+    for loading, ticker in zip((1.0, 0.8, -0.5), ("BZ=F", "CL=F", "GC=F"), strict=True):
+        returns = loading * common + rng.normal(0, 0.005, len(index))
+        frames.append(
+            pd.DataFrame(
+                {
+                    "ticker": ticker,
+                    "datetime": index,
+                    "adj_close": 80 * np.cumprod(1 + returns),
+                }
+            )
+        )
+    frame = pd.concat(frames, ignore_index=True)
+    # Drop a few prints so the panel has to forward-fill.
+    return frame.drop(index=[10, 11, 450]).reset_index(drop=True)
+
+
+def _reference_returns(frame: pd.DataFrame) -> pd.DataFrame:
+    wide = frame.pivot(index="datetime", columns="ticker", values="adj_close")
+    return wide.ffill().pct_change()
+
+
+def test_rolling_correlation_matches_pandas(price_frame: pd.DataFrame) -> None:
+    panel = build_panel(price_frame)
+    result = rolling_correlation(panel, window=48)
+    reference = _reference_returns(price_frame).rolling(48, min_periods=2).corr()
+
+    assert result.matrices.shape == (len(panel.index) - 47, 3, 3)
+    for position in (0, 100, -1):
+        stamp = result.index[position]
+        expected = reference.loc[stamp].loc[list(panel.tickers), list(panel.tickers)]
+        np.testing.assert_allclose(result.frame(position), expected, atol=1e-8)
+
+
+def test_latest_correlation_uses_trailing_window(price_frame: pd.DataFrame) -> None:
+    panel = build_panel(price_frame)
+    matrix = latest_correlation(panel, window=60)
+    expected = _reference_returns(price_frame).iloc[-60:].corr()
+
+    np.testing.assert_allclose(matrix, expected, atol=1e-8)
+    assert matrix.loc["BZ=F", "CL=F"] > 0.5
+    assert matrix.loc["BZ=F", "GC=F"] < 0
+
+
+def test_rolling_correlation_rejects_short_window(price_frame: pd.DataFrame) -> None:
+    with pytest.raises(ValueError):
+        rolling_correlation(build_panel(price_frame), window=1)
+
+
+def test_rolling_beta_matches_cov_over_var(price_frame: pd.DataFrame) -> None:
+    panel = build_panel(price_frame)
+    beta = rolling_beta(panel, "CL=F", "BZ=F", window=40)
+    returns = _reference_returns(price_frame)
+    expected = (
+        returns["CL=F"].rolling(40, min_periods=2).cov(returns["BZ=F"])
+        / returns["BZ=F"].rolling(40, min_periods=2).var()
+    )
+
+    np.testing.assert_allclose(beta.iloc[39:], expected.iloc[39:], atol=1e-8)
+    assert beta.iloc[:39].isna().all()
+
+
+def test_late_listing_is_excluded_not_zero_filled(price_frame: pd.DataFrame) -> None:
+    late = price_frame.drop(price_frame.index[price_frame["ticker"] == "GC=F"][:100])
+    panel = build_panel(late)
+    returns = _reference_returns(late)
+    gold = panel.column("GC=F")
+
+    assert np.isnan(panel.returns[:101, gold]).all()
+    result = rolling_correlation(panel, window=48, at=[60, 120, -1])
+    reference = returns.rolling(48, min_periods=2).corr()
+    for position, stamp in enumerate(result.index):
+        expected = reference.loc[stamp].loc[list(panel.tickers), list(panel.tickers)]
+        np.testing.assert_allclose(result.frame(position), expected, atol=1e-8)
+    assert np.isnan(result.matrices[0][gold]).all()  # No gold returns yet.
+    beta = rolling_beta(panel, "GC=F", "BZ=F", window=40)
+    expected = (
+        returns["GC=F"].rolling(40, min_periods=2).cov(returns["BZ=F"])
+        / returns["BZ=F"]
+        .where(returns["GC=F"].notna())
+        .rolling(40, min_periods=2)
+        .var()
+    )
+    np.testing.assert_allclose(beta.iloc[39:], expected.iloc[39:], atol=1e-8)
+
+
+def test_pair_spread_and_zscore(price_frame: pd.DataFrame) -> None:
+    panel = build_panel(price_frame)
+    spread = pair_spread(panel, "CL=F", "BZ=F", window=24)
+    wide = price_frame.pivot(index="datetime", columns="ticker", values="adj_close")
+    wide = wide.ffill()
+    expected = wide["CL=F"] - wide["BZ=F"]
+
+    np.testing.assert_allclose(spread["spread"], expected.to_numpy(), atol=1e-9)
+    rolling = spread["spread"].rolling(24, min_periods=1)
+    reference = (spread["spread"] - rolling.mean()) / rolling.std(ddof=0)
+    np.testing.assert_allclose(
+        spread["zscore"].iloc[24:], reference.iloc[24:], atol=1e-6
+    )
+
+
+def test_unknown_ticker_raises_key_error(price_frame: pd.DataFrame) -> None:
+    with pytest.raises(KeyError):
+        pair_spread(build_panel(price_frame), "CL=F", "NG=F")
+
+
+def test_correlation_heatmap_labels(price_frame: pd.DataFrame) -> None:
+    matrix = latest_correlation(build_panel(price_frame), window=30)
+    fig = correlation_heatmap(matrix)
+
+    heatmap = fig.data[0]
+    assert heatmap.zmin == -1 and heatmap.zmax == 1
+    assert len(heatmap.x) == 3
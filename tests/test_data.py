@@ -2,12 +2,22 @@
 
 from __future__ import annotations
 
+import threading
+import time
 from typing import Any
 
 import pandas as pd
 import pytest
 
 from src import data
+from src.store import BarStore
+
+
+@pytest.fixture(autouse=True)
+def fresh_provider() -> None:
+    """Give every test its own circuit breaker and rate limiter."""
+
+    data._provider.cache_clear()
 
 
 class DummyDownloader:
@@ -46,10 +56,10 @@ def _sample_single_ticker_frame() -> pd.DataFrame:
     return frame
 
 
-def test_fetch_prices_transforms_multi_index(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_fetch_prices_transforms_multi_index(yahoo) -> None:
     frame = _sample_multi_index_frame()
     downloader = DummyDownloader(frame)
-    monkeypatch.setattr(data.yf, "download", downloader)
+    yahoo(downloader)
 
     result = data.fetch_prices(["CL=F", "BZ=F"], interval="1d", retries=1)
 
@@ -69,10 +79,10 @@ def test_fetch_prices_transforms_multi_index(monkeypatch: pytest.MonkeyPatch) ->
     assert result["datetime"].dt.tz is not None
 
 
-def test_fetch_prices_handles_single_ticker(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_fetch_prices_handles_single_ticker(yahoo) -> None:
     frame = _sample_single_ticker_frame()
     downloader = DummyDownloader(frame)
-    monkeypatch.setattr(data.yf, "download", downloader)
+    yahoo(downloader)
 
     result = data.fetch_prices(["NG=F"], interval="1h", retries=1)
 
@@ -80,11 +90,229 @@ def test_fetch_prices_handles_single_ticker(monkeypatch: pytest.MonkeyPatch) ->
     assert result.loc[0, "open"] == pytest.approx(25.5)
 
 
-def test_fetch_prices_missing_columns(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_fetch_prices_missing_columns(yahoo) -> None:
     frame = _sample_single_ticker_frame().drop(columns=["Adj Close"])
     downloader = DummyDownloader(frame)
-    monkeypatch.setattr(data.yf, "download", downloader)
+    yahoo(downloader)
 
     with pytest.raises(data.DataDownloadError) as excinfo:
         data.fetch_prices(["CL=F"], retries=1)
     assert isinstance(excinfo.value.__cause__, ValueError)
+
+
+class RangeDownloader(DummyDownloader):
+    """Downloader that honours ``start``/``end`` so store gap-filling is observable."""
+
+    def __call__(self, *args: Any, **kwargs: Any) -> pd.DataFrame:
+        self.calls.append({"args": args, "kwargs": kwargs})
+        index = self.frame.index.tz_localize("UTC")
+        mask = index >= kwargs["start"]
+        if kwargs["end"] is not None:
+            mask &= index < kwargs["end"]
+        return self.frame.loc[mask]
+
+
+def _daily_multi_index_frame(periods: int) -> pd.DataFrame:
+    dates = pd.date_range("2024-01-01", periods=periods, freq="D")
+    columns = pd.MultiIndex.from_product(
+        [["Open", "High", "Low", "Close", "Adj Close", "Volume"], ["CL=F", "BZ=F"]]
+    )
+    values = [
+        [70.0 + day] * 5 + [1000] + [75.0 + day] * 5 + [900] for day in range(periods)
+    ]
+    return pd.DataFrame(values, index=dates, columns=columns)
+
+
+def test_fetch_prices_store_serves_repeat_window_from_disk(yahoo, tmp_path) -> None:
+    downloader = RangeDownloader(_daily_multi_index_frame(10))
+    yahoo(downloader)
+    store = BarStore(tmp_path)
+
+    first = data.fetch_prices(
+        ["CL=F", "BZ=F"], start="2024-01-01", end="2024-01-06", retries=1, store=store
+    )
+    second = data.fetch_prices(
+        ["CL=F", "BZ=F"], start="2024-01-01", end="2024-01-06", retries=1, store=store
+    )
+
+    assert len(downloader.calls) == 2  # One request per ticker, none on the repeat.
+    assert len(first) == 10
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_fetch_prices_store_downloads_only_missing_gap(yahoo, tmp_path) -> None:
+    downloader = RangeDownloader(_daily_multi_index_frame(10))
+    yahoo(downloader)
+    store = BarStore(tmp_path)
+
+    data.fetch_prices(
+        ["CL=F", "BZ=F"], start="2024-01-01", end="2024-01-06", retries=1, store=store
+    )
+    slid = data.fetch_prices(
+        ["CL=F", "BZ=F"], start="2024-01-02", end="2024-01-08", retries=1, store=store
+    )
+
+    gap_calls = [call["kwargs"] for call in downloader.calls[2:]]
+    assert sorted(call["tickers"] for call in gap_calls) == ["BZ=F", "CL=F"]
+    for gap_call in gap_calls:
+        assert gap_call["start"] == pd.Timestamp("2024-01-06", tz="UTC")
+        assert gap_call["end"] == pd.Timestamp("2024-01-08", tz="UTC")
+    assert slid["datetime"].min() == pd.Timestamp("2024-01-02", tz="UTC")
+    assert slid["datetime"].max() == pd.Timestamp("2024-01-07", tz="UTC")
+    assert len(slid) == 12
+
+
+def test_fetch_prices_store_refetches_bar_still_forming(
+    monkeypatch: pytest.MonkeyPatch, yahoo, tmp_path
+) -> None:
+    frame = _daily_multi_index_frame(5)
+    downloader = RangeDownloader(frame)
+    yahoo(downloader)
+    store = BarStore(tmp_path)
+    window = {"start": "2024-01-01", "end": "2024-01-10", "retries": 1}
+
+    # Midday on Jan 5th: that day's bar is still forming.
+    monkeypatch.setattr(data, "_now", lambda: pd.Timestamp("2024-01-05 12:00Z"))
+    first = data.fetch_prices(["CL=F"], store=store, **window)
+    forming = frame.loc["2024-01-05", ("Close", "CL=F")]
+    frame.loc["2024-01-05", ("Close", "CL=F")] = 99.0  # Upstream revises it.
+    monkeypatch.setattr(data, "_now", lambda: pd.Timestamp("2024-01-06 01:00Z"))
+    second = data.fetch_prices(["CL=F"], store=store, **window)
+
+    assert first["close"].iloc[-1] == forming
+    assert second["close"].iloc[-1] == 99.0
+    assert downloader.calls[-1]["kwargs"]["start"] == pd.Timestamp(
+        "2024-01-05", tz="UTC"
+    )
+    assert store.coverage("CL=F", "1d")[-1][1] == pd.Timestamp("2024-01-05", tz="UTC")
+
+
+def test_fetch_prices_store_remembers_empty_gaps(yahoo, tmp_path) -> None:
+    downloader = RangeDownloader(_daily_multi_index_frame(5))
+    yahoo(downloader)
+    store = BarStore(tmp_path)
+
+    for _ in range(2):
+        result = data.fetch_prices_report(
+            ["CL=F"], start="2024-01-06", end="2024-01-08", retries=1, store=store
+        )
+
+    assert len(downloader.calls) == 1  # The empty weekend is not asked for again.
+    assert result.prices.empty and set(result.failures) == {"CL=F"}
+
+
+class FlakyDownloader(RangeDownloader):
+    """Fails permanently for ``bad`` tickers and serves everything else."""
+
+    def __init__(self, frame: pd.DataFrame, bad: set[str]):
+        super().__init__(frame)
+        self.bad = bad
+
+    def __call__(self, *args: Any, **kwargs: Any) -> pd.DataFrame:
+        if kwargs["tickers"] in self.bad:
+            self.calls.append({"args": args, "kwargs": kwargs})
+            raise ConnectionError(f"boom {kwargs['tickers']}")
+        return super().__call__(*args, **kwargs)
+
+
+async def _no_sleep(_: float) -> None:
+    return None
+
+
+def test_fetch_prices_report_isolates_failing_ticker(
+    monkeypatch: pytest.MonkeyPatch,
+    yahoo,
+) -> None:
+    downloader = FlakyDownloader(_daily_multi_index_frame(3), bad={"BZ=F"})
+    yahoo(downloader)
+    monkeypatch.setattr(data, "_sleep", _no_sleep)
+
+    result = data.fetch_prices_report(
+        ["CL=F", "BZ=F"], start="2024-01-01", end="2024-01-04", retries=3, store=None
+    )
+
+    assert result.succeeded == ("CL=F",)
+    assert set(result.failures) == {"BZ=F"}
+    assert "boom BZ=F" in result.failures["BZ=F"].reason
+    good_calls = [c for c in downloader.calls if c["kwargs"]["tickers"] == "CL=F"]
+    bad_calls = [c for c in downloader.calls if c["kwargs"]["tickers"] == "BZ=F"]
+    assert len(good_calls) == 1  # The healthy ticker is never re-downloaded.
+    assert len(bad_calls) == 3
+
+
+def test_fetch_prices_drops_failed_tickers(yahoo) -> None:
+    downloader = FlakyDownloader(_daily_multi_index_frame(3), bad={"BZ=F"})
+    yahoo(downloader)
+
+    result = data.fetch_prices(
+        ["CL=F", "BZ=F"], start="2024-01-01", end="2024-01-04", retries=1
+    )
+
+    assert set(result["ticker"]) == {"CL=F"}
+
+
+class PerTickerHistory:
+    """``history`` fake whose bars are unique to each symbol; ``EMPTY`` has none."""
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.in_flight = self.peak = 0
+
+    def __call__(self, **kwargs: Any) -> pd.DataFrame:
+        ticker = kwargs["tickers"]
+        if ticker == "EMPTY":
+            raise data.yf.exceptions.YFPricesMissingError(ticker, "no data")
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+        time.sleep(0.02)
+        with self.lock:
+            self.in_flight -= 1
+        dates = pd.date_range("2024-01-01", periods=3, freq="D", name="Date")
+        price = float(sum(map(ord, ticker)))
+        columns = ["Open", "High", "Low", "Close", "Adj Close", "Volume"]
+        return pd.DataFrame([[price] * 6] * 3, index=dates, columns=columns)
+
+
+def test_fetch_prices_concurrent_tickers_keep_their_own_bars(yahoo) -> None:
+    history = PerTickerHistory()
+    yahoo(history)
+    tickers = [f"T{i}=F" for i in range(8)]
+
+    result = data.fetch_prices_report(
+        [*tickers, "EMPTY"],
+        start="2024-01-01",
+        end="2024-01-04",
+        retries=1,
+        store=None,
+    )
+
+    assert history.peak > 1  # Requests really overlapped.
+    assert result.succeeded == tuple(tickers)
+    assert set(result.failures) == {"EMPTY"}
+    closes = result.prices.groupby("ticker")["close"].agg(["min", "max", "size"])
+    for ticker in tickers:
+        expected = float(sum(map(ord, ticker)))
+        assert tuple(closes.loc[ticker]) == (expected, expected, 3)
+
+
+def test_fetch_latest_bars_requests_only_new_bars(
+    yahoo,
+) -> None:
+    frame = _daily_multi_index_frame(6)
+    downloader = RangeDownloader(frame)
+    yahoo(downloader)
+    held = data.fetch_prices(
+        ["CL=F", "BZ=F"], start="2024-01-01", end="2024-01-04", retries=1
+    )
+    downloader.calls.clear()
+
+    update = data.fetch_latest_bars(held, interval="1d", retries=1)
+    merged = data.merge_latest_bars(held, update.prices)
+
+    starts = {call["kwargs"]["start"] for call in downloader.calls}
+    assert starts == {pd.Timestamp("2024-01-03", tz="UTC")}
+    assert update.prices["datetime"].min() == pd.Timestamp("2024-01-03", tz="UTC")
+    assert len(merged) == 12
+    assert not merged.duplicated(["ticker", "datetime"]).any()
+    assert merged["ticker"].is_monotonic_increasing
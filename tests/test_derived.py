@@ -0,0 +1,119 @@
+"""Tests for the memoised derived-analytics cache."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import derived
+from src.analytics import compute_analytics
+from src.derived import DerivedCache, estimate_bytes, frame_fingerprint
+from src.metrics import REGISTRY
+
+
+@pytest.fixture()
+def prices() -> pd.DataFrame:
+    stamps = pd.date_range("2024-01-01", periods=30, freq="h", tz="UTC")
+    rng = np.random.default_rng(7)
+    return pd.DataFrame(
+        {
+            "ticker": np.repeat(["BZ=F", "CL=F"], len(stamps)),
+            "datetime": np.tile(stamps, 2),
+            "adj_close": 80 + rng.normal(0, 1, 2 * len(stamps)).cumsum(),
+            "close": 80.0,
+            "volume": np.arange(2 * len(stamps)),
+        }
+    )
+
+
+def test_fingerprint_tracks_content_not_identity(prices: pd.DataFrame) -> None:
+    base = frame_fingerprint(prices)
+
+    assert frame_fingerprint(prices.copy()) == base
+    changed = prices.copy()
+    changed.loc[45, "adj_close"] += 0.01
+    assert frame_fingerprint(changed) != base
+    assert frame_fingerprint(prices.iloc[::-1].reset_index(drop=True)) != base
+    assert frame_fingerprint(prices.iloc[:-1]) != base
+    relabelled = prices.assign(ticker=prices["ticker"].replace("CL=F", "NG=F"))
+    assert frame_fingerprint(relabelled) != base
+
+
+def test_fingerprint_sees_sub_unit_changes_in_compact_columns(
+    prices: pd.DataFrame,
+) -> None:
+    compact = prices.astype({"adj_close": "float32", "volume": "int32"})
+    base = frame_fingerprint(compact)
+
+    changed = compact.copy()
+    changed.loc[45, "adj_close"] += np.float32(0.25)
+    assert int(changed.loc[45, "adj_close"]) == int(compact.loc[45, "adj_close"])
+    assert frame_fingerprint(changed) != base
+    halved = compact.assign(close=compact["close"].astype("float16") + 0.5)
+    assert frame_fingerprint(halved) != frame_fingerprint(
+        compact.assign(close=compact["close"].astype("float16"))
+    )
+
+
+def test_analytics_match_direct_computation_and_reuse_windows(
+    prices: pd.DataFrame, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = DerivedCache(max_bytes=10 * 1024**2)
+    requested: list[list[int]] = []
+    real = derived.moving_averages
+
+    def spy(frame: pd.DataFrame, windows: list[int]) -> dict[int, np.ndarray]:
+        requested.append(list(windows))
+        return real(frame, windows)
+
+    monkeypatch.setattr(derived, "moving_averages", spy)
+
+    first = cache.analytics(prices, (5, 10))
+    again = cache.analytics(prices, (10, 5))
+    wider = cache.analytics(prices, (5, 10, 20))
+
+    expected = compute_analytics(prices, (5, 10, 20))
+    pd.testing.assert_frame_equal(wider.enriched, expected.enriched)
+    pd.testing.assert_frame_equal(wider.returns, expected.returns)
+    pd.testing.assert_series_equal(wider.changes, expected.changes)
+    assert requested == [[5, 10], [20]]
+    assert again.returns is first.returns
+    assert "ma_20" not in first.enriched
+
+
+def test_lru_eviction_by_bytes_and_stats() -> None:
+    cache = DerivedCache(max_bytes=3 * 800, name="unit")
+    REGISTRY.reset()
+
+    for key in "abc":
+        cache.get(key, lambda: np.zeros(100))
+    cache.get("a", lambda: pytest.fail("a should still be cached"))
+    cache.get("d", lambda: np.zeros(100))
+    built = []
+    cache.get("b", lambda: built.append("b") or np.zeros(100))
+    cache.get("huge", lambda: np.zeros(10_000))
+
+    stats = cache.stats()
+    assert built == ["b"]
+    assert stats.entries == 3 and stats.bytes == 2400
+    assert (stats.hits, stats.misses, stats.evictions) == (1, 6, 2)
+    assert stats.hit_rate == pytest.approx(1 / 7)
+    assert REGISTRY.value("cci_cache_requests_total", cache="unit", result="hit") == 1
+    assert REGISTRY.value("cci_cache_bytes", cache="unit") == 2400
+
+
+def test_fingerprint_is_memoised_per_frame_object(
+    prices: pd.DataFrame, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = DerivedCache(max_bytes=1024**2)
+    calls = []
+    real = derived.frame_fingerprint
+    monkeypatch.setattr(
+        derived, "frame_fingerprint", lambda frame: calls.append(1) or real(frame)
+    )
+
+    assert cache.fingerprint(prices) == cache.fingerprint(prices)
+    assert cache.fingerprint(prices.copy()) == real(prices)
+    assert len(calls) == 2
+    assert estimate_bytes(compute_analytics(prices)) > 0
@@ -0,0 +1,72 @@
+"""Tests for chart downsampling helpers."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import plotting
+from src.downsample import lttb_indices, minmax_indices
+
+
+@pytest.fixture()
+def spiky_series() -> np.ndarray:
+    values = np.sin(np.linspace(0, 20, 10_000))
+    values[4321] = 50.0
+    values[7777] = -50.0
+    return values
+
+
+def test_minmax_keeps_extremes_and_endpoints(spiky_series: np.ndarray) -> None:
+    indices = minmax_indices(spiky_series, 200)
+
+    assert len(indices) <= 200
+    assert {0, 4321, 7777, len(spiky_series) - 1} <= set(indices.tolist())
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_respects_budget_and_keeps_spike(spiky_series: np.ndarray) -> None:
+    x = np.arange(len(spiky_series), dtype=float)
+
+    indices = lttb_indices(x, spiky_series, 300)
+
+    assert len(indices) <= 300
+    assert indices[0] == 0 and indices[-1] == len(spiky_series) - 1
+    assert {4321, 7777} <= set(indices.tolist())
+
+
+def test_short_series_are_untouched() -> None:
+    assert minmax_indices(np.arange(10.0), 100).tolist() == list(range(10))
+    assert lttb_indices(np.arange(10.0), np.arange(10.0), 100).tolist() == list(
+        range(10)
+    )
+
+
+def test_price_chart_caps_points_and_drops_text_lists() -> None:
+    stamps = pd.date_range("2024-01-01", periods=5_000, freq="5min", tz="UTC")
+    frame = pd.DataFrame(
+        {
+            "ticker": "CL=F",
+            "datetime": stamps,
+            "close": np.linspace(70, 80, len(stamps)),
+            "ma_20": np.linspace(70, 80, len(stamps)),
+        }
+    )
+
+    fig = plotting.price_chart(frame, [20], max_points=500, use_webgl=True)
+
+    assert [trace.type for trace in fig.data] == ["scattergl", "scattergl"]
+    assert all(len(trace.x) <= 500 for trace in fig.data)
+    assert list(fig.data[0].x) == list(fig.data[1].x)
+    assert fig.data[0].text is None
+    assert "CL=F" in fig.data[0].hovertemplate
+
+
+def test_hover_labels_escape_markup_only() -> None:
+    stamps = pd.date_range("2024-01-01", periods=3, freq="1D", tz="UTC")
+    frame = pd.DataFrame({"ticker": "M&M <5%>", "datetime": stamps, "close": 1.0})
+
+    template = plotting.price_chart(frame, []).data[0].hovertemplate
+
+    assert template.startswith("<b>M&amp;M &lt;5%&gt;</b><br>")
@@ -0,0 +1,36 @@
+"""Tests for dataset export encoding."""
+
+from __future__ import annotations
+
+import io
+
+import pandas as pd
+import pytest
+
+from src.export import EXPORT_FORMATS, to_bytes
+
+
+@pytest.fixture()
+def frame() -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "ticker": ["CL=F", "CL=F"],
+            "datetime": pd.date_range("2024-01-01", periods=2, tz="UTC"),
+            "adj_close": [70.0, 70.5],
+            "ma_20": [70.0, 70.25],
+        }
+    )
+
+
+def test_csv_and_parquet_roundtrip(frame: pd.DataFrame) -> None:
+    csv = pd.read_csv(io.BytesIO(to_bytes(frame, "csv")), parse_dates=["datetime"])
+    parquet = pd.read_parquet(io.BytesIO(to_bytes(frame, "parquet")))
+
+    pd.testing.assert_frame_equal(csv, frame)
+    pd.testing.assert_frame_equal(parquet, frame)
+    assert EXPORT_FORMATS["parquet"].extension == "parquet"
+
+
+def test_unknown_format_is_rejected(frame: pd.DataFrame) -> None:
+    with pytest.raises(ValueError, match="Unknown export format"):
+        to_bytes(frame, "xlsx")
@@ -0,0 +1,86 @@
+"""Tests for shared tidy-frame helpers."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import analytics, frames
+
+
+@pytest.fixture()
+def prices() -> pd.DataFrame:
+    stamps = pd.date_range("2024-01-01", periods=4, freq="D", tz="UTC")
+    return pd.DataFrame(
+        {
+            "ticker": ["BZ=F"] * 4 + ["CL=F"] * 4,
+            "datetime": list(stamps) * 2,
+            "open": np.linspace(70, 77, 8),
+            "high": np.linspace(71, 78, 8),
+            "low": np.linspace(69, 76, 8),
+            "close": np.linspace(70.5, 77.5, 8),
+            "adj_close": np.linspace(70.5, 77.5, 8),
+            "volume": np.arange(1000, 1008),
+        }
+    )
+
+
+def test_compact_prices_narrows_dtypes(prices: pd.DataFrame) -> None:
+    compact = frames.compact_prices(prices)
+
+    assert isinstance(compact["ticker"].dtype, pd.CategoricalDtype)
+    assert compact["close"].dtype == np.float32
+    assert compact["volume"].dtype == np.uint32
+    np.testing.assert_allclose(compact["close"], prices["close"], rtol=1e-6)
+    assert prices["close"].dtype == np.float64  # Caller's frame is untouched.
+
+
+def test_compact_prices_keeps_wide_volume() -> None:
+    frame = pd.DataFrame({"ticker": ["CL=F"], "volume": [2**40]})
+
+    assert frames.compact_prices(frame)["volume"].dtype == np.int64
+
+
+def test_memory_report_counts_shared_columns_once(prices: pd.DataFrame) -> None:
+    result = analytics.compute_analytics(prices, windows=(2,))
+
+    report = frames.memory_report(
+        {"prices": prices, "enriched": result.enriched, "returns": result.returns}
+    )
+
+    assert list(report.frames.index) == ["prices", "enriched", "returns"]
+    assert report.unique_bytes < report.total_bytes
+
+
+def test_splice_tail_keeps_categorical_tickers(prices: pd.DataFrame) -> None:
+    compact = frames.compact_prices(prices)
+    tail = prices.iloc[[3]].assign(close=99.0, ticker="BZ=F")
+
+    spliced = frames.splice_tail(compact, tail.reset_index(drop=True))
+
+    assert isinstance(spliced["ticker"].dtype, pd.CategoricalDtype)
+    assert len(spliced) == len(prices)
+    assert spliced.loc[3, "close"] == pytest.approx(99.0)
+
+
+def test_sorted_marker_survives_only_order_preserving_ops(
+    prices: pd.DataFrame,
+) -> None:
+    marked = frames.sort_prices(prices)
+
+    assert frames.is_marked_sorted(marked)
+    assert frames.is_marked_sorted(marked.copy(deep=False))
+    assert not frames.is_marked_sorted(marked.sort_values("datetime"))
+    # concat keeps attrs, but the row count and last key no longer match.
+    assert not frames.is_marked_sorted(pd.concat([marked, marked], ignore_index=True))
+
+
+def test_sort_prices_orders_unsorted_input(prices: pd.DataFrame) -> None:
+    shuffled = prices.sample(frac=1.0, random_state=3)
+
+    result = frames.sort_prices(shuffled)
+
+    pd.testing.assert_frame_equal(result, prices, check_like=False)
+    assert frames.is_marked_sorted(result)
+    assert not analytics.compute_analytics(result).enriched.empty
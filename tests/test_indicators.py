@@ -0,0 +1,122 @@
+"""Tests for the streaming technical indicators."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_download
+from src import data
+from src.indicators import (
+    ATR,
+    PRESETS,
+    RSI,
+    Bar,
+    BarArrays,
+    IndicatorBook,
+    compute_indicators,
+    overlay_columns,
+    parse_indicator,
+)
+from src.plotting import indicator_chart, price_chart
+
+
+@pytest.fixture(scope="module")
+def bars() -> pd.DataFrame:
+    raw = synthetic_download(3, interval="5m", days=6, seed=9)
+    tickers = list(raw.columns.get_level_values(1).unique())
+    tidy = data._normalise_columns(data._prepare_index(raw, tickers))
+    tidy.loc[tidy.index[30:45], ["open", "high", "low", "close", "adj_close"]] = np.nan
+    return tidy
+
+
+def _as_bar(row: pd.Series) -> Bar:
+    return Bar(
+        row["datetime"].value, row["high"], row["low"], row["close"], row["volume"]
+    )
+
+
+def test_updates_match_the_vectorised_pass(bars: pd.DataFrame) -> None:
+    specs = list(PRESETS)
+    batch = compute_indicators(bars, specs)
+    book = IndicatorBook(specs)
+    book.prime(bars.groupby("ticker").head(10))
+
+    for ticker, block in batch.groupby("ticker"):
+        for _, row in block.iloc[10:].iterrows():
+            streamed = book.update(ticker, _as_bar(row))
+            np.testing.assert_allclose(
+                [streamed[column] for column in book.columns],
+                row[list(book.columns)].to_numpy(dtype=float),
+                rtol=1e-9,
+                atol=1e-9,
+            )
+
+
+def test_indicators_match_textbook_definitions(bars: pd.DataFrame) -> None:
+    frame = compute_indicators(bars, ["ema:10", "bb:20,2", "rsi:14", "vwap"])
+    block = frame[frame["ticker"] == frame["ticker"].iloc[0]]
+    close = block["close"]
+
+    pd.testing.assert_series_equal(
+        block["ind_ema_10"],
+        close.ewm(span=10, adjust=False, ignore_na=True).mean(),
+        check_names=False,
+    )
+    valid = close.dropna()
+    mid = valid.rolling(20).mean()
+    upper = mid + 2 * valid.rolling(20).std(ddof=0)
+    np.testing.assert_allclose(block["ind_bb_mid_20"].loc[mid.index], mid)
+    np.testing.assert_allclose(block["ind_bb_upper_20"].loc[mid.index], upper)
+
+    rsi = block["ind_rsi_14"].dropna()
+    assert rsi.between(0, 100).all() and block["ind_rsi_14"].isna().sum() == 14
+
+    day = block[block["datetime"].dt.date == block["datetime"].dt.date.iloc[-1]]
+    typical = (day["high"] + day["low"] + day["close"]) / 3
+    expected = (typical * day["volume"]).sum() / day["volume"].sum()
+    assert block["ind_vwap"].iloc[-1] == pytest.approx(expected)
+
+
+def test_wilder_warm_up_and_gaps() -> None:
+    closes = np.array([10.0, 11.0, np.nan, 12.0, 11.0, 13.0])
+    arrays = BarArrays(
+        stamp=np.arange(6, dtype=np.int64),
+        high=closes + 1,
+        low=closes - 1,
+        close=closes,
+        volume=np.ones(6),
+    )
+    rsi, atr = RSI(3), ATR(3)
+
+    rsi_out, atr_out = rsi.prime(arrays)[:, 0], atr.prime(arrays)[:, 0]
+
+    # Moves +1, +1, -1 seed the averages; the gap row repeats the row before.
+    assert np.isnan(rsi_out[:4]).all()
+    assert rsi_out[4] == pytest.approx(100 - 100 / (1 + 2))
+    assert rsi_out[5] == pytest.approx(100 - 100 / (1 + (10 / 9) / (2 / 9)))
+    assert np.isnan(atr_out[:3]).all()
+    np.testing.assert_allclose(atr_out[3:], [2.0, 2.0, 7 / 3])
+    assert rsi.update(Bar(7, np.nan, np.nan, np.nan, 0.0)) == rsi.last
+
+
+def test_specs_and_chart_overlays(bars: pd.DataFrame) -> None:
+    assert parse_indicator("macd:5,10,3").columns[0] == "ind_macd_5_10_3"
+    assert overlay_columns(["ema:20", "rsi:14", "bb:20"]) == [
+        "ind_ema_20",
+        "ind_bb_mid_20",
+        "ind_bb_upper_20",
+        "ind_bb_lower_20",
+    ]
+    with pytest.raises(ValueError):
+        parse_indicator("stoch:14")
+    with pytest.raises(ValueError):
+        IndicatorBook(["ema:20", "ema:20"])
+
+    frame = compute_indicators(bars, ["ema:20", "macd:12,26,9"])
+    price_fig = price_chart(frame, (), overlays=overlay_columns(["ema:20"]))
+    names = [trace.name for trace in price_fig.data]
+    assert sum(name.endswith("EMA 20") for name in names) == 3
+    oscillators = indicator_chart(frame, ["ind_macd_12_26_9"])
+    assert len(oscillators.data) == 3
@@ -0,0 +1,105 @@
+"""Tests for the instrumentation layer."""
+
+from __future__ import annotations
+
+import logging
+import urllib.request
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src import metrics
+from src.analytics import compute_analytics
+from src.metrics import REGISTRY, instrument, record_cache, timed, trace
+
+
+@pytest.fixture(autouse=True)
+def clean_registry():
+    REGISTRY.reset()
+    yield
+    REGISTRY.reset()
+
+
+def test_timed_records_span_into_trace_and_registry() -> None:
+    with trace() as spans:
+        with timed("unit.block", chart="price") as span:
+            span.rows = 42
+
+    assert [s.stage for s in spans] == ["unit.block"]
+    assert spans[0].seconds >= 0 and spans[0].rows == 42
+    labels = {"stage": "unit.block", "chart": "price"}
+    assert REGISTRY.value("cci_stage_calls_total", **labels) == 1
+    assert REGISTRY.value("cci_stage_rows_total", **labels) == 42
+
+
+def test_instrument_reports_frame_rows_bytes_and_errors() -> None:
+    @instrument("unit.build")
+    def build(size: int) -> pd.DataFrame:
+        if size < 0:
+            raise ValueError("negative")
+        return pd.DataFrame({"x": range(size)})
+
+    with trace() as spans:
+        build(10)
+        with pytest.raises(ValueError):
+            build(-1)
+
+    assert spans[0].rows == 10 and spans[0].bytes > 0
+    assert spans[1].error == "ValueError"
+    assert REGISTRY.value("cci_stage_errors_total", stage="unit.build") == 1
+    assert build.__name__ == "build"
+
+
+def test_hot_paths_are_instrumented() -> None:
+    frame = pd.DataFrame(
+        {
+            "ticker": ["CL=F"] * 3,
+            "datetime": pd.date_range("2024-01-01", periods=3, tz="UTC"),
+            "adj_close": [1.0, 2.0, 3.0],
+            "close": [1.0, 2.0, 3.0],
+        }
+    )
+    with trace() as spans:
+        compute_analytics(frame, (2,))
+
+    assert spans[-1].stage == "analytics.compute" and spans[-1].rows == 3
+
+
+def test_prometheus_text_and_file(tmp_path: Path) -> None:
+    record_cache("swr", "hit")
+    record_cache("swr", "hit")
+    record_cache("swr", "miss")
+    with timed("unit.quote"):
+        pass
+
+    text = metrics.render_prometheus()
+    assert "# TYPE cci_cache_requests_total counter" in text
+    assert 'cci_cache_requests_total{cache="swr",result="hit"} 2' in text
+    assert 'cci_stage_last_seconds{stage="unit.quote"}' in text
+
+    target = tmp_path / "textfile" / "cci.prom"
+    metrics.write_prometheus(target)
+    assert target.read_text() == text
+
+
+def test_metrics_endpoint_serves_registry() -> None:
+    record_cache("bar_store", "miss")
+    server = metrics.serve_metrics(0)
+    try:
+        port = server.server_address[1]
+        with urllib.request.urlopen(f"http://127.0.0.1:{port}/metrics") as response:
+            body = response.read().decode()
+    finally:
+        server.shutdown()
+
+    assert 'cache="bar_store",result="miss"' in body
+
+
+def test_structured_debug_log(caplog: pytest.LogCaptureFixture) -> None:
+    with caplog.at_level(logging.DEBUG, logger="src.metrics"):
+        with timed("unit.logged", rows=5):
+            pass
+
+    assert '"stage": "unit.logged"' in caplog.text
+    assert '"rows": 5' in caplog.text
@@ -0,0 +1,162 @@
+"""Tests for the async price providers and the synchronous fetch facade."""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+import time
+from collections.abc import Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_download
+from src import data
+from src.export import partition_path, to_bytes
+from src.providers import HTTPProvider, LocalFileProvider, PriceRequest
+
+START, END = pd.Timestamp("2024-01-03", tz="UTC"), pd.Timestamp("2024-01-10", tz="UTC")
+
+
+@pytest.fixture(scope="module")
+def prices() -> pd.DataFrame:
+    raw = synthetic_download(6, interval="1d", days=15, seed=8)
+    tickers = list(raw.columns.get_level_values(1).unique())
+    return data._normalise_columns(data._prepare_index(raw, tickers))
+
+
+class MockBars:
+    """Serves ``/bars`` from a tidy frame and records connections and concurrency."""
+
+    def __init__(self, prices: pd.DataFrame, delay: float = 0.05) -> None:
+        self.prices = prices
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.in_flight = self.peak = self.requests = 0
+        self.clients: set[int] = set()
+        self.fail: set[str] = set()
+
+    def respond(self, handler: BaseHTTPRequestHandler) -> None:
+        with self.lock:
+            self.in_flight += 1
+            self.peak = max(self.peak, self.in_flight)
+            self.requests += 1
+            self.clients.add(handler.client_address[1])
+        try:
+            time.sleep(self.delay)
+            query = {k: v[0] for k, v in parse_qs(urlsplit(handler.path).query).items()}
+            block = self.prices[self.prices["ticker"] == query["ticker"]]
+            if query["ticker"] in self.fail:
+                status, body = 503, b"unavailable"
+            elif block.empty:
+                status, body = 404, b""
+            else:
+                status, body = 200, to_bytes(block.drop(columns="ticker"), "csv")
+            handler.send_response(status)
+            handler.send_header("Content-Type", "text/csv")
+            handler.send_header("Content-Length", str(len(body)))
+            handler.end_headers()
+            handler.wfile.write(body)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+
+@pytest.fixture()
+def server(prices: pd.DataFrame) -> Iterator[tuple[str, MockBars]]:
+    mock = MockBars(prices)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self) -> None:  # noqa: N802 - http.server naming.
+            mock.respond(self)
+
+        def log_message(self, format: str, *args: object) -> None:  # noqa: A002
+            pass
+
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", mock
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def test_http_provider_pools_connections_and_caps_in_flight(
+    prices: pd.DataFrame, server: tuple[str, MockBars]
+) -> None:
+    url, mock = server
+    provider = HTTPProvider(url, max_per_host=2)
+    tickers = list(dict.fromkeys(prices["ticker"]))
+    requests = [PriceRequest((ticker,), "1d", START, END) for ticker in tickers]
+    requests.append(PriceRequest(("NOPE=F",), "1d", START, END))
+
+    async def run(batch: list[PriceRequest]) -> list[pd.DataFrame]:
+        return await asyncio.gather(*(provider.fetch(request) for request in batch))
+
+    results = asyncio.run(run(requests)) + asyncio.run(run(requests[:2]))
+
+    # Two event loops, one session: the second batch reuses its connections.
+    assert mock.peak == len(mock.clients) == 2
+    assert mock.requests == len(requests) + 2
+    for request, frame in zip(requests[:-1], results, strict=False):
+        block = prices[prices["ticker"] == request.tickers[0]]
+        expected = block[(block["datetime"] >= START) & (block["datetime"] < END)]
+        pd.testing.assert_frame_equal(frame, expected.reset_index(drop=True))
+    assert results[len(requests) - 1].empty
+
+
+def test_fetch_prices_facade_runs_http_provider(
+    prices: pd.DataFrame, server: tuple[str, MockBars]
+) -> None:
+    url, mock = server
+    provider = HTTPProvider(url, max_per_host=3)
+    tickers = list(dict.fromkeys(prices["ticker"]))
+    mock.fail = {tickers[-1]}
+
+    result = data.fetch_prices_report(
+        tickers, start=START, end=END, retries=1, store=None, provider=provider
+    )
+    again = data.fetch_prices(
+        tickers[:2], start=START, end=END, retries=1, provider=provider
+    )
+
+    assert list(result.prices.columns) == list(data._TIDY_COLUMNS)
+    assert result.succeeded == tuple(tickers[:-1])
+    assert "HTTP 503" in result.failures[tickers[-1]].reason
+    assert set(again["ticker"]) == set(tickers[:2])
+    # Both calls shared the session, so the second reused pooled connections.
+    assert mock.peak <= 3 and len(mock.clients) <= 3
+    with pytest.raises(data.DataDownloadError):
+        data.fetch_prices(
+            ["NOPE=F"], start=START, end=END, retries=1, provider=provider
+        )
+
+
+def test_local_file_provider_reads_export_layout(
+    prices: pd.DataFrame, tmp_path: Path
+) -> None:
+    tickers = list(dict.fromkeys(prices["ticker"]))
+    for ticker, fmt in zip(tickers[:2], ("parquet", "csv"), strict=True):
+        path = partition_path(tmp_path, "1d", ticker, fmt)
+        path.parent.mkdir(parents=True)
+        block = prices[prices["ticker"] == ticker].assign(ma_5=1.0)
+        path.write_bytes(to_bytes(block.rename(columns={"datetime": "Date"}), fmt))
+
+    provider = LocalFileProvider(tmp_path)
+    result = data.fetch_prices_report(
+        tickers[:3], start=START, end=END, retries=1, store=None, provider=provider
+    )
+
+    expected = prices[
+        prices["ticker"].isin(tickers[:2])
+        & (prices["datetime"] >= START)
+        & (prices["datetime"] < END)
+    ]
+    pd.testing.assert_frame_equal(result.prices, expected.reset_index(drop=True))
+    assert set(result.failures) == {tickers[2]}
@@ -0,0 +1,161 @@
+"""Tests for locally derived bar resolutions."""
+
+from __future__ import annotations
+
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_download
+from src import data, frames
+from src.pyramid import (
+    BarPyramid,
+    derives_from,
+    fetch_interval,
+    interval_delta,
+    resample_bars,
+)
+
+
+@pytest.fixture(scope="module")
+def bars() -> pd.DataFrame:
+    raw = synthetic_download(3, interval="5m", days=10, seed=11)
+    tickers = list(raw.columns.get_level_values(1).unique())
+    return data._normalise_columns(data._prepare_index(raw, tickers))
+
+
+def _pandas_resample(frame: pd.DataFrame, rule: str) -> pd.DataFrame:
+    blocks = []
+    for ticker, block in frame.dropna(subset=["close"]).groupby("ticker"):
+        agg = (
+            block.set_index("datetime")
+            .resample(rule, label="left", closed="left")
+            .agg(
+                {
+                    "open": "first",
+                    "high": "max",
+                    "low": "min",
+                    "close": "last",
+                    "adj_close": "last",
+                    "volume": "sum",
+                }
+            )
+            .dropna(subset=["close"])
+        )
+        blocks.append(agg.reset_index().assign(ticker=ticker))
+    expected = pd.concat(blocks, ignore_index=True)
+    return expected[["ticker", "datetime", *expected.columns[1:-1]]]
+
+
+@pytest.mark.parametrize(
+    ("interval", "rule"),
+    [("15m", "15min"), ("1h", "1h"), ("4h", "4h"), ("1d", "1D"), ("1w", "W-MON")],
+)
+def test_resample_matches_pandas_ohlcv_semantics(
+    bars: pd.DataFrame, interval: str, rule: str
+) -> None:
+    gappy = bars.copy()
+    gappy.loc[gappy.index[5:40], ["open", "high", "low", "close", "adj_close"]] = np.nan
+    gappy.loc[gappy.index[50:55], "volume"] = np.nan
+    shuffled = gappy.sample(frac=1.0, random_state=1)
+
+    result = resample_bars(shuffled, interval)
+
+    if rule == "W-MON":
+        # pandas anchors W-MON bins on their right edge; shift to left labels.
+        expected = _pandas_resample(
+            gappy.assign(datetime=gappy["datetime"] + pd.Timedelta(days=7)), rule
+        ).assign(datetime=lambda frame: frame["datetime"] - pd.Timedelta(days=7))
+    else:
+        expected = _pandas_resample(gappy, rule)
+    pd.testing.assert_frame_equal(result, expected, check_dtype=False)
+    assert frames.is_marked_sorted(result)
+    assert result["volume"].dtype == np.int64
+    if interval == "1w":
+        assert (result["datetime"].dt.dayofweek == 0).all()
+
+
+def test_interval_arithmetic() -> None:
+    assert interval_delta("4h") == pd.Timedelta(hours=4)
+    assert derives_from("5m", "15m") and derives_from("1d", "1w")
+    assert not derives_from("1h", "90m") and not derives_from("1d", "1h")
+    assert fetch_interval("4h") == "1h"
+    assert fetch_interval("1w") == "1d"
+    assert fetch_interval("15m") == "15m"
+    with pytest.raises(ValueError):
+        interval_delta("1mo")
+
+
+def test_pyramid_serves_coarser_intervals_from_held_resolution(
+    bars: pd.DataFrame,
+) -> None:
+    loads: list[str] = []
+
+    def loader(tickers, start, end, interval):
+        loads.append(interval)
+        return bars
+
+    pyramid = BarPyramid()
+    window = (("A", "B"), "2024-01-01", "2024-01-10")
+
+    assert pyramid.get(*window, "5m", loader) is bars
+    hourly = pyramid.get(*window, "1h", loader)
+    assert pyramid.get(*window, "1h", loader) is hourly
+    pyramid.get(*window, "1w", loader)
+    pyramid.get(("A",), "2024-01-01", "2024-01-10", "4h", loader)
+
+    # Weekly bars come from daily downloads: UTC-midnight days are not sessions.
+    assert loads == ["5m", "5m", "5m", "1d", "1h"]
+    pd.testing.assert_frame_equal(hourly, resample_bars(bars, "1h"))
+
+
+def test_pyramid_derives_only_from_sources_reaching_the_window_start(
+    bars: pd.DataFrame,
+) -> None:
+    loads: list[str] = []
+
+    def loader(tickers, start, end, interval):
+        loads.append(interval)
+        return bars
+
+    pyramid = BarPyramid(derive_daily=True)
+    # Intraday history starts 2024-01-01, well after this window's start.
+    early = (("A", "B"), "2023-06-01", "2024-01-10")
+    pyramid.get(*early, "5m", loader)
+    pyramid.get(*early, "1h", loader)
+    pyramid.get(*early, "1d", loader)
+    window = (("A", "B"), "2024-01-01", "2024-01-10")
+    pyramid.get(*window, "5m", loader)
+    daily = pyramid.get(*window, "1d", loader)
+
+    assert loads == ["5m", "1h", "1d", "5m", "5m"]  # Loads hit the caller cache.
+    pd.testing.assert_frame_equal(daily, resample_bars(bars, "1d"))
+
+
+def test_app_switches_interval_without_new_download(
+    bars: pd.DataFrame, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import app
+
+    calls: list[str] = []
+
+    def fake_fetch(tickers, start, end, interval):
+        calls.append(interval)
+        return bars
+
+    monkeypatch.setattr(app, "fetch_prices", fake_fetch)
+    # ``st.cache_resource`` does not memoise outside a Streamlit runtime.
+    pyramid, cache = BarPyramid(), app.StaleWhileRevalidateCache(ttl=60)
+    monkeypatch.setattr(app, "_bar_pyramid", lambda: pyramid)
+    monkeypatch.setattr(app, "_price_cache", lambda: cache)
+    start = dt.datetime(2024, 1, 1, tzinfo=dt.UTC)
+    end = dt.datetime(2024, 1, 10, tzinfo=dt.UTC)
+
+    app.load_price_data(("X",), start, end, "5m")
+    hourly = app.load_price_data(("X",), start, end, "1h")
+    app.load_price_data(("X",), start, end, "4h")
+
+    assert calls == ["5m"]
+    assert len(hourly) < len(bars)
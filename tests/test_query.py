@@ -0,0 +1,89 @@
+"""Tests for indexed price queries."""
+
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_download
+from src import data, frames
+from src.analytics import compute_analytics
+from src.query import IndexedPrices
+
+
+@pytest.fixture(scope="module")
+def prices() -> pd.DataFrame:
+    raw = synthetic_download(4, interval="1h", days=20, seed=4)
+    tickers = list(raw.columns.get_level_values(1).unique())
+    return data._normalise_columns(data._prepare_index(raw, tickers))
+
+
+def test_latest_matches_groupby_and_slices_single_tickers(
+    prices: pd.DataFrame,
+) -> None:
+    shuffled = prices.sample(frac=1.0, random_state=3)
+    indexed = IndexedPrices(shuffled)
+
+    expected = (
+        prices.sort_values("datetime", ascending=False)
+        .groupby("ticker", group_keys=False)
+        .head(5)
+        .sort_values(["ticker", "datetime"], ascending=[True, False])
+    )
+    pd.testing.assert_frame_equal(
+        indexed.latest(5, newest_first=True).reset_index(drop=True),
+        expected.reset_index(drop=True),
+    )
+    last = indexed.latest(1).set_index("ticker")["close"]
+    pd.testing.assert_series_equal(
+        last, prices.groupby("ticker")["close"].last(), check_names=False
+    )
+
+    ticker = indexed.tickers[2]
+    window = indexed.latest(3, tickers=[ticker])
+    assert np.shares_memory(
+        window["close"].to_numpy(), indexed.frame["close"].to_numpy()
+    )
+
+
+def test_range_and_as_of(prices: pd.DataFrame) -> None:
+    indexed = IndexedPrices(prices)
+    ticker = indexed.tickers[0]
+    start, end = "2024-01-05", pd.Timestamp("2024-01-09 15:30", tz="UTC")
+
+    window = indexed.range(ticker, start, end)
+
+    block = prices[prices["ticker"] == ticker]
+    mask = (block["datetime"] >= pd.Timestamp(start, tz="UTC")) & (
+        block["datetime"] <= end
+    )
+    pd.testing.assert_frame_equal(window, block.loc[mask])
+
+    moment = pd.Timestamp("2024-01-10 10:45", tz="UTC")
+    snapshot = indexed.as_of(moment)
+    expected = prices[prices["datetime"] <= moment].groupby("ticker").tail(1)
+    pd.testing.assert_frame_equal(
+        snapshot.reset_index(drop=True), expected.reset_index(drop=True)
+    )
+    assert indexed.as_of("2000-01-01").empty
+    with pytest.raises(KeyError):
+        indexed.range("NOPE=F")
+
+
+def test_aligned_returns_share_offsets_and_categoricals(
+    prices: pd.DataFrame,
+) -> None:
+    compact = frames.compact_prices(prices)
+    result = compute_analytics(compact)
+    indexed = IndexedPrices(result.enriched)
+    returns = indexed.aligned(result.returns)
+
+    tail = returns.latest(2)
+    assert list(tail.columns) == ["ticker", "datetime", "daily_return"]
+    assert len(tail) == 2 * len(indexed.tickers)
+    assert [ticker for ticker, _ in indexed.blocks()] == sorted(
+        prices["ticker"].unique()
+    )
+    with pytest.raises(ValueError):
+        indexed.aligned(result.returns.iloc[:-1])
@@ -0,0 +1,278 @@
+"""Tests for the upstream circuit breaker and rate limiter."""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any
+
+import pandas as pd
+import pytest
+import requests
+from yfinance.exceptions import YFPricesMissingError
+
+from src import data
+from src.metrics import REGISTRY
+from src.providers import PriceRequest, empty_prices
+from src.resilience import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitOpenError,
+    GuardedProvider,
+    TokenBucket,
+)
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 100.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class FakeSleep:
+    """Records requested waits without sleeping or moving the clock."""
+
+    def __init__(self) -> None:
+        self.waits: list[float] = []
+
+    async def __call__(self, seconds: float) -> None:
+        self.waits.append(seconds)
+
+
+class FakeProvider:
+    name = "fake"
+
+    def __init__(self, fail: bool = False) -> None:
+        self.fail = fail
+        self.calls = 0
+
+    async def fetch(self, request: PriceRequest, timeout: float | None = None):
+        self.calls += 1
+        if self.fail:
+            raise ConnectionError("upstream down")
+        return empty_prices()
+
+
+def _transitions(source: str, state: str) -> float | None:
+    return REGISTRY.value("cci_circuit_transitions_total", source=source, state=state)
+
+
+def test_breaker_opens_probes_once_and_closes() -> None:
+    clock = FakeClock()
+    breaker = CircuitBreaker(3, reset_timeout=10, clock=clock, name="t-breaker")
+
+    for _ in range(2):
+        breaker.before_call()
+        assert not breaker.record_failure()
+    breaker.before_call()
+    breaker.record_success()  # A success resets the consecutive count.
+    for _ in range(3):
+        breaker.before_call()
+        breaker.record_failure()
+
+    assert breaker.state == OPEN
+    clock.now += 4
+    with pytest.raises(CircuitOpenError) as rejected:
+        breaker.before_call()
+    assert rejected.value.retry_after == pytest.approx(6)
+
+    clock.now += 6
+    breaker.before_call()  # The single half-open probe.
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    assert breaker.record_failure()  # A failed probe re-opens at once.
+    assert breaker.state == OPEN
+
+    clock.now += 10
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CLOSED
+    assert REGISTRY.value("cci_circuit_state", source="t-breaker") == 0
+    assert _transitions("t-breaker", OPEN) == 2
+    assert _transitions("t-breaker", HALF_OPEN) == 2
+    assert _transitions("t-breaker", CLOSED) == 1
+    assert REGISTRY.value("cci_circuit_rejections_total", source="t-breaker") == 2
+
+
+def test_token_bucket_spaces_requests_and_skips_rejected_ones() -> None:
+    clock, sleep = FakeClock(), FakeSleep()
+    bucket = TokenBucket(rate=2, burst=2, clock=clock, sleep=sleep, name="t-bucket")
+
+    assert [bucket.reserve() for _ in range(4)] == [0, 0, 0.5, 1.0]
+    clock.now += 10  # Refills are capped at the burst size.
+    assert [bucket.reserve() for _ in range(3)] == [0, 0, 0.5]
+    assert REGISTRY.value("cci_rate_limit_delayed_total", source="t-bucket") == 3
+
+    clock.now += 10
+    provider = FakeProvider()
+    limiter = TokenBucket(rate=1, burst=1, clock=clock, sleep=sleep, name="t-guard")
+    guarded = GuardedProvider(
+        provider, CircuitBreaker(1, 30, clock=clock, name="t-guard"), limiter
+    )
+    sleep.waits.clear()
+    requests = [PriceRequest((f"T{i}",), "1d") for i in range(3)]
+
+    async def run(batch: list[PriceRequest]) -> list:
+        return await asyncio.gather(
+            *(guarded.fetch(request) for request in batch), return_exceptions=True
+        )
+
+    asyncio.run(run(requests))
+
+    assert provider.calls == 3 and sleep.waits == [1.0, 2.0]
+    provider.fail = True
+    failed = asyncio.run(run(requests[:1]))
+    assert isinstance(failed[0], CircuitOpenError)
+    rejected = asyncio.run(run(requests))
+    assert all(isinstance(error, CircuitOpenError) for error in rejected)
+    assert provider.calls == 4
+    # Only the four admitted requests took tokens: the next one waits for 4s.
+    assert limiter.reserve() == pytest.approx(4.0)
+
+
+class Downloader:
+    """Fake ``yfinance.download`` that fails until ``healthy`` is set."""
+
+    def __init__(self) -> None:
+        self.healthy = False
+        self.calls: list[str] = []
+
+    def __call__(self, *args: Any, **kwargs: Any) -> pd.DataFrame:
+        self.calls.append(kwargs["tickers"])
+        if not self.healthy:
+            raise ConnectionError("Yahoo is down")
+        dates = pd.date_range("2024-01-01", periods=3, freq="D")
+        columns = pd.MultiIndex.from_product(
+            [[kwargs["tickers"]], ["Open", "High", "Low", "Close", "Adj Close"]]
+        )
+        frame = pd.DataFrame(70.0, index=dates, columns=columns)
+        frame[(kwargs["tickers"], "Volume")] = 1000
+        return frame
+
+
+async def _no_sleep(_: float) -> None:
+    return None
+
+
+def test_open_circuit_fails_fast_without_retrying(
+    monkeypatch: pytest.MonkeyPatch,
+    yahoo,
+) -> None:
+    clock, downloader = FakeClock(), Downloader()
+    yahoo(downloader)
+    monkeypatch.setattr(data, "_sleep", _no_sleep)
+    breaker = CircuitBreaker(2, reset_timeout=10, clock=clock, name="t-fetch")
+    provider = GuardedProvider(data.YFinanceProvider(), breaker)
+    window: dict[str, Any] = {"start": "2024-01-01", "end": "2024-01-04"}
+
+    first = data.fetch_prices_report(
+        ["CL=F"], retries=3, store=None, provider=provider, **window
+    )
+
+    assert downloader.calls == ["CL=F", "CL=F"]  # The trip stops the third attempt.
+    assert "paused" in first.failures["CL=F"].reason
+    with pytest.raises(data.DataDownloadError, match="paused"):
+        data.fetch_prices(["CL=F", "BZ=F"], retries=3, provider=provider, **window)
+    assert len(downloader.calls) == 2
+
+    clock.now += 10
+    downloader.healthy = True
+    prices = data.fetch_prices(["CL=F"], retries=3, provider=provider, **window)
+
+    assert len(prices) == 3 and breaker.state == CLOSED
+    assert REGISTRY.value("cci_circuit_rejections_total", source="t-fetch") == 2
+
+
+class SlowProvider:
+    name = "slow"
+
+    async def fetch(self, request: PriceRequest, timeout: float | None = None):
+        await asyncio.wait_for(asyncio.sleep(10), timeout)
+        return empty_prices()
+
+
+def test_cancelled_requests_are_not_counted_as_failures() -> None:
+    breaker = CircuitBreaker(1, reset_timeout=10, clock=FakeClock(), name="t-cancel")
+    guarded = GuardedProvider(SlowProvider(), breaker)
+    request = PriceRequest(("CL=F",), "1d")
+
+    async def abandon() -> None:
+        task = asyncio.create_task(guarded.fetch(request))
+        await asyncio.sleep(0.01)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(abandon())
+    assert breaker.state == CLOSED
+    assert REGISTRY.value("cci_circuit_consecutive_failures", source="t-cancel") == 0
+
+    with pytest.raises(CircuitOpenError):  # A timeout is the source's failure.
+        asyncio.run(guarded.fetch(request, timeout=0.01))
+    assert breaker.state == OPEN
+
+
+class ErrorProvider:
+    name = "error"
+
+    def __init__(self, error: Exception) -> None:
+        self.error = error
+
+    async def fetch(self, request: PriceRequest, timeout: float | None = None):
+        raise self.error
+
+
+def test_data_errors_are_not_counted_as_failures() -> None:
+    breaker = CircuitBreaker(2, reset_timeout=10, clock=FakeClock(), name="t-data")
+    request = PriceRequest(("NOPE=F",), "1d")
+    missing = GuardedProvider(
+        ErrorProvider(YFPricesMissingError("NOPE=F", "no price data found")), breaker
+    )
+
+    for _ in range(5):
+        with pytest.raises(YFPricesMissingError):
+            asyncio.run(missing.fetch(request))
+    assert breaker.state == CLOSED
+    assert REGISTRY.value("cci_circuit_consecutive_failures", source="t-data") == 0
+
+    def http_error(status: int) -> GuardedProvider:
+        response = requests.Response()
+        response.status_code = status
+        error = requests.HTTPError(f"HTTP {status}", response=response)
+        return GuardedProvider(ErrorProvider(error), breaker)
+
+    for status, failures in ((400, 0), (429, 1)):
+        with pytest.raises(requests.HTTPError):
+            asyncio.run(http_error(status).fetch(request))
+        assert (
+            REGISTRY.value("cci_circuit_consecutive_failures", source="t-data")
+            == failures
+        )
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(http_error(503).fetch(request))
+    assert breaker.state == OPEN
+
+
+def test_retry_delays_double_with_full_jitter(monkeypatch: pytest.MonkeyPatch) -> None:
+    sleep, bounds = FakeSleep(), []
+
+    def uniform(low: float, high: float) -> float:
+        bounds.append((low, high))
+        return high / 2
+
+    monkeypatch.setattr(data, "_sleep", sleep)
+    monkeypatch.setattr(data.random, "uniform", uniform)
+    provider = FakeProvider(fail=True)
+
+    with pytest.raises(data.DataDownloadError):
+        asyncio.run(
+            data._download(provider, PriceRequest(("CL=F",), "1d"), 4, backoff=1.5)
+        )
+
+    assert provider.calls == 4
+    assert bounds[:3] == [(0, 1.5), (0, 3.0), (0, 6.0)]
+    assert sleep.waits == [0.75, 1.5, 3.0]
@@ -0,0 +1,138 @@
+"""Tests for the cross-process Arrow price cache."""
+
+from __future__ import annotations
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.synthetic import synthetic_download
+from src import data, frames
+from src.analytics import compute_analytics
+from src.pyramid import resample_bars
+from src.sharedcache import SharedFrameCache
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(scope="module")
+def prices() -> pd.DataFrame:
+    raw = synthetic_download(3, interval="5m", days=5, seed=5)
+    tickers = list(raw.columns.get_level_values(1).unique())
+    tidy = data._normalise_columns(data._prepare_index(raw, tickers))
+    tidy.loc[tidy.index[10:20], ["open", "high", "low", "close", "adj_close"]] = np.nan
+    return tidy
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 1_000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_round_trip_is_read_only_and_zero_copy(
+    prices: pd.DataFrame, tmp_path: Path
+) -> None:
+    clock = FakeClock()
+    cache = SharedFrameCache(tmp_path, ttl=60, clock=clock)
+    loads: list[int] = []
+
+    def loader() -> pd.DataFrame:
+        loads.append(1)
+        return prices
+
+    first = cache.get(("CL=F",), loader)
+    second = cache.get(("CL=F",), loader)
+
+    assert loads == [1]
+    pd.testing.assert_frame_equal(second, prices)
+    assert frames.is_marked_sorted(second)
+    for column in ("datetime", "close", "volume"):
+        values = second[column].values
+        assert not values.flags.writeable and not values.flags.owndata
+    assert np.isnan(first["close"].iloc[10])
+
+    clock.now += 61
+    cache.get(("CL=F",), loader)
+    assert loads == [1, 1]
+
+
+def test_mapped_frames_feed_the_analytics_pipeline(
+    prices: pd.DataFrame, tmp_path: Path
+) -> None:
+    cache = SharedFrameCache(tmp_path, ttl=60)
+    mapped = cache.get("window", lambda: prices)
+
+    pd.testing.assert_frame_equal(
+        compute_analytics(mapped, (5, 20)).enriched,
+        compute_analytics(prices, (5, 20)).enriched,
+    )
+    pd.testing.assert_frame_equal(
+        resample_bars(mapped, "1h"), resample_bars(prices, "1h")
+    )
+
+
+_WORKER = """
+import json, sys, time
+import pandas as pd
+from src.sharedcache import SharedFrameCache
+
+root, log = sys.argv[1], sys.argv[2]
+
+def loader():
+    with open(log, "a") as handle:
+        handle.write("fetch\\n")
+    time.sleep(0.3)
+    return pd.DataFrame({"ticker": ["CL=F"] * 3, "close": [1.0, 2.0, 3.0]})
+
+frame = SharedFrameCache(root, ttl=60).get(("CL=F", "1d"), loader)
+print(json.dumps(frame["close"].tolist()))
+"""
+
+
+def test_one_process_downloads_each_key(tmp_path: Path) -> None:
+    log = tmp_path / "fetches.log"
+    workers = [
+        subprocess.Popen(  # noqa: S603 - fixed interpreter and arguments.
+            [sys.executable, "-c", _WORKER, str(tmp_path / "cache"), str(log)],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            text=True,
+        )
+        for _ in range(4)
+    ]
+    outputs = [worker.communicate(timeout=60)[0] for worker in workers]
+
+    assert all(worker.returncode == 0 for worker in workers)
+    assert [json.loads(output) for output in outputs] == [[1.0, 2.0, 3.0]] * 4
+    assert log.read_text().splitlines() == ["fetch"]
+
+
+def test_app_loader_reads_through_shared_cache(
+    prices: pd.DataFrame, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    import app
+
+    calls: list[str] = []
+
+    def fake_fetch(tickers, start, end, interval):
+        calls.append(interval)
+        return prices
+
+    shared = SharedFrameCache(tmp_path, ttl=60)
+    monkeypatch.setattr(app, "fetch_prices", fake_fetch)
+    monkeypatch.setattr(app, "_shared_cache", lambda: shared)
+    start, end = pd.Timestamp("2024-01-01", tz="UTC"), pd.Timestamp("2024-01-06")
+
+    app._load_price_data_uncached(("X",), start, end, "5m")
+    served = app._load_price_data_uncached(("X",), start, end, "5m")
+
+    assert calls == ["5m"]
+    assert not served["close"].values.flags.writeable
@@ -3,6 +3,8 @@
 from __future__ import annotations
 
 import datetime as dt
+import logging
+from types import SimpleNamespace
 
 import pandas as pd
 import pytest
@@ -34,10 +36,29 @@ def test_cached_loader(monkeypatch: pytest.MonkeyPatch) -> None:
         return sample
 
     monkeypatch.setattr(app, "fetch_prices", fake_fetch)
-    app.load_price_data.clear()
+    app._price_cache().clear()
 
     start = dt.datetime(2024, 1, 1, tzinfo=dt.UTC)
     end = dt.datetime(2024, 1, 2, tzinfo=dt.UTC)
     result = app.load_price_data(("CL=F",), start, end, "1d")
 
     pd.testing.assert_frame_equal(result, sample)
+
+
+def test_metrics_server_tolerates_a_taken_port(
+    monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+    import app
+
+    def taken(port: int):
+        raise OSError(98, "Address already in use")
+
+    monkeypatch.setattr(app, "get_settings", lambda: SimpleNamespace(metrics_port=9464))
+    monkeypatch.setattr(app, "serve_metrics", taken)
+    app._metrics_server.clear()
+
+    with caplog.at_level(logging.WARNING, logger="app"):
+        assert app._metrics_server() is None
+    app._metrics_server.clear()
+
+    assert "Not serving /metrics on port 9464" in caplog.text
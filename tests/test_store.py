@@ -0,0 +1,95 @@
+"""Tests for the on-disk bar store."""
+
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from src.store import BarStore
+
+
+def _bars(days: list[str]) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "ticker": "CL=F",
+            "datetime": pd.to_datetime(days, utc=True),
+            "open": 70.0,
+            "high": 71.0,
+            "low": 69.0,
+            "close": 70.5,
+            "adj_close": 70.5,
+            "volume": 1000,
+        }
+    )
+
+
+def test_missing_reports_gaps_around_coverage(tmp_path) -> None:
+    store = BarStore(tmp_path)
+    store.write("CL=F", "1d", _bars(["2024-01-03"]), "2024-01-03", "2024-01-05")
+
+    gaps = store.missing("CL=F", "1d", "2024-01-01", "2024-01-08")
+
+    assert gaps == [
+        (pd.Timestamp("2024-01-01", tz="UTC"), pd.Timestamp("2024-01-03", tz="UTC")),
+        (pd.Timestamp("2024-01-05", tz="UTC"), pd.Timestamp("2024-01-08", tz="UTC")),
+    ]
+
+
+def test_write_merges_coverage_and_upserts_bars(tmp_path) -> None:
+    store = BarStore(tmp_path)
+    store.write(
+        "CL=F", "1d", _bars(["2024-01-01", "2024-01-02"]), "2024-01-01", "2024-01-03"
+    )
+    updated = _bars(["2024-01-02", "2024-01-03"]).assign(close=99.0)
+    store.write("CL=F", "1d", updated, "2024-01-02", "2024-01-04")
+
+    assert store.coverage("CL=F", "1d") == [
+        (pd.Timestamp("2024-01-01", tz="UTC"), pd.Timestamp("2024-01-04", tz="UTC"))
+    ]
+    stored = store.read("CL=F", "1d")
+    assert stored["close"].tolist() == [70.5, 99.0, 99.0]
+    assert store.missing("CL=F", "1d", "2024-01-01", "2024-01-04") == []
+
+
+def test_concurrent_writers_keep_every_bar(tmp_path) -> None:
+    days = [str(day.date()) for day in pd.date_range("2024-01-01", periods=16)]
+    stores = [BarStore(tmp_path) for _ in days]
+
+    def write(index: int) -> None:
+        day = pd.Timestamp(days[index], tz="UTC")
+        stores[index].write(
+            "CL=F", "1d", _bars([days[index]]), day, day + pd.Timedelta(days=1)
+        )
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(write, range(len(days))))
+
+    store = BarStore(tmp_path)
+    assert len(store.read("CL=F", "1d")) == len(days)
+    assert store.missing("CL=F", "1d", days[0], "2024-01-17") == []
+
+
+def test_empty_window_is_recorded_as_held(tmp_path) -> None:
+    store = BarStore(tmp_path)
+    store.write("CL=F", "1d", _bars([]), "2024-01-06", "2024-01-08")
+
+    assert store.read("CL=F", "1d").empty
+    assert store.missing("CL=F", "1d", "2024-01-06", "2024-01-08") == []
+
+
+def test_recent_forming_tail_counts_as_held_within_max_age(tmp_path) -> None:
+    store = BarStore(tmp_path)
+    bars = _bars(["2024-01-07", "2024-01-08"])
+    store.write(
+        "CL=F", "1d", bars, "2024-01-07", "2024-01-08", tail_until="2024-01-08 12:00"
+    )
+    age = pd.Timedelta(minutes=5)
+    tail = (pd.Timestamp("2024-01-08", tz="UTC"), pd.Timestamp("2024-01-08 12:10Z"))
+
+    assert store.missing("CL=F", "1d", "2024-01-07", "2024-01-08 12:04", age) == []
+    assert store.missing("CL=F", "1d", "2024-01-07", tail[1], age) == [tail]
+    assert store.missing("CL=F", "1d", "2024-01-07", "2024-01-08 12:04") != []
+    # A later historical write leaves the recorded tail alone.
+    store.write("CL=F", "1d", _bars([]), "2024-01-01", "2024-01-03")
+    assert store.tail_until("CL=F", "1d") == pd.Timestamp("2024-01-08 12:00Z")
@@ -0,0 +1,145 @@
+"""Tests for streaming ingestion and bar aggregation."""
+
+from __future__ import annotations
+
+import json
+import time
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src.stream import BarRing, PriceEvent, QueueSource, ReplaySource, StreamIngestor
+
+T0 = pd.Timestamp("2024-03-01 14:00", tz="UTC")
+
+
+def _event(minutes: float, price: float, volume: float = 1.0, ticker: str = "CL=F"):
+    return PriceEvent(ticker, T0 + pd.Timedelta(minutes=minutes), price, volume)
+
+
+def test_ingestor_aggregates_ohlcv_per_interval() -> None:
+    ingestor = StreamIngestor(QueueSource(), intervals=("5m", "1h"))
+    ingestor.ingest(
+        [
+            _event(0, 80.0),
+            _event(1, 81.5, 2.0),
+            _event(3, 79.0),
+            _event(4.9, 80.5),
+            _event(6, 82.0, 3.0),
+        ]
+    )
+
+    bars = ingestor.frame(["CL=F"], "5m")
+    assert bars["datetime"].tolist() == [T0, T0 + pd.Timedelta(minutes=5)]
+    first = bars.iloc[0]
+    assert (first.open, first.high, first.low, first.close) == (80.0, 81.5, 79.0, 80.5)
+    assert first.volume == 5.0
+    assert bars.iloc[1].close == bars.iloc[1].adj_close == 82.0
+
+    hourly = ingestor.frame(["CL=F"], "1h")
+    assert len(hourly) == 1
+    assert hourly.iloc[0].high == 82.0 and hourly.iloc[0].volume == 8.0
+
+
+def test_ring_keeps_latest_bars_and_handles_late_events() -> None:
+    ring = BarRing("5m", capacity=3)
+    for step in range(5):
+        ring.update((T0 + pd.Timedelta(minutes=5 * step)).value, 100.0 + step, 1.0)
+
+    frame = ring.to_frame("GC=F")
+    assert len(ring) == 3
+    assert frame["close"].tolist() == [102.0, 103.0, 104.0]
+
+    ring.update((T0 + pd.Timedelta(minutes=11)).value, 150.0, 1.0)
+    ring.update((T0 + pd.Timedelta(minutes=10.5)).value, 90.0, 1.0)
+    ring.update(T0.value, 1.0, 1.0)
+    frame = ring.to_frame("GC=F")
+    assert (frame.loc[0, "high"], frame.loc[0, "low"]) == (150.0, 90.0)
+    # The 11m print is the newest in its bar even though it arrived late.
+    assert frame.loc[0, "close"] == 150.0
+    assert ring.dropped == 1
+
+
+def test_ring_close_ignores_older_events_in_the_bucket() -> None:
+    ring = BarRing("5m", capacity=2)
+    for minutes, price in ((0, 80.0), (4, 81.0), (2, 79.5), (4, 81.2), (3, 80.1)):
+        ring.update((T0 + pd.Timedelta(minutes=minutes)).value, price, 1.0)
+
+    bar = ring.to_frame("CL=F").iloc[0]
+    assert (bar.high, bar.low, bar.close, bar.volume) == (81.2, 79.5, 81.2, 5.0)
+
+
+def test_frame_filters_tickers_and_range() -> None:
+    ingestor = StreamIngestor(QueueSource(), intervals=("5m",))
+    ingestor.ingest(
+        [_event(m, 80.0 + m, ticker=t) for m in (0, 5, 10) for t in ("CL=F", "BZ=F")]
+    )
+
+    frame = ingestor.frame(
+        ["CL=F", "BZ=F", "NG=F"], "5m", start=T0, end=T0 + pd.Timedelta(minutes=5)
+    )
+    assert frame["ticker"].tolist() == ["BZ=F", "BZ=F", "CL=F", "CL=F"]
+    assert ingestor.tickers == ["BZ=F", "CL=F"]
+    with pytest.raises(ValueError):
+        ingestor.frame(["CL=F"], "1d")
+
+
+def test_replay_source_feeds_background_ingestion(tmp_path: Path) -> None:
+    capture = tmp_path / "ticks.jsonl"
+    capture.write_text(
+        "\n".join(
+            json.dumps(
+                {
+                    "ticker": "NG=F",
+                    "timestamp": (T0 + pd.Timedelta(minutes=m)).isoformat(),
+                    "price": 2.5 + m / 100,
+                    "volume": 10,
+                }
+            )
+            for m in range(0, 30, 2)
+        )
+    )
+    ingestor = StreamIngestor(ReplaySource(capture))
+    ingestor.start(poll_timeout=0.01)
+    try:
+        deadline = time.monotonic() + 2
+        while len(ingestor.frame(["NG=F"], "5m")) < 6 and time.monotonic() < deadline:
+            time.sleep(0.01)
+    finally:
+        ingestor.stop()
+
+    bars = ingestor.frame(["NG=F"], "5m")
+    assert len(bars) == 6
+    assert bars["volume"].sum() == 150
+    assert ingestor.frame(["NG=F"], "1d").iloc[0].close == pytest.approx(2.78)
+
+
+def test_replay_source_skips_corrupt_lines(tmp_path: Path) -> None:
+    capture = tmp_path / "ticks.jsonl"
+    records = [
+        {"ticker": "CL=F", "timestamp": T0.isoformat(), "price": 80.0},
+        {"ticker": "CL=F", "timestamp": "2024-03-01T15:00:30Z", "price": 80.5},
+        {"ticker": "CL=F", "timestamp": (T0 + pd.Timedelta(minutes=1)).isoformat()},
+        {"ticker": "CL=F", "timestamp": T0.isoformat(), "price": 81.0},
+    ]
+    lines = [json.dumps(record) for record in records]
+    lines.insert(2, '{"ticker": "CL=F", "timestamp": ')
+    capture.write_text("\n".join(lines))
+    source = ReplaySource(capture)
+
+    events = source.poll(max_events=10, timeout=0)
+
+    assert [event.price for event in events] == [80.0, 80.5, 81.0]
+    assert source.skipped == 2 and source.exhausted
+    source.close()
+
+
+def test_queue_source_drains_up_to_limit() -> None:
+    source = QueueSource()
+    for minute in range(5):
+        source.publish(_event(minute, 80.0))
+
+    assert len(source.poll(max_events=3, timeout=0)) == 3
+    assert len(source.poll(max_events=10, timeout=0)) == 2
+    assert source.poll(max_events=10, timeout=0) == []
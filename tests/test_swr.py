@@ -0,0 +1,136 @@
+"""Tests for the stale-while-revalidate cache."""
+
+from __future__ import annotations
+
+import threading
+import time
+
+import pytest
+
+from src.swr import StaleWhileRevalidateCache
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _wait_for(predicate, timeout: float = 2.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            raise AssertionError("condition not met in time")
+        time.sleep(0.005)
+
+
+def test_serves_stale_value_while_refreshing_once() -> None:
+    clock = FakeClock()
+    cache = StaleWhileRevalidateCache(ttl=60, max_stale=600, clock=clock)
+    release = threading.Event()
+    calls = []
+
+    def loader() -> str:
+        calls.append(clock.now)
+        if len(calls) > 1:
+            release.wait(2)
+        return f"v{len(calls)}"
+
+    assert cache.get("k", loader).value == "v1"
+    clock.now = 90
+    first = cache.get("k", loader)
+    second = cache.get("k", loader)
+
+    assert (first.value, first.stale, first.age) == ("v1", True, 90)
+    assert second.value == "v1"
+    release.set()
+    _wait_for(lambda: not cache.get("k", loader).stale)
+    assert cache.get("k", loader).value == "v2"
+    assert len(calls) == 2
+
+
+def test_failed_refresh_keeps_last_good_value() -> None:
+    clock = FakeClock()
+    cache = StaleWhileRevalidateCache(ttl=60, max_stale=600, clock=clock)
+    cache.get("k", lambda: "good")
+    clock.now = 120
+
+    def broken() -> str:
+        raise ConnectionError("yahoo down")
+
+    cache.get("k", broken)
+    _wait_for(lambda: cache.get("k", broken).refresh_error is not None)
+
+    served = cache.get("k", broken)
+    assert served.value == "good"
+    assert served.stale
+    assert isinstance(served.refresh_error, ConnectionError)
+
+
+def test_failed_refresh_backs_off_before_retrying() -> None:
+    clock = FakeClock()
+    cache = StaleWhileRevalidateCache(ttl=60, max_stale=600, clock=clock)
+    cache.get("k", lambda: "good")
+    calls = []
+
+    def broken() -> str:
+        calls.append(clock.now)
+        raise ConnectionError("yahoo down")
+
+    clock.now = 120
+    cache.get("k", broken)
+    _wait_for(lambda: cache.get("k", broken).refresh_error is not None)
+    for now in (130, 150, 179):
+        clock.now = now
+        assert cache.get("k", broken).value == "good"
+    assert calls == [120]
+
+    clock.now = 180
+    cache.get("k", lambda: "fresh")
+    _wait_for(lambda: not cache.get("k", broken).stale)
+    assert cache.get("k", broken).value == "fresh"
+    assert calls == [120]
+
+
+def test_concurrent_misses_share_one_load() -> None:
+    cache = StaleWhileRevalidateCache(ttl=60)
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def slow_loader() -> int:
+        calls.append(1)
+        started.set()
+        release.wait(2)
+        return 42
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get("k", slow_loader)))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    started.wait(2)
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert len(calls) == 1
+    assert [result.value for result in results] == [42] * 5
+
+
+def test_miss_past_max_stale_loads_synchronously_and_raises() -> None:
+    clock = FakeClock()
+    cache = StaleWhileRevalidateCache(ttl=60, max_stale=60, clock=clock)
+    cache.get("k", lambda: "old")
+    clock.now = 500
+
+    def broken() -> str:
+        raise ConnectionError("yahoo down")
+
+    with pytest.raises(ConnectionError):
+        cache.get("k", broken)
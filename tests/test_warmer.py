@@ -0,0 +1,113 @@
+"""Tests for the background cache warmer."""
+
+from __future__ import annotations
+
+from typing import Any
+
+import pandas as pd
+import pytest
+
+from src import data, warmer
+from src.store import BarStore
+
+
+class FakeDownloader:
+    """Serve a daily single-ticker frame clipped to the requested window."""
+
+    def __init__(self) -> None:
+        self.calls: list[dict[str, Any]] = []
+        dates = pd.date_range("2024-01-01", periods=10, freq="D")
+        self.frame = pd.DataFrame(
+            {
+                "Open": 70.0,
+                "High": 71.0,
+                "Low": 69.0,
+                "Close": 70.5,
+                "Adj Close": 70.5,
+                "Volume": 1000,
+            },
+            index=pd.Index(dates, name="Date"),
+        )
+
+    def __call__(self, **kwargs: Any) -> pd.DataFrame:
+        self.calls.append(kwargs)
+        index = self.frame.index.tz_localize("UTC")
+        return self.frame.loc[(index >= kwargs["start"]) & (index < kwargs["end"])]
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.now += seconds
+
+
+def test_warm_target_fills_store_for_app_reads(
+    monkeypatch: pytest.MonkeyPatch, yahoo, tmp_path
+) -> None:
+    downloader = FakeDownloader()
+    yahoo(downloader)
+    store = BarStore(tmp_path)
+    target = warmer.WarmTarget("CL=F", "1d", lookback_days=5)
+    warmed_at = pd.Timestamp("2024-01-08 12:00", tz="UTC")
+    monkeypatch.setattr(data, "_now", lambda: warmed_at)
+
+    result = warmer.warm_target(target, store, now=warmed_at)
+    # The app reads a little later, while the 2024-01-08 bar is still forming.
+    app_now = warmed_at + pd.Timedelta(minutes=3)
+    monkeypatch.setattr(data, "_now", lambda: app_now)
+    start, end = target.window(app_now)
+    served = data.fetch_prices(["CL=F"], start=start, end=end, store=store)
+
+    assert result.succeeded == ("CL=F",)
+    assert len(downloader.calls) == 1  # The app read is served from the store.
+    assert served["datetime"].min() == pd.Timestamp("2024-01-03", tz="UTC")
+    assert len(served) == 6
+
+    warmer.warm_target(target, store, now=app_now)  # The warmer always refreshes.
+    assert len(downloader.calls) == 2
+    later = app_now + pd.Timedelta(hours=1)
+    monkeypatch.setattr(data, "_now", lambda: later)
+    data.fetch_prices(["CL=F"], start=start, end=later, store=store)
+    assert len(downloader.calls) == 3  # Past the TTL the forming bar is re-fetched.
+    assert downloader.calls[-1]["start"] == pd.Timestamp("2024-01-08", tz="UTC")
+
+
+def test_scheduler_staggers_targets_across_period() -> None:
+    clock = FakeClock()
+    fired: list[tuple[float, str]] = []
+    targets = warmer.default_targets(["CL=F", "BZ=F", "NG=F"], ["1d"], 30)
+
+    scheduler = warmer.WarmScheduler(
+        targets,
+        period=30.0,
+        warm=lambda target: fired.append((clock.now, target.ticker)),
+        clock=clock,
+        sleep=clock.sleep,
+    )
+    scheduler.run(cycles=6)
+
+    assert fired == [
+        (0.0, "CL=F"),
+        (10.0, "BZ=F"),
+        (20.0, "NG=F"),
+        (30.0, "CL=F"),
+        (40.0, "BZ=F"),
+        (50.0, "NG=F"),
+    ]
+
+
+def test_scheduler_survives_failing_target() -> None:
+    clock = FakeClock()
+    targets = warmer.default_targets(["CL=F"], ["1d"], 30)
+
+    def explode(_: warmer.WarmTarget) -> None:
+        raise RuntimeError("upstream down")
+
+    scheduler = warmer.WarmScheduler(targets, 5.0, explode, clock, clock.sleep)
+
+    assert scheduler.run_pending() == targets